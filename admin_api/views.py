@@ -158,7 +158,9 @@ class RecentActivityView(APIView):
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from content.models import Actor, Director, Genero
-from content.serializers import PeliculaDetalleSerializer, ActorSerializer, DirectorSerializer, GeneroSerializer
+from content.serializers import (
+    PeliculaDetalleSerializer, ActorSerializer, DirectorSerializer, GeneroSerializer, anotar_disponibilidad,
+)
 
 
 class PeliculaAdminViewSet(viewsets.ModelViewSet):
@@ -169,6 +171,12 @@ class PeliculaAdminViewSet(viewsets.ModelViewSet):
     serializer_class = PeliculaDetalleSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
+    def get_queryset(self):
+        # Relaciones y disponibilidad de video en un número fijo de consultas
+        return anotar_disponibilidad(
+            Pelicula.objects.prefetch_related("actores", "directores", "generos")
+        )
+
     def list(self, request):
         """Listar todas las películas"""
         peliculas = self.get_queryset()
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "users",
@@ -138,10 +139,56 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Tamaño de página por defecto del catálogo (paginación por cursor)
+CATALOGO_PAGE_SIZE = int(os.getenv("CATALOGO_PAGE_SIZE", "24"))
+
+# Segundos que se cachea el home feed de cada perfil
+HOME_FEED_TTL = int(os.getenv("HOME_FEED_TTL", "60"))
+
 # === MEDIA (montado como volumen) ===
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(BASE_DIR / "media"))
 
+# === ENTREGA DE VIDEO (streaming.views.StreamFileView) ===
+# "python" | "x-accel" | "x-sendfile" | "sendfile"
+#   x-accel: nginx con una location interna que apunte a MEDIA_ROOT, p. ej.
+#       location /protected-media/ { internal; alias /app/media/; }
+#   sendfile: requiere un servidor WSGI que use os.sendfile (gunicorn); runserver lo
+#     lee por chunks. ASGI (uvicorn) no tiene sendfile: se entrega como en "python"
+STREAMING_DELIVERY = os.getenv("STREAMING_DELIVERY", "python")
+STREAMING_ACCEL_PREFIX = os.getenv("STREAMING_ACCEL_PREFIX", "/protected-media/")
+# Caché en memoria del inicio de cada video (modo "python"; streaming.cache_inicio).
+# MB guardados por archivo y tope total por proceso; 0 la desactiva.
+STREAMING_CACHE_INICIO_MB = int(os.getenv("STREAMING_CACHE_INICIO_MB", "4"))
+STREAMING_CACHE_INICIO_TOTAL_MB = int(os.getenv("STREAMING_CACHE_INICIO_TOTAL_MB", "256"))
+# Assets con remote_url: "redirect" (al origen) | "proxy" (por bloques, con caché
+# en disco compartida entre procesos; streaming.cache_remota)
+STREAMING_REMOTO = os.getenv("STREAMING_REMOTO", "redirect")
+STREAMING_PROXY_DIR = os.getenv("STREAMING_PROXY_DIR", str(BASE_DIR / "cache_remota"))
+STREAMING_PROXY_CACHE_MB = int(os.getenv("STREAMING_PROXY_CACHE_MB", "10240"))
+STREAMING_PROXY_BLOQUE_KB = int(os.getenv("STREAMING_PROXY_BLOQUE_KB", "1024"))
+STREAMING_PROXY_TIMEOUT = float(os.getenv("STREAMING_PROXY_TIMEOUT", "10"))
+# Descriptores de solo lectura compartidos entre requests (streaming.descriptores);
+# tope por proceso, muy por debajo de `ulimit -n`. 0 abre uno por request.
+STREAMING_DESCRIPTORES_MAX = int(os.getenv("STREAMING_DESCRIPTORES_MAX", "256"))
+# Elección de rendición por ancho de banda (streaming.qoe): fracción del throughput
+# estimado que puede usar el bitrate elegido, y horas que vale la estimación de un perfil
+STREAMING_ABR_MARGEN = float(os.getenv("STREAMING_ABR_MARGEN", "0.8"))
+STREAMING_QOE_VIGENCIA_HORAS = int(os.getenv("STREAMING_QOE_VIGENCIA_HORAS", "24"))
+
+# === PROCESAMIENTO DE VIDEO (uploader: manage.py procesar_media) ===
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+MEDIA_SEGMENTO_SEGUNDOS = int(os.getenv("MEDIA_SEGMENTO_SEGUNDOS", "6"))
+MEDIA_EMPAQUETAR_DASH = os.getenv("MEDIA_EMPAQUETAR_DASH", "0") == "1"
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
+# Miniaturas del seek bar (trickplay): una cada N segundos, de este ancho en px
+MEDIA_TRICKPLAY_SEGUNDOS = int(os.getenv("MEDIA_TRICKPLAY_SEGUNDOS", "10"))
+MEDIA_TRICKPLAY_ANCHO = int(os.getenv("MEDIA_TRICKPLAY_ANCHO", "160"))
+# Procesos del worker (0 = uno por núcleo) y segundos del lease de cada trabajo
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "0"))
+MEDIA_LEASE_SEGUNDOS = int(os.getenv("MEDIA_LEASE_SEGUNDOS", "120"))
+MEDIA_MAX_INTENTOS = int(os.getenv("MEDIA_MAX_INTENTOS", "3"))
+
 # === Backends de autenticación ===
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
@@ -4,7 +4,8 @@ Maneja la integración con la API de Gemini y proporciona contexto de películas
 """
 import google.generativeai as genai
 from django.conf import settings
-from content.models import Pelicula, Genero, Actor, Director
+from content.models import CatalogoPelicula, Pelicula, Genero, Actor, Director
+from content.serializers import PeliculaTarjetaSerializer, VISTA_TARJETA
 import json
 
 
@@ -27,26 +28,28 @@ class ChatbotService:
         Obtiene el contexto de todas las películas disponibles en la base de datos
         Retorna un string formateado con información de películas
         """
-        peliculas = Pelicula.objects.all().prefetch_related('generos', 'actores', 'directores')
+        # Modelo de lectura: nombres ya desnormalizados, una sola consulta
+        peliculas = CatalogoPelicula.objects.order_by('pelicula_id')
+        total = peliculas.count()
 
-        if not peliculas.exists():
+        if not total:
             return "No hay películas disponibles en el catálogo."
 
         # Construir el contexto de películas
         context_parts = []
-        context_parts.append(f"CATÁLOGO DE PELÍCULAS DISPONIBLES ({peliculas.count()} películas):\n")
+        context_parts.append(f"CATÁLOGO DE PELÍCULAS DISPONIBLES ({total} películas):\n")
 
         for pelicula in peliculas[:100]:  # Limitar a 100 películas para no exceder tokens
-            generos = ", ".join([g.nombre for g in pelicula.generos.all()])
-            actores = ", ".join([a.nombre for a in pelicula.actores.all()[:5]])  # Top 5 actores
-            directores = ", ".join([d.nombre for d in pelicula.directores.all()])
+            generos = ", ".join(pelicula.genero_nombres)
+            actores = ", ".join(pelicula.actor_nombres[:5])  # Top 5 actores
+            directores = ", ".join(pelicula.director_nombres)
 
             # Extraer año de fecha_estreno si existe
             anio = pelicula.fecha_estreno.year if pelicula.fecha_estreno else 'N/A'
 
             pelicula_info = f"""
 - Título: {pelicula.titulo}
-  ID: {pelicula.id_pelicula}
+  ID: {pelicula.pelicula_id}
   Año: {anio}
   Géneros: {generos or 'N/A'}
   Directores: {directores or 'N/A'}
@@ -63,7 +66,7 @@ class ChatbotService:
         """Obtiene películas filtradas por género"""
         peliculas = Pelicula.objects.filter(
             generos__nombre__icontains=genre_name
-        ).prefetch_related('generos', 'actores', 'directores').distinct()[:20]
+        ).prefetch_related('generos').distinct()[:20]
 
         return list(peliculas)
 
@@ -71,7 +74,7 @@ class ChatbotService:
         """Busca una película específica por título"""
         peliculas = Pelicula.objects.filter(
             titulo__icontains=title
-        ).prefetch_related('generos', 'actores', 'directores')[:5]
+        ).prefetch_related('generos')[:5]
 
         return list(peliculas)
 
@@ -79,7 +82,7 @@ class ChatbotService:
         """Obtiene películas filtradas por actor"""
         peliculas = Pelicula.objects.filter(
             actores__nombre__icontains=actor_name
-        ).prefetch_related('generos', 'actores', 'directores').distinct()[:20]
+        ).prefetch_related('generos').distinct()[:20]
 
         return list(peliculas)
 
@@ -87,17 +90,21 @@ class ChatbotService:
         """Obtiene películas filtradas por director"""
         peliculas = Pelicula.objects.filter(
             directores__nombre__icontains=director_name
-        ).prefetch_related('generos', 'actores', 'directores').distinct()[:20]
+        ).prefetch_related('generos').distinct()[:20]
 
         return list(peliculas)
 
-    def format_movies_for_response(self, peliculas):
+    def format_movies_for_response(self, peliculas, vista=None):
         """
-        Formatea una lista de películas para incluir en la respuesta
+        Formatea una lista de películas para incluir en la respuesta.
+        Con vista='card' usa la proyección compacta del catálogo.
         """
         if not peliculas:
             return None
 
+        if vista == VISTA_TARJETA:
+            return PeliculaTarjetaSerializer(list(peliculas[:10]), many=True).data
+
         movies_data = []
         for pelicula in peliculas[:10]:  # Máximo 10 películas
             # Extraer año de fecha_estreno
@@ -118,12 +125,13 @@ class ChatbotService:
 
         return movies_data
 
-    def generate_response(self, user_message):
+    def generate_response(self, user_message, vista=None):
         """
         Genera una respuesta usando Gemini con contexto de películas
 
         Args:
             user_message (str): Mensaje del usuario
+            vista (str): 'card' para devolver las películas en formato tarjeta
 
         Returns:
             dict: {'response': str, 'movies': list or None}
@@ -191,7 +199,7 @@ Asistente Netflix:"""
             if genero_detectado:
                 peliculas = self.get_movies_by_genre(genero_detectado)
                 if peliculas:
-                    movies_to_return = self.format_movies_for_response(peliculas)
+                    movies_to_return = self.format_movies_for_response(peliculas, vista)
 
             # Si no hay películas aún, detectar otras intenciones
             if not movies_to_return:
@@ -207,9 +215,9 @@ Asistente Netflix:"""
 
                 if any(keyword in user_lower for keyword in keywords_busqueda):
                     # Si no se detectó género específico, retornar películas populares/aleatorias
-                    peliculas = Pelicula.objects.all().prefetch_related('generos', 'actores', 'directores')[:10]
+                    peliculas = Pelicula.objects.all().prefetch_related('generos')[:10]
                     if peliculas:
-                        movies_to_return = self.format_movies_for_response(list(peliculas))
+                        movies_to_return = self.format_movies_for_response(list(peliculas), vista)
 
             # Procesar el texto para intercalar películas
             import re
@@ -223,10 +231,10 @@ Asistente Netflix:"""
                 # Buscar esas películas en la base de datos
                 peliculas = Pelicula.objects.filter(
                     id_pelicula__in=movie_ids
-                ).prefetch_related('generos', 'actores', 'directores')
+                ).prefetch_related('generos')
 
                 if peliculas:
-                    movies_to_return = self.format_movies_for_response(list(peliculas))
+                    movies_to_return = self.format_movies_for_response(list(peliculas), vista)
 
             # Si hay películas para retornar
             if movies_to_return and movie_markers:
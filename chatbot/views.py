@@ -2,6 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from subscriptions.permissions import EsSuscriptorActivo
+from content.serializers import VISTA_TARJETA, es_vista_tarjeta
 from .chatbot_service import ChatbotService
 
 
@@ -14,7 +15,7 @@ class ChatBotView(APIView):
 
     def post(self, request):
         """
-        Espera: {"message": "texto del usuario"}
+        Espera: {"message": "texto del usuario", "view": "card" (opcional)}
         Retorna: {"response": "respuesta del bot", "movies": [lista de películas] o null}
         """
         message = request.data.get('message', '').strip()
@@ -30,7 +31,8 @@ class ChatBotView(APIView):
             chatbot = ChatbotService()
 
             # Generar respuesta usando Gemini con contexto de películas
-            result = chatbot.generate_response(message)
+            vista = VISTA_TARJETA if (es_vista_tarjeta(request.data) or es_vista_tarjeta(request.query_params)) else None
+            result = chatbot.generate_response(message, vista)
 
             return Response({
                 'response': result['response'],
@@ -5,6 +5,7 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse
 
 from .models import Pelicula, Actor, Director, Genero
+from .signals import notificar_cambio_catalogo
 
 
 class PeliculaAdminForm(forms.ModelForm):
@@ -130,6 +131,7 @@ class PeliculaAdmin(admin.ModelAdmin):
             pelicula_id=pid,
             selected_values=form.cleaned_data.get("directores"),
         )
+        notificar_cambio_catalogo(Pelicula, [pid])
 
 
     def get_deleted_objects(self, objs, request):
@@ -171,10 +173,12 @@ class ActorAdmin(admin.ModelAdmin):
     def delete_model(self, request, obj):
         with connection.cursor() as cur:
             cur.execute(
-                "DELETE FROM public.peliculas_actores WHERE id_actor = %s",
+                "DELETE FROM public.peliculas_actores WHERE id_actor = %s RETURNING id_pelicula",
                 [obj.id_actor],
             )
+            afectadas = [row[0] for row in cur.fetchall()]
         obj.delete()
+        notificar_cambio_catalogo(type(obj), afectadas)
 
     def delete_view(self, request, object_id, extra_context=None):
         if request.method == "POST":
@@ -197,10 +201,12 @@ class DirectorAdmin(admin.ModelAdmin):
     def delete_model(self, request, obj):
         with connection.cursor() as cur:
             cur.execute(
-                "DELETE FROM public.peliculas_directores WHERE id_director = %s",
+                "DELETE FROM public.peliculas_directores WHERE id_director = %s RETURNING id_pelicula",
                 [obj.id_director],
             )
+            afectadas = [row[0] for row in cur.fetchall()]
         obj.delete()
+        notificar_cambio_catalogo(type(obj), afectadas)
 
     def delete_view(self, request, object_id, extra_context=None):
         if request.method == "POST":
@@ -223,10 +229,12 @@ class GeneroAdmin(admin.ModelAdmin):
     def delete_model(self, request, obj):
         with connection.cursor() as cur:
             cur.execute(
-                "DELETE FROM public.peliculas_generos WHERE id_genero = %s",
+                "DELETE FROM public.peliculas_generos WHERE id_genero = %s RETURNING id_pelicula",
                 [obj.id_genero],
             )
+            afectadas = [row[0] for row in cur.fetchall()]
         obj.delete()
+        notificar_cambio_catalogo(type(obj), afectadas)
 
     def delete_view(self, request, object_id, extra_context=None):
         if request.method == "POST":
@@ -0,0 +1,209 @@
+"""
+Modelo de lectura del catálogo (`catalogo_peliculas`).
+
+Una fila por película con todo lo que muestran las vistas de lectura, para
+que una página del catálogo sea una sola consulta indexada en lugar de
+`peliculas` + tres tablas puente + tablas de nombres + media_assets.
+"""
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Value
+
+from .models import FECHA_SIN_ESTRENO
+
+_SQL_REFRESCAR = """
+INSERT INTO catalogo_peliculas (
+    id_pelicula, titulo, descripcion, fecha_estreno, estreno_orden, duracion,
+    clasificacion, miniatura,
+    genero_ids, genero_nombres, actor_ids, actor_nombres, director_ids, director_nombres,
+    tiene_video, tiene_trailer, actualizado_en
+)
+SELECT p.id_pelicula, p.titulo, p.descripcion, p.fecha_estreno,
+       COALESCE(p.fecha_estreno, %(sin_estreno)s), p.duracion,
+       p.clasificacion, p.miniatura,
+       COALESCE(g.ids, '{{}}'), COALESCE(g.nombres, '{{}}'),
+       COALESCE(a.ids, '{{}}'), COALESCE(a.nombres, '{{}}'),
+       COALESCE(d.ids, '{{}}'), COALESCE(d.nombres, '{{}}'),
+       EXISTS (SELECT 1 FROM media_assets m WHERE m.id_pelicula = p.id_pelicula AND NOT m.es_trailer),
+       EXISTS (SELECT 1 FROM media_assets m WHERE m.id_pelicula = p.id_pelicula AND m.es_trailer),
+       now()
+FROM peliculas p
+LEFT JOIN LATERAL (
+    SELECT array_agg(x.id_genero ORDER BY x.id_genero) AS ids,
+           array_agg(x.nombre ORDER BY x.id_genero) AS nombres
+    FROM peliculas_generos r JOIN generos x ON x.id_genero = r.id_genero
+    WHERE r.id_pelicula = p.id_pelicula
+) g ON TRUE
+LEFT JOIN LATERAL (
+    SELECT array_agg(x.id_actor ORDER BY x.id_actor) AS ids,
+           array_agg(x.nombre ORDER BY x.id_actor) AS nombres
+    FROM peliculas_actores r JOIN actores x ON x.id_actor = r.id_actor
+    WHERE r.id_pelicula = p.id_pelicula
+) a ON TRUE
+LEFT JOIN LATERAL (
+    SELECT array_agg(x.id_director ORDER BY x.id_director) AS ids,
+           array_agg(x.nombre ORDER BY x.id_director) AS nombres
+    FROM peliculas_directores r JOIN directores x ON x.id_director = r.id_director
+    WHERE r.id_pelicula = p.id_pelicula
+) d ON TRUE
+{where}
+ON CONFLICT (id_pelicula) DO UPDATE SET
+    titulo = EXCLUDED.titulo,
+    descripcion = EXCLUDED.descripcion,
+    fecha_estreno = EXCLUDED.fecha_estreno,
+    estreno_orden = EXCLUDED.estreno_orden,
+    duracion = EXCLUDED.duracion,
+    clasificacion = EXCLUDED.clasificacion,
+    miniatura = EXCLUDED.miniatura,
+    genero_ids = EXCLUDED.genero_ids,
+    genero_nombres = EXCLUDED.genero_nombres,
+    actor_ids = EXCLUDED.actor_ids,
+    actor_nombres = EXCLUDED.actor_nombres,
+    director_ids = EXCLUDED.director_ids,
+    director_nombres = EXCLUDED.director_nombres,
+    tiene_video = EXCLUDED.tiene_video,
+    tiene_trailer = EXCLUDED.tiene_trailer,
+    actualizado_en = EXCLUDED.actualizado_en
+"""
+
+_SQL_BORRAR_HUERFANAS = """
+DELETE FROM catalogo_peliculas c
+WHERE {where}
+  AND NOT EXISTS (SELECT 1 FROM peliculas p WHERE p.id_pelicula = c.id_pelicula)
+"""
+
+
+def refrescar_catalogo(pelicula_ids=None):
+    """
+    Recalcula las filas del modelo de lectura de las películas indicadas
+    (y borra las de películas que ya no existen). Sin ids lo reconstruye entero.
+    """
+    params = {"sin_estreno": FECHA_SIN_ESTRENO}
+    if pelicula_ids is None:
+        where_insert, where_delete = "", "TRUE"
+    else:
+        ids = [int(x) for x in pelicula_ids]
+        if not ids:
+            return
+        params["ids"] = ids
+        where_insert = "WHERE p.id_pelicula = ANY(%(ids)s)"
+        where_delete = "c.id_pelicula = ANY(%(ids)s)"
+    with connection.cursor() as cur:
+        cur.execute(_SQL_REFRESCAR.format(where=where_insert), params)
+        cur.execute(_SQL_BORRAR_HUERFANAS.format(where=where_delete), params)
+
+
+# ---------------------- Facetas ----------------------
+# Dimensiones filtrables; cada faceta se cuenta con los filtros de las demás.
+DIMENSIONES = ("genero", "actor", "director", "anio")
+
+_COLUMNAS_BASE = (
+    "genero_ids", "genero_nombres", "actor_ids", "actor_nombres",
+    "director_ids", "director_nombres", "fecha_estreno", "clasificacion",
+)
+
+# `base` son las filas que cumplen `q`, con una marca por cada filtro de
+# dimensión; se materializa una vez y cada faceta la recorre en memoria.
+_SQL_FACETAS = """
+SELECT 'total', NULL::int, NULL::text, count(*)
+FROM base WHERE m_genero AND m_actor AND m_director AND m_anio
+UNION ALL
+SELECT 'generos', g.id, g.nombre, count(*)
+FROM base, unnest(genero_ids, genero_nombres) AS g(id, nombre)
+WHERE m_actor AND m_director AND m_anio
+GROUP BY g.id, g.nombre
+UNION ALL
+SELECT 'anios', EXTRACT(YEAR FROM fecha_estreno)::int, NULL, count(*)
+FROM base WHERE fecha_estreno IS NOT NULL AND m_genero AND m_actor AND m_director
+GROUP BY 2
+UNION ALL
+SELECT 'clasificaciones', NULL, clasificacion, count(*)
+FROM base WHERE clasificacion IS NOT NULL AND m_genero AND m_actor AND m_director AND m_anio
+GROUP BY clasificacion
+UNION ALL
+(SELECT 'actores', a.id, a.nombre, count(*)
+ FROM base, unnest(actor_ids, actor_nombres) AS a(id, nombre)
+ WHERE m_genero AND m_director AND m_anio
+ GROUP BY a.id, a.nombre
+ ORDER BY count(*) DESC, a.nombre LIMIT %s)
+UNION ALL
+(SELECT 'directores', d.id, d.nombre, count(*)
+ FROM base, unnest(director_ids, director_nombres) AS d(id, nombre)
+ WHERE m_genero AND m_actor AND m_anio
+ GROUP BY d.id, d.nombre
+ ORDER BY count(*) DESC, d.nombre LIMIT %s)
+"""
+
+
+def contar_facetas(queryset, condiciones, top=20):
+    """
+    Cuenta películas por género, año, clasificación y top-N de actores y
+    directores en una sola consulta.
+    `queryset` es CatalogoPelicula ya filtrado por texto; `condiciones` es
+    {dimension: Q} con los filtros de dimensión activos (ver DIMENSIONES).
+    """
+    marcas = {
+        f"m_{d}": ExpressionWrapper(condiciones[d], output_field=BooleanField())
+        if d in condiciones else Value(True)
+        for d in DIMENSIONES
+    }
+    base = queryset.order_by().annotate(**marcas).values(*_COLUMNAS_BASE, *marcas)
+    sql_base, params_base = base.query.sql_with_params()
+    columnas = ", ".join((*_COLUMNAS_BASE, *marcas))
+    sql = f"WITH base ({columnas}) AS MATERIALIZED ({sql_base})" + _SQL_FACETAS
+
+    with connection.cursor() as cur:
+        cur.execute(sql, [*params_base, top, top])
+        filas = cur.fetchall()
+
+    facetas = {"total": 0, "generos": [], "anios": [], "clasificaciones": [], "actores": [], "directores": []}
+    for faceta, clave, nombre, total in filas:
+        if faceta == "total":
+            facetas["total"] = total
+        elif faceta == "generos":
+            facetas["generos"].append({"id_genero": clave, "nombre": nombre, "total": total})
+        elif faceta == "anios":
+            facetas["anios"].append({"anio": clave, "total": total})
+        elif faceta == "clasificaciones":
+            facetas["clasificaciones"].append({"clasificacion": nombre, "total": total})
+        elif faceta == "actores":
+            facetas["actores"].append({"id_actor": clave, "nombre": nombre, "total": total})
+        else:
+            facetas["directores"].append({"id_director": clave, "nombre": nombre, "total": total})
+
+    facetas["generos"].sort(key=lambda f: f["nombre"])
+    facetas["anios"].sort(key=lambda f: f["anio"], reverse=True)
+    facetas["clasificaciones"].sort(key=lambda f: f["clasificacion"])
+    # UNION ALL no garantiza el orden de cada rama
+    facetas["actores"].sort(key=lambda f: (-f["total"], f["nombre"]))
+    facetas["directores"].sort(key=lambda f: (-f["total"], f["nombre"]))
+    return facetas
+
+
+# ---------------------- Filas por género ----------------------
+_SQL_FILAS_GENEROS = """
+SELECT g.id_genero, g.nombre, c.id_pelicula
+FROM generos g
+CROSS JOIN LATERAL (
+    SELECT c.id_pelicula, c.estreno_orden, c.titulo
+    FROM catalogo_peliculas c
+    WHERE c.genero_ids @> ARRAY[g.id_genero]
+    ORDER BY c.estreno_orden DESC, c.titulo, c.id_pelicula
+    LIMIT %s
+) c
+ORDER BY g.nombre, g.id_genero, c.estreno_orden DESC, c.titulo, c.id_pelicula
+"""
+
+
+def filas_por_genero(por_fila):
+    """
+    Las `por_fila` películas más recientes de cada género, en el orden del
+    catálogo. Retorna [(id_genero, nombre, [id_pelicula, ...]), ...] sin géneros vacíos.
+    """
+    filas = []
+    with connection.cursor() as cur:
+        cur.execute(_SQL_FILAS_GENEROS, [por_fila])
+        for id_genero, nombre, id_pelicula in cur.fetchall():
+            if not filas or filas[-1][0] != id_genero:
+                filas.append((id_genero, nombre, []))
+            filas[-1][2].append(id_pelicula)
+    return filas
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from content.catalogo import refrescar_catalogo
+from content.models import CatalogoPelicula, CatalogoVersion
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el modelo de lectura del catálogo (catalogo_peliculas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="Solo estas películas (por defecto, todas)")
+
+    def handle(self, *args, **options):
+        refrescar_catalogo(options["ids"] or None)
+        CatalogoVersion.incrementar()
+        total = CatalogoPelicula.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Catálogo reconstruido ({total} películas)."))
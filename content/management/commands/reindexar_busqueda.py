@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from content.models import PeliculaBusqueda
+from content.search import reindexar_peliculas
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda del catálogo (peliculas_busqueda)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="Solo estas películas (por defecto, todas)")
+
+    def handle(self, *args, **options):
+        ids = options["ids"] or None
+        reindexar_peliculas(ids)
+        total = PeliculaBusqueda.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Índice de búsqueda actualizado ({total} películas indexadas)."))
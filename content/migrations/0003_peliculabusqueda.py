@@ -0,0 +1,59 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+# Configuración de búsqueda en español que además ignora tildes.
+CREAR_CONFIG_ES_UNACCENT = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION es_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+"""
+
+BORRAR_CONFIG_ES_UNACCENT = "DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent;"
+
+
+def poblar_indice(apps, schema_editor):
+    # Las tablas puente no las crea Django; en una BD vacía (tests) no existen.
+    tablas = schema_editor.connection.introspection.table_names()
+    if not {"peliculas_actores", "peliculas_directores", "peliculas_generos"} <= set(tablas):
+        return
+    from content.search import reindexar_peliculas
+    reindexar_peliculas()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_alter_pelicula_options'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+        migrations.RunSQL(CREAR_CONFIG_ES_UNACCENT, BORRAR_CONFIG_ES_UNACCENT),
+        migrations.CreateModel(
+            name='PeliculaBusqueda',
+            fields=[
+                ('pelicula', models.OneToOneField(db_column='id_pelicula', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='busqueda', serialize=False, to='content.pelicula')),
+                ('documento', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('texto', models.TextField(default='')),
+            ],
+            options={
+                'db_table': 'peliculas_busqueda',
+                'indexes': [
+                    django.contrib.postgres.indexes.GinIndex(fields=['documento'], name='peliculas_busq_doc_gin'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['texto'], name='peliculas_busq_trgm_gin', opclasses=['gin_trgm_ops']),
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+import datetime
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_peliculabusqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=models.Index(models.OrderBy(django.db.models.functions.comparison.Coalesce('fecha_estreno', models.Value(datetime.date(9999, 12, 31))), descending=True), models.F('titulo'), models.F('id_pelicula'), name='peliculas_orden_catalogo'),
+        ),
+    ]
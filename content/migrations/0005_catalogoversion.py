@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def crear_fila(apps, schema_editor):
+    CatalogoVersion = apps.get_model('content', 'CatalogoVersion')
+    CatalogoVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_pelicula_orden_catalogo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogoVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'catalogo_version',
+            },
+        ),
+        migrations.RunPython(crear_fila, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_catalogo(apps, schema_editor):
+    # Igual que el índice de búsqueda: sin tablas puente (BD vacía) no hay nada que copiar.
+    tablas = schema_editor.connection.introspection.table_names()
+    if not {"peliculas_actores", "peliculas_directores", "peliculas_generos"} <= set(tablas):
+        return
+    from content.catalogo import refrescar_catalogo
+    refrescar_catalogo()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_catalogoversion'),
+        ('uploader', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogoPelicula',
+            fields=[
+                ('pelicula', models.OneToOneField(db_column='id_pelicula', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalogo', serialize=False, to='content.pelicula')),
+                ('titulo', models.CharField(max_length=255)),
+                ('descripcion', models.TextField(blank=True, null=True)),
+                ('fecha_estreno', models.DateField(blank=True, null=True)),
+                ('estreno_orden', models.DateField()),
+                ('duracion', models.IntegerField(blank=True, null=True)),
+                ('clasificacion', models.CharField(blank=True, max_length=50, null=True)),
+                ('miniatura', models.CharField(blank=True, max_length=100, null=True)),
+                ('genero_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('genero_nombres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('actor_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('actor_nombres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('director_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('director_nombres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('tiene_video', models.BooleanField(default=False)),
+                ('tiene_trailer', models.BooleanField(default=False)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'catalogo_peliculas',
+                'indexes': [
+                    models.Index(fields=['-estreno_orden', 'titulo', 'pelicula'], name='catalogo_orden'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['genero_ids'], name='catalogo_generos_gin'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['actor_ids'], name='catalogo_actores_gin'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['director_ids'], name='catalogo_directores_gin'),
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_catalogo, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,11 @@
+from datetime import date
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 
 # ===== Tablas simples =====
 class Actor(models.Model):
@@ -37,6 +44,16 @@ class Genero(models.Model):
         return self.nombre
 
 
+# Las películas sin fecha de estreno se ordenan primero, como hace Postgres
+# con NULL en "ORDER BY fecha_estreno DESC".
+FECHA_SIN_ESTRENO = date(9999, 12, 31)
+
+
+def orden_estreno():
+    """Expresión de orden por fecha de estreno (sin NULL, apta para keyset)."""
+    return Coalesce("fecha_estreno", Value(FECHA_SIN_ESTRENO))
+
+
 # ===== Tabla principal =====
 class Pelicula(models.Model):
     id_pelicula = models.AutoField(primary_key=True, db_column="id_pelicula")
@@ -55,6 +72,10 @@ class Pelicula(models.Model):
     class Meta:
         db_table = "peliculas"
         managed = True
+        indexes = [
+            # orden del catálogo: (-fecha_estreno, titulo) + PK como desempate
+            models.Index(orden_estreno().desc(), F("titulo"), F("id_pelicula"), name="peliculas_orden_catalogo"),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -89,3 +110,92 @@ class PeliculaGenero(models.Model):
         db_table = "peliculas_generos"
         managed = False
         unique_together = (("pelicula", "genero"),)
+
+
+# ===== Índice de búsqueda =====
+class PeliculaBusqueda(models.Model):
+    """
+    Documento de búsqueda por película (tsvector + texto plano para trigramas).
+    Se mantiene desde content.search.reindexar_peliculas; no editar a mano.
+    """
+    pelicula = models.OneToOneField(
+        Pelicula, on_delete=models.CASCADE, db_column="id_pelicula",
+        primary_key=True, related_name="busqueda"
+    )
+    documento = SearchVectorField(null=True)
+    # título + nombres de géneros/actores/directores, sin tildes y en minúsculas
+    texto = models.TextField(default="")
+
+    class Meta:
+        db_table = "peliculas_busqueda"
+        indexes = [
+            GinIndex(fields=["documento"], name="peliculas_busq_doc_gin"),
+            GinIndex(fields=["texto"], name="peliculas_busq_trgm_gin", opclasses=["gin_trgm_ops"]),
+        ]
+
+
+# ===== Versión del catálogo =====
+class CatalogoVersion(models.Model):
+    """
+    Contador global que se incrementa con cada cambio del catálogo.
+    Las vistas de lectura derivan su ETag de este número.
+    """
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    version = models.BigIntegerField(default=1)
+
+    class Meta:
+        db_table = "catalogo_version"
+
+    @classmethod
+    def actual(cls):
+        version = cls.objects.filter(pk=1).values_list("version", flat=True).first()
+        return version or 0
+
+    @classmethod
+    def incrementar(cls):
+        if not cls.objects.filter(pk=1).update(version=F("version") + 1):
+            cls.objects.get_or_create(pk=1)
+
+
+# ===== Modelo de lectura del catálogo =====
+class CatalogoPelicula(models.Model):
+    """
+    Fila desnormalizada por película para las vistas de lectura: datos de la
+    película + ids y nombres de géneros/actores/directores + flags de media.
+    Se mantiene desde content.catalogo.refrescar_catalogo; no editar a mano.
+    """
+    pelicula = models.OneToOneField(
+        Pelicula, on_delete=models.CASCADE, db_column="id_pelicula",
+        primary_key=True, related_name="catalogo"
+    )
+    titulo = models.CharField(max_length=255)
+    descripcion = models.TextField(blank=True, null=True)
+    fecha_estreno = models.DateField(blank=True, null=True)
+    estreno_orden = models.DateField()  # fecha_estreno o FECHA_SIN_ESTRENO
+    duracion = models.IntegerField(blank=True, null=True)
+    clasificacion = models.CharField(max_length=50, blank=True, null=True)
+    miniatura = models.CharField(max_length=100, blank=True, null=True)  # ruta en el storage
+
+    # listas paralelas (id, nombre), ordenadas por id
+    genero_ids = ArrayField(models.IntegerField(), default=list)
+    genero_nombres = ArrayField(models.TextField(), default=list)
+    actor_ids = ArrayField(models.IntegerField(), default=list)
+    actor_nombres = ArrayField(models.TextField(), default=list)
+    director_ids = ArrayField(models.IntegerField(), default=list)
+    director_nombres = ArrayField(models.TextField(), default=list)
+
+    tiene_video = models.BooleanField(default=False)
+    tiene_trailer = models.BooleanField(default=False)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "catalogo_peliculas"
+        indexes = [
+            models.Index(fields=["-estreno_orden", "titulo", "pelicula"], name="catalogo_orden"),
+            GinIndex(fields=["genero_ids"], name="catalogo_generos_gin"),
+            GinIndex(fields=["actor_ids"], name="catalogo_actores_gin"),
+            GinIndex(fields=["director_ids"], name="catalogo_directores_gin"),
+        ]
+
+    def __str__(self):
+        return self.titulo
@@ -0,0 +1,153 @@
+"""
+Paginación por cursor (keyset) para el catálogo.
+
+A diferencia de OFFSET, cada página se pide con "WHERE (orden) > (última fila)",
+así que la página N cuesta lo mismo que la primera. El cursor es opaco
+(base64 de la posición) y estable aunque se inserten películas nuevas.
+
+El orden se toma del propio queryset (`order_by`), que debe ser total
+(terminar en la PK) y usar solo campos o anotaciones presentes en cada fila.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = getattr(settings, "CATALOGO_PAGE_SIZE", 24)
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        campos = self._campos_orden(queryset)
+        posicion, reverso = self.decode_cursor(request)
+
+        if reverso:
+            queryset = queryset.order_by(*[c if d else f"-{c}" for c, d in campos])
+            campos_consulta = [(c, not d) for c, d in campos]
+        else:
+            campos_consulta = campos
+
+        if posicion is not None:
+            if len(posicion) != len(campos):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self._filtro_siguiente(campos_consulta, posicion))
+
+        # una fila extra para saber si hay más en esta dirección
+        filas = list(queryset[:self.page_size + 1])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+
+        if reverso:
+            filas.reverse()
+            self.has_next, self.has_previous = posicion is not None, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, posicion is not None
+
+        self.campos = campos
+        self.filas = filas
+        return filas
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next or not self.filas:
+            return None
+        return self.encode_cursor(self._posicion(self.filas[-1]), reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.filas:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._posicion(self.filas[0]), reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # ---------------------- Cursor ----------------------
+    def encode_cursor(self, posicion, reverso):
+        payload = json.dumps({"p": posicion, "r": int(reverso)}, cls=DjangoJSONEncoder, separators=(",", ":"))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            posicion = data["p"]
+            if not isinstance(posicion, list):
+                raise ValueError
+            return posicion, bool(data.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---------------------- Keyset ----------------------
+    def _campos_orden(self, queryset):
+        campos = []
+        for campo in queryset.query.order_by:
+            if not isinstance(campo, str):
+                raise TypeError("KeysetCursorPagination solo admite order_by por nombre de campo.")
+            campos.append((campo.lstrip("-"), campo.startswith("-")))
+        if not campos:
+            raise TypeError("KeysetCursorPagination necesita un queryset ordenado.")
+        return campos
+
+    def _posicion(self, fila):
+        # filas de modelo o dicts de .values()
+        if isinstance(fila, dict):
+            return [fila[campo] for campo, _ in self.campos]
+        return [getattr(fila, campo) for campo, _ in self.campos]
+
+    @staticmethod
+    def _filtro_siguiente(campos, posicion):
+        """
+        (c1, c2, ..., cn) "después de" (v1, ..., vn) respetando la dirección de cada campo:
+            c1 ≶ v1 OR (c1 = v1 AND c2 ≶ v2) OR ...
+        Se añade además la cota no estricta sobre c1 para que el índice pueda
+        empezar el recorrido directamente en la posición del cursor.
+        """
+        disyuncion = Q()
+        iguales = Q()
+        for (campo, desc), valor in zip(campos, posicion):
+            disyuncion |= iguales & Q(**{f"{campo}__{'lt' if desc else 'gt'}": valor})
+            iguales &= Q(**{campo: valor})
+        primero, desc = campos[0]
+        return Q(**{f"{primero}__{'lte' if desc else 'gte'}": posicion[0]}) & disyuncion
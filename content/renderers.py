@@ -0,0 +1,33 @@
+"""
+Renderer JSON rápido (orjson) para las vistas de lectura más usadas.
+
+Produce exactamente los mismos bytes que rest_framework.renderers.JSONRenderer
+con la configuración por defecto (UTF-8 sin escapar, separadores compactos,
+U+2028/U+2029 escapados, fechas con "Z").
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+_encoder = encoders.JSONEncoder()
+
+# datetime/date/time pasan por el encoder de DRF (UTC como "Z"); claves no str como json
+_OPCIONES = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        # Con sangría o sin UTF-8 se usa el renderer de DRF tal cual
+        if (self.get_indent(accepted_media_type, renderer_context) is not None
+                or not api_settings.UNICODE_JSON or not api_settings.COMPACT_JSON):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_encoder.default, option=_OPCIONES)
+        # Igual que DRF: escapar los separadores de línea de JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,86 @@
+"""
+Búsqueda de texto completo sobre el catálogo.
+
+Cada película tiene una fila en `peliculas_busqueda` con:
+  - documento: tsvector (config es_unaccent) con pesos
+        A = título, B = géneros/actores/directores, C = descripción
+  - texto: título + nombres sin tildes, para tolerancia a errores con pg_trgm
+
+Ambas columnas tienen índice GIN, así que la consulta no recorre `peliculas`.
+"""
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q
+
+CONFIG = "es_unaccent"
+
+_SQL_REINDEXAR = """
+INSERT INTO peliculas_busqueda (id_pelicula, documento, texto)
+SELECT p.id_pelicula,
+       setweight(to_tsvector('es_unaccent', coalesce(p.titulo, '')), 'A') ||
+       setweight(to_tsvector('es_unaccent', coalesce(n.nombres, '')), 'B') ||
+       setweight(to_tsvector('es_unaccent', coalesce(p.descripcion, '')), 'C'),
+       lower(unaccent(coalesce(p.titulo, '') || ' ' || coalesce(n.nombres, '')))
+FROM peliculas p
+LEFT JOIN LATERAL (
+    SELECT string_agg(t.nombre, ' ') AS nombres
+    FROM (
+        SELECT g.nombre FROM peliculas_generos pg
+        JOIN generos g ON g.id_genero = pg.id_genero
+        WHERE pg.id_pelicula = p.id_pelicula
+        UNION ALL
+        SELECT a.nombre FROM peliculas_actores pa
+        JOIN actores a ON a.id_actor = pa.id_actor
+        WHERE pa.id_pelicula = p.id_pelicula
+        UNION ALL
+        SELECT d.nombre FROM peliculas_directores pd
+        JOIN directores d ON d.id_director = pd.id_director
+        WHERE pd.id_pelicula = p.id_pelicula
+    ) t
+) n ON TRUE
+{where}
+ON CONFLICT (id_pelicula) DO UPDATE
+SET documento = EXCLUDED.documento,
+    texto = EXCLUDED.texto
+"""
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes (equivalente a lower(unaccent(...)) en Postgres)."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower().strip()
+
+
+def reindexar_peliculas(pelicula_ids=None):
+    """
+    Recalcula el documento de búsqueda de las películas indicadas.
+    Sin ids reconstruye el índice completo. Es un único INSERT ... SELECT.
+    """
+    if pelicula_ids is None:
+        sql, params = _SQL_REINDEXAR.format(where=""), []
+    else:
+        ids = [int(x) for x in pelicula_ids]
+        if not ids:
+            return
+        sql, params = _SQL_REINDEXAR.format(where="WHERE p.id_pelicula = ANY(%s)"), [ids]
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+
+
+def buscar(queryset, texto: str, prefijo: str = ""):
+    """
+    Filtra `queryset` por `texto` y anota `relevancia`.
+    Coincide por texto completo (con stemming en español) o por similitud de
+    trigramas a nivel de palabra, lo que tolera errores de tipeo.
+    `prefijo` es la ruta hasta Pelicula (p. ej. "pelicula__" desde CatalogoPelicula).
+    """
+    documento = f"{prefijo}busqueda__documento"
+    texto_plano = f"{prefijo}busqueda__texto"
+    query = SearchQuery(texto, config=CONFIG, search_type="websearch")
+    plano = normalizar(texto)
+    return (queryset
+            .filter(Q(**{documento: query}) | Q(**{f"{texto_plano}__trigram_word_similar": plano}))
+            .annotate(relevancia=SearchRank(F(documento), query)
+                      + TrigramWordSimilarity(plano, texto_plano)))
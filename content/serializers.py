@@ -1,5 +1,11 @@
+import re
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
-from .models import Pelicula, Actor, Director, Genero
+from .models import CatalogoPelicula, Pelicula, Actor, Director, Genero
+from .signals import notificar_cambio_catalogo
 
 class ActorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,12 +42,55 @@ class PeliculaListaSerializer(serializers.ModelSerializer):
         return None
 
 
+# Proyección compacta para grillas (?view=card): sin actores ni directores.
+VISTA_TARJETA = "card"
+
+
+def es_vista_tarjeta(params):
+    """True si la petición pide la proyección de tarjeta (?view=card)."""
+    return (params.get("view") or "").lower() == VISTA_TARJETA
+
+
+class PeliculaTarjetaSerializer(serializers.ModelSerializer):
+    anio = serializers.SerializerMethodField()
+    miniatura = serializers.SerializerMethodField()
+    generos = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Pelicula
+        fields = ("id_pelicula", "titulo", "anio", "clasificacion", "miniatura", "generos")
+
+    def get_anio(self, obj):
+        return obj.fecha_estreno.year if obj.fecha_estreno else None
+
+    def get_miniatura(self, obj):
+        return obj.miniatura.url if obj.miniatura else None
+
+
+def anotar_disponibilidad(queryset):
+    """
+    Anota `calidades` (calidades de video sin trailer, ordenadas) y
+    `tiene_trailer` en un queryset de Pelicula con dos subconsultas, para que
+    PeliculaDetalleSerializer(many=True) no consulte media_assets por película.
+    """
+    from uploader.models import MediaAsset
+
+    videos = MediaAsset.objects.filter(pelicula=OuterRef("pk"), es_trailer=False)
+    trailers = MediaAsset.objects.filter(pelicula=OuterRef("pk"), es_trailer=True)
+    return queryset.annotate(
+        calidades=ArraySubquery(videos.order_by("calidad").values("calidad").distinct()),
+        tiene_trailer=Exists(trailers),
+    )
+
+
 class PeliculaDetalleSerializer(serializers.ModelSerializer):
     # Para lectura (GET)
     actores_detalle = ActorSerializer(source='actores', many=True, read_only=True)
     directores_detalle = DirectorSerializer(source='directores', many=True, read_only=True)
     generos_detalle = GeneroSerializer(source='generos', many=True, read_only=True)
     tiene_video = serializers.SerializerMethodField()
+    calidades = serializers.SerializerMethodField()
+    tiene_trailer = serializers.SerializerMethodField()
 
     # Para escritura (POST/PUT)
     actores = serializers.PrimaryKeyRelatedField(
@@ -68,6 +117,7 @@ class PeliculaDetalleSerializer(serializers.ModelSerializer):
         fields = (
             "id_pelicula", "titulo", "descripcion", "fecha_estreno",
             "duracion", "clasificacion", "miniatura", "tiene_video",
+            "calidades", "tiene_trailer",
             "actores", "directores", "generos",
             "actores_detalle", "directores_detalle", "generos_detalle"
         )
@@ -75,9 +125,22 @@ class PeliculaDetalleSerializer(serializers.ModelSerializer):
             'miniatura': {'required': False}
         }
 
+    # Sin anotar (p. ej. tras crear/actualizar) se consulta media_assets; ver anotar_disponibilidad
     def get_tiene_video(self, obj):
         """Verifica si la película tiene al menos un asset de video disponible"""
-        return obj.assets.filter(es_trailer=False).exists()
+        return bool(self.get_calidades(obj))
+
+    def get_calidades(self, obj):
+        if getattr(obj, "calidades", None) is None:
+            obj.calidades = sorted(set(
+                obj.assets.filter(es_trailer=False).values_list("calidad", flat=True)
+            ))
+        return obj.calidades
+
+    def get_tiene_trailer(self, obj):
+        if getattr(obj, "tiene_trailer", None) is None:
+            obj.tiene_trailer = obj.assets.filter(es_trailer=True).exists()
+        return obj.tiene_trailer
 
     def create(self, validated_data):
         actores_data = validated_data.pop('actores', [])
@@ -103,6 +166,7 @@ class PeliculaDetalleSerializer(serializers.ModelSerializer):
             pelicula.generos.set(generos_data)
 
         print("Relaciones asignadas")
+        notificar_cambio_catalogo(Pelicula, [pelicula.id_pelicula])
         return pelicula
 
     def update(self, instance, validated_data):
@@ -123,6 +187,7 @@ class PeliculaDetalleSerializer(serializers.ModelSerializer):
         if generos_data is not None:
             instance.generos.set(generos_data)
 
+        notificar_cambio_catalogo(Pelicula, [instance.id_pelicula])
         return instance
 
     def to_representation(self, instance):
@@ -139,3 +204,154 @@ class PeliculaDetalleSerializer(serializers.ModelSerializer):
             representation['miniatura'] = None
 
         return representation
+
+
+# ===== Modelo de lectura (catalogo_peliculas) =====
+# Mismo JSON que los serializers de Pelicula, pero sin tocar las tablas puente.
+# Rutas que FileSystemStorage.url() deja intactas (sin caracteres a escapar
+# ni segmentos "." / ".."): su URL es base_url + ruta, sin urljoin.
+_RUTA_SIMPLE = re.compile(r"[\w\-]+(?:\.[\w\-]+)*(?:/[\w\-]+(?:\.[\w\-]+)*)*", re.ASCII)
+
+
+def resolvedor_miniaturas():
+    """
+    Función nombre -> URL de miniatura, con el storage resuelto una sola vez
+    (útil para convertir muchas filas seguidas).
+    """
+    storage = Pelicula._meta.get_field("miniatura").storage
+    base_url = storage.base_url
+    directa = isinstance(storage, FileSystemStorage) and base_url.endswith("/")
+    url = storage.url
+
+    def resolver(nombre):
+        if not nombre:
+            return None
+        if directa and _RUTA_SIMPLE.fullmatch(nombre):
+            return base_url + nombre
+        return url(nombre)
+    return resolver
+
+
+def url_miniatura(nombre):
+    """URL relativa de la miniatura a partir de la ruta guardada en el storage."""
+    return resolvedor_miniaturas()(nombre)
+
+
+def _relacionados(ids, nombres, clave):
+    return [{clave: i, "nombre": n} for i, n in zip(ids, nombres)]
+
+
+class CatalogoBaseSerializer(serializers.ModelSerializer):
+    id_pelicula = serializers.IntegerField(source="pelicula_id", read_only=True)
+    generos = serializers.SerializerMethodField()
+    actores = serializers.SerializerMethodField()
+    directores = serializers.SerializerMethodField()
+    miniatura = serializers.SerializerMethodField()
+
+    def get_generos(self, obj):
+        return _relacionados(obj.genero_ids, obj.genero_nombres, "id_genero")
+
+    def get_actores(self, obj):
+        return _relacionados(obj.actor_ids, obj.actor_nombres, "id_actor")
+
+    def get_directores(self, obj):
+        return _relacionados(obj.director_ids, obj.director_nombres, "id_director")
+
+    def get_miniatura(self, obj):
+        return url_miniatura(obj.miniatura)
+
+
+class CatalogoListaSerializer(CatalogoBaseSerializer):
+    """Equivalente a PeliculaListaSerializer."""
+    class Meta:
+        model = CatalogoPelicula
+        fields = ("id_pelicula", "titulo", "clasificacion", "fecha_estreno", "generos", "actores", "directores", "miniatura")
+
+
+class CatalogoDetalleSerializer(CatalogoBaseSerializer):
+    """Equivalente a la representación de lectura de PeliculaDetalleSerializer."""
+    class Meta:
+        model = CatalogoPelicula
+        fields = (
+            "id_pelicula", "titulo", "descripcion", "fecha_estreno",
+            "duracion", "clasificacion", "miniatura", "tiene_video",
+            "actores", "directores", "generos",
+        )
+
+
+class CatalogoTarjetaSerializer(serializers.ModelSerializer):
+    """Equivalente a PeliculaTarjetaSerializer (?view=card)."""
+    id_pelicula = serializers.IntegerField(source="pelicula_id", read_only=True)
+    anio = serializers.SerializerMethodField()
+    miniatura = serializers.SerializerMethodField()
+    generos = serializers.ListField(source="genero_ids", child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = CatalogoPelicula
+        fields = ("id_pelicula", "titulo", "anio", "clasificacion", "miniatura", "generos")
+
+    def get_anio(self, obj):
+        return obj.fecha_estreno.year if obj.fecha_estreno else None
+
+    def get_miniatura(self, obj):
+        return url_miniatura(obj.miniatura)
+
+
+# ===== Ruta rápida de solo lectura =====
+# Construye el mismo dict que los serializers de arriba directamente desde
+# filas de `.values()`, sin instanciar modelos ni recorrer campos de DRF.
+# tests.py comprueba que el JSON resultante es idéntico byte a byte.
+CAMPOS_LISTA_RAPIDA = (
+    "pelicula_id", "titulo", "clasificacion", "fecha_estreno",
+    "genero_ids", "genero_nombres", "actor_ids", "actor_nombres",
+    "director_ids", "director_nombres", "miniatura",
+)
+CAMPOS_TARJETA_RAPIDA = ("pelicula_id", "titulo", "fecha_estreno", "clasificacion", "miniatura", "genero_ids")
+
+
+def _fecha(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def catalogo_lista_rapida(filas):
+    """Equivalente a CatalogoListaSerializer(..., many=True).data para filas de values(*CAMPOS_LISTA_RAPIDA)."""
+    miniatura = resolvedor_miniaturas()
+    return [
+        {
+            "id_pelicula": fila["pelicula_id"],
+            "titulo": fila["titulo"],
+            "clasificacion": fila["clasificacion"],
+            "fecha_estreno": _fecha(fila["fecha_estreno"]),
+            "generos": [{"id_genero": i, "nombre": n} for i, n in zip(fila["genero_ids"], fila["genero_nombres"])],
+            "actores": [{"id_actor": i, "nombre": n} for i, n in zip(fila["actor_ids"], fila["actor_nombres"])],
+            "directores": [{"id_director": i, "nombre": n}
+                           for i, n in zip(fila["director_ids"], fila["director_nombres"])],
+            "miniatura": miniatura(fila["miniatura"]),
+        }
+        for fila in filas
+    ]
+
+
+def catalogo_tarjeta_rapida(filas):
+    """Equivalente a CatalogoTarjetaSerializer(..., many=True).data para filas de values(*CAMPOS_TARJETA_RAPIDA)."""
+    miniatura = resolvedor_miniaturas()
+    return [
+        {
+            "id_pelicula": fila["pelicula_id"],
+            "titulo": fila["titulo"],
+            "anio": fila["fecha_estreno"].year if fila["fecha_estreno"] else None,
+            "clasificacion": fila["clasificacion"],
+            "miniatura": miniatura(fila["miniatura"]),
+            "generos": list(fila["genero_ids"]),
+        }
+        for fila in filas
+    ]
+
+
+def valores_simples(queryset, serializer_class):
+    """
+    Filas de Actor/Director/Genero como las devuelve su serializer
+    ('__all__': solo columnas simples, con el mismo nombre y orden).
+    """
+    campos = [f.attname for f in serializer_class.Meta.model._meta.concrete_fields]
+    return list(queryset.values(*campos))
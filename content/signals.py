@@ -0,0 +1,76 @@
+from django.db import connection
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Actor, CatalogoVersion, Director, Genero, Pelicula
+from . import catalogo, search
+
+# Se emite cuando cambia algo visible del catálogo (película o sus relaciones).
+# kwargs: pelicula_ids -> lista de ids afectados (puede venir vacía)
+catalogo_modificado = Signal()
+
+# tabla puente y columna de cada entidad relacionada
+_PUENTES = {
+    Actor: ("peliculas_actores", "id_actor"),
+    Director: ("peliculas_directores", "id_director"),
+    Genero: ("peliculas_generos", "id_genero"),
+}
+
+
+def notificar_cambio_catalogo(sender, pelicula_ids=()):
+    """Avisa a los índices derivados del catálogo que deben actualizarse."""
+    catalogo_modificado.send(sender=sender, pelicula_ids=[int(x) for x in pelicula_ids])
+
+
+def _peliculas_de(instance):
+    tabla, columna = _PUENTES[type(instance)]
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT id_pelicula FROM {tabla} WHERE {columna} = %s",
+            [instance.pk],
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+# ---------------------- Receptores ----------------------
+@receiver(catalogo_modificado)
+def reindexar_busqueda(sender, pelicula_ids, **kwargs):
+    search.reindexar_peliculas(pelicula_ids)
+
+
+@receiver(catalogo_modificado)
+def refrescar_modelo_lectura(sender, pelicula_ids, **kwargs):
+    catalogo.refrescar_catalogo(pelicula_ids)
+
+
+@receiver(catalogo_modificado)
+def incrementar_version(sender, **kwargs):
+    # invalida los ETag de las vistas de lectura del catálogo
+    CatalogoVersion.incrementar()
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Director)
+@receiver(post_save, sender=Genero)
+def relacionado_guardado(sender, instance, created, **kwargs):
+    # un renombre cambia el texto buscable de todas sus películas
+    notificar_cambio_catalogo(sender, [] if created else _peliculas_de(instance))
+
+
+@receiver(pre_delete, sender=Actor)
+@receiver(pre_delete, sender=Director)
+@receiver(pre_delete, sender=Genero)
+def relacionado_por_borrar(sender, instance, **kwargs):
+    instance._peliculas_afectadas = _peliculas_de(instance)
+
+
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Director)
+@receiver(post_delete, sender=Genero)
+def relacionado_borrado(sender, instance, **kwargs):
+    notificar_cambio_catalogo(sender, getattr(instance, "_peliculas_afectadas", []))
+
+
+@receiver(post_delete, sender=Pelicula)
+def pelicula_borrada(sender, instance, **kwargs):
+    notificar_cambio_catalogo(sender, [instance.pk])
@@ -1,3 +1,87 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from .models import Actor, CatalogoPelicula, Director, Genero, Pelicula
+from .renderers import ORJSONRenderer
+from .serializers import (
+    ActorSerializer, CatalogoListaSerializer, CatalogoTarjetaSerializer,
+    DirectorSerializer, GeneroSerializer,
+    CAMPOS_LISTA_RAPIDA, CAMPOS_TARJETA_RAPIDA, catalogo_lista_rapida, catalogo_tarjeta_rapida,
+    url_miniatura,
+)
+
+
+def _catalogo(**kwargs):
+    datos = {
+        "pelicula_id": 1, "titulo": "Volver", "descripcion": "", "clasificacion": "R",
+        "fecha_estreno": date(2006, 3, 17), "estreno_orden": date(2006, 3, 17),
+        "miniatura": "peliculas/miniaturas/volver.jpg",
+        "genero_ids": [2, 3], "genero_nombres": ["Drama", "Comedia"],
+        "actor_ids": [3], "actor_nombres": ["Penélope Cruz"],
+        "director_ids": [2], "director_nombres": ["Pedro Almodóvar"],
+    }
+    datos.update(kwargs)
+    return CatalogoPelicula(**datos)
+
+
+class RutaRapidaEquivalenciaTests(SimpleTestCase):
+    """La ruta rápida (values() + orjson) debe dar los mismos bytes que los serializers + JSONRenderer."""
+
+    peliculas = [
+        _catalogo(),
+        _catalogo(pelicula_id=2, titulo='Comillas "dobles" \\ y\nsalto', fecha_estreno=None,
+                  clasificacion=None, miniatura=None,
+                  genero_ids=[], genero_nombres=[], actor_ids=[], actor_nombres=[],
+                  director_ids=[], director_nombres=[]),
+        _catalogo(pelicula_id=3, titulo="Separadores \u2028 y \u2029 · 東京 · 🎬",
+                  miniatura="peliculas/miniaturas/con espacio ñ.png"),
+    ]
+
+    def assertMismosBytes(self, esperado, obtenido):
+        self.assertEqual(JSONRenderer().render(esperado), ORJSONRenderer().render(obtenido))
+
+    @staticmethod
+    def _fila(instancia, campos):
+        return {campo: getattr(instancia, campo) for campo in campos}
+
+    def test_lista(self):
+        esperado = CatalogoListaSerializer(self.peliculas, many=True).data
+        obtenido = catalogo_lista_rapida([self._fila(p, CAMPOS_LISTA_RAPIDA) for p in self.peliculas])
+        self.assertMismosBytes(esperado, obtenido)
+
+    def test_tarjeta(self):
+        esperado = CatalogoTarjetaSerializer(self.peliculas, many=True).data
+        obtenido = catalogo_tarjeta_rapida([self._fila(p, CAMPOS_TARJETA_RAPIDA) for p in self.peliculas])
+        self.assertMismosBytes(esperado, obtenido)
+
+    def test_entidades_simples(self):
+        for modelo, serializer_class, pk in (
+            (Actor, ActorSerializer, "id_actor"),
+            (Director, DirectorSerializer, "id_director"),
+            (Genero, GeneroSerializer, "id_genero"),
+        ):
+            instancias = [modelo(**{pk: 1, "nombre": "Ñandú"}), modelo(**{pk: 2, "nombre": "a\u2028b"})]
+            esperado = serializer_class(instancias, many=True).data
+            campos = [f.attname for f in modelo._meta.concrete_fields]
+            self.assertMismosBytes(esperado, [self._fila(i, campos) for i in instancias])
+
+    def test_url_miniatura_igual_al_storage(self):
+        storage = Pelicula._meta.get_field("miniatura").storage
+        for nombre in (
+            "peliculas/miniaturas/volver.jpg", "a.b.c/d_e-f.PNG", "con espacio ñ.png",
+            "a/./b.jpg", "a/../b.jpg", ".oculto", "a//b.jpg", "/abs.jpg", "x:y.jpg", "q?.jpg#f",
+        ):
+            self.assertEqual(url_miniatura(nombre), storage.url(nombre), nombre)
+
+    def test_paginado_y_errores(self):
+        # la respuesta paginada y los errores de validación también pasan por el renderer
+        from collections import OrderedDict
+        from rest_framework.exceptions import ErrorDetail
+
+        datos = OrderedDict([("next", None), ("previous", "http://x/?cursor=ab"), ("results", [])])
+        self.assertMismosBytes(datos, datos)
+        errores = {"genero_id": ErrorDetail("Debe ser un número entero.", code="invalid")}
+        self.assertMismosBytes(errores, errores)
+        self.assertEqual(ORJSONRenderer().render(None), b"")
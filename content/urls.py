@@ -3,6 +3,8 @@ from .views import (
     ListaPeliculasView,
     DetallePeliculaView,
     FiltrosView,
+    FacetasView,
+    BatchPeliculasView,
     ListaActoresView,
     ListaDirectoresView,
     ListaGenerosView
@@ -10,6 +12,8 @@ from .views import (
 
 urlpatterns = [
     path("peliculas/", ListaPeliculasView.as_view(), name="lista-peliculas"),
+    path("peliculas/batch/", BatchPeliculasView.as_view(), name="batch-peliculas"),
+    path("peliculas/facetas/", FacetasView.as_view(), name="facetas-peliculas"),
     path("peliculas/<int:id_pelicula>/", DetallePeliculaView.as_view(), name="detalle-pelicula"),
     path("filtros/", FiltrosView.as_view(), name="filtros"),
     path("actores/", ListaActoresView.as_view(), name="lista-actores"),
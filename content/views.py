@@ -1,84 +1,268 @@
-from rest_framework import generics, permissions
+from django.db.models import Q
+from django.utils.http import parse_etags
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Q
-from .models import Pelicula, Genero, Actor, Director
-from .serializers import PeliculaListaSerializer, PeliculaDetalleSerializer, GeneroSerializer, ActorSerializer, DirectorSerializer
+from .models import CatalogoPelicula, CatalogoVersion, Genero, Actor, Director
+from .pagination import KeysetCursorPagination
+from .renderers import ORJSONRenderer
+from . import catalogo, search
+from .serializers import (
+    CatalogoListaSerializer, CatalogoDetalleSerializer, CatalogoTarjetaSerializer,
+    GeneroSerializer, ActorSerializer, DirectorSerializer,
+    CAMPOS_LISTA_RAPIDA, CAMPOS_TARJETA_RAPIDA, catalogo_lista_rapida, catalogo_tarjeta_rapida,
+    es_vista_tarjeta, valores_simples,
+)
 from subscriptions.permissions import EsSuscriptorActivo  # tu permiso
 
-class ListaPeliculasView(generics.ListAPIView):
+
+class _NoModificado(Exception):
+    pass
+
+
+class CatalogoETagMixin:
+    """
+    ETag fuerte derivado de CatalogoVersion para vistas de solo lectura.
+    Tras autenticar y validar permisos compara If-None-Match; si coincide
+    responde 304 sin ejecutar ninguna consulta del catálogo.
+    """
+    catalogo_etag = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD"):
+            return
+        self.catalogo_etag = f'"catalogo-{CatalogoVersion.actual()}"'
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if self.catalogo_etag in if_none_match or "*" in if_none_match:
+            raise _NoModificado()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NoModificado):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.catalogo_etag and response.status_code in (200, 304):
+            response["ETag"] = self.catalogo_etag
+            # el navegador puede guardarla, pero debe revalidar en cada uso
+            response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+def _param_entero(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValidationError({nombre: "Debe ser un número entero."})
+
+
+def condiciones_catalogo(params):
+    """
+    Condición de cada filtro por dimensión presente en `params`
+    (genero, actor, director, anio) sobre CatalogoPelicula.
+    """
+    condiciones = {}
+
+    genero_id = _param_entero(params, "genero_id")
+    if genero_id is not None:
+        condiciones["genero"] = Q(genero_ids__contains=[genero_id])
+
+    actor_id = _param_entero(params, "actor_id")
+    if actor_id is not None:
+        condiciones["actor"] = Q(actor_ids__contains=[actor_id])
+
+    director_id = _param_entero(params, "director_id")
+    if director_id is not None:
+        condiciones["director"] = Q(director_ids__contains=[director_id])
+
+    anio = _param_entero(params, "anio")
+    if anio is not None:
+        condiciones["anio"] = Q(fecha_estreno__year=anio)
+
+    return condiciones
+
+
+def filtrar_catalogo(qs, params):
+    """
+    Aplica los filtros del catálogo (q, genero_id, actor_id, director_id, anio)
+    sobre un queryset de CatalogoPelicula. Con `q` anota `relevancia`.
+    """
+    q = params.get("q", "").strip()
+    if q:
+        qs = search.buscar(qs, q, prefijo="pelicula__")
+
+    for condicion in condiciones_catalogo(params).values():
+        qs = qs.filter(condicion)
+
+    return qs
+
+
+class ListaPeliculasView(CatalogoETagMixin, generics.ListAPIView):
     """
     GET /api/contenido/peliculas/
     Filtros (query params):
-      - q (busca en título/descr)
+      - q (búsqueda de texto completo en título, descripción, géneros,
+           actores y directores; resultados ordenados por relevancia)
       - genero_id
       - actor_id
       - director_id
       - anio (fecha_estreno__year)
+    Paginación por cursor:
+      - cursor (opaco, viene en los links next/previous)
+      - page_size (por defecto CATALOGO_PAGE_SIZE, máx. 100)
+    Proyección:
+      - view=card -> solo id, título, año, clasificación, miniatura e ids de géneros
+    Lee del modelo de lectura (catalogo_peliculas): una consulta por página.
+    Ruta rápida: filas de values() convertidas a dict sin pasar por los
+    serializers (mismo JSON que CatalogoLista/TarjetaSerializer) y orjson.
     """
-    serializer_class = PeliculaListaSerializer
+    serializer_class = CatalogoListaSerializer
     permission_classes = [permissions.IsAuthenticated, EsSuscriptorActivo]
+    pagination_class = KeysetCursorPagination
+    renderer_classes = [ORJSONRenderer]
 
-    def get_queryset(self):
-        qs = (Pelicula.objects
-              .all()
-              .prefetch_related("generos", "actores", "directores"))
-
-        q = self.request.query_params.get("q")
-        if q:
-            qs = qs.filter(Q(titulo__icontains=q) | Q(descripcion__icontains=q))
+    def get_serializer_class(self):
+        if es_vista_tarjeta(self.request.query_params):
+            return CatalogoTarjetaSerializer
+        return CatalogoListaSerializer
 
-        genero_id = self.request.query_params.get("genero_id")
-        if genero_id:
-            qs = qs.filter(generos__id_genero=genero_id)
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if es_vista_tarjeta(request.query_params):
+            campos, a_dicts = CAMPOS_TARJETA_RAPIDA, catalogo_tarjeta_rapida
+        else:
+            campos, a_dicts = CAMPOS_LISTA_RAPIDA, catalogo_lista_rapida
+        # la paginación por cursor necesita también las columnas del orden
+        orden = [campo.lstrip("-") for campo in queryset.query.order_by]
+        filas = self.paginate_queryset(queryset.values(*dict.fromkeys([*campos, *orden])))
+        return self.get_paginated_response(a_dicts(filas))
 
-        actor_id = self.request.query_params.get("actor_id")
-        if actor_id:
-            qs = qs.filter(actores__id_actor=actor_id)
+    def get_queryset(self):
+        qs = filtrar_catalogo(CatalogoPelicula.objects.all(), self.request.query_params)
 
-        director_id = self.request.query_params.get("director_id")
-        if director_id:
-            qs = qs.filter(directores__id_director=director_id)
+        # Orden total (termina en la PK) para la paginación por cursor
+        orden = ["-estreno_orden", "titulo", "pelicula_id"]
+        if "relevancia" in qs.query.annotations:
+            # Con búsqueda se ordena por relevancia
+            orden.insert(0, "-relevancia")
+        return qs.order_by(*orden)
 
-        anio = self.request.query_params.get("anio")
-        if anio:
-            qs = qs.filter(fecha_estreno__year=anio)
 
-        return qs.distinct().order_by("-fecha_estreno", "titulo")
+class DetallePeliculaView(CatalogoETagMixin, generics.RetrieveAPIView):
+    """
+    GET /api/contenido/peliculas/<id_pelicula>/
+    """
+    queryset = CatalogoPelicula.objects.all()
+    serializer_class = CatalogoDetalleSerializer
+    permission_classes = [permissions.IsAuthenticated, EsSuscriptorActivo]
+    lookup_field = "pelicula_id"
+    lookup_url_kwarg = "id_pelicula"
 
 
-class DetallePeliculaView(generics.RetrieveAPIView):
+class BatchPeliculasView(CatalogoETagMixin, APIView):
     """
-    GET /api/contenido/peliculas/<id_pelicula>/
+    GET /api/contenido/peliculas/batch/?ids=1,2,3
+    Detalle de varias películas en una sola respuesta (máx. `max_ids`).
+    Respuesta:
+      - peliculas: {id_pelicula: detalle}
+      - faltantes: ids pedidos que no existen
+    Una sola consulta al modelo de lectura, sin importar cuántos ids.
     """
-    queryset = (Pelicula.objects
-                .all()
-                .prefetch_related("generos", "actores", "directores"))
-    serializer_class = PeliculaDetalleSerializer
     permission_classes = [permissions.IsAuthenticated, EsSuscriptorActivo]
-    lookup_field = "id_pelicula"
+    max_ids = 300
+
+    def get(self, request):
+        ids = []
+        for valor in request.query_params.getlist("ids"):
+            for parte in valor.split(","):
+                parte = parte.strip()
+                if not parte:
+                    continue
+                try:
+                    ids.append(int(parte))
+                except ValueError:
+                    raise ValidationError({"ids": "Debe ser una lista de enteros separados por comas."})
+        ids = list(dict.fromkeys(ids))  # sin duplicados, conservando el orden
+        if not ids:
+            raise ValidationError({"ids": "Indica al menos un id."})
+        if len(ids) > self.max_ids:
+            raise ValidationError({"ids": f"Máximo {self.max_ids} ids por petición."})
+
+        peliculas = CatalogoPelicula.objects.filter(pelicula_id__in=ids)
+        encontradas = {p["id_pelicula"]: p for p in CatalogoDetalleSerializer(peliculas, many=True).data}
+
+        return Response({
+            "peliculas": {pid: encontradas[pid] for pid in ids if pid in encontradas},
+            "faltantes": [pid for pid in ids if pid not in encontradas],
+        })
 
 
-class FiltrosView(APIView):
+class FiltrosView(CatalogoETagMixin, APIView):
     """
     GET /api/contenido/filtros/
     Retorna listas de géneros, actores y directores para los filtros
     """
     permission_classes = [permissions.IsAuthenticated, EsSuscriptorActivo]
+    renderer_classes = [ORJSONRenderer]
 
     def get(self, request):
         generos = Genero.objects.all().order_by('nombre')
         actores = Actor.objects.all().order_by('nombre')
         directores = Director.objects.all().order_by('nombre')
 
+        # Ruta rápida: mismo JSON que los serializers, desde values()
         return Response({
-            'generos': GeneroSerializer(generos, many=True).data,
-            'actores': ActorSerializer(actores, many=True).data,
-            'directores': DirectorSerializer(directores, many=True).data,
+            'generos': valores_simples(generos, GeneroSerializer),
+            'actores': valores_simples(actores, ActorSerializer),
+            'directores': valores_simples(directores, DirectorSerializer),
         })
 
 
-class ListaActoresView(generics.ListAPIView):
+class ValoresSimplesListMixin:
+    """list() de solo lectura que arma las filas con values() (ver valores_simples)."""
+    renderer_classes = [ORJSONRenderer]
+
+    def list(self, request, *args, **kwargs):
+        return Response(valores_simples(self.get_queryset(), self.get_serializer_class()))
+
+
+class FacetasView(CatalogoETagMixin, APIView):
+    """
+    GET /api/contenido/peliculas/facetas/
+    Conteo de películas por género, año, clasificación y top de actores y
+    directores para el estado actual de los filtros.
+    Query params: los mismos filtros que /peliculas/ (q, genero_id, actor_id,
+    director_id, anio) y `top` (actores/directores a devolver, por defecto 20, máx. 100).
+
+    Los conteos de cada dimensión ignoran su propio filtro (conteo disyuntivo):
+    con genero_id=3, "generos" dice cuántas películas habría eligiendo cada
+    otro género. Un valor ausente significa 0 resultados.
+    Se calcula en una sola consulta sobre catalogo_peliculas.
+    """
+    permission_classes = [permissions.IsAuthenticated, EsSuscriptorActivo]
+    top_por_defecto = 20
+    top_maximo = 100
+
+    def get(self, request):
+        params = request.query_params
+        qs = CatalogoPelicula.objects.all()
+        q = params.get("q", "").strip()
+        if q:
+            qs = search.buscar(qs, q, prefijo="pelicula__")
+
+        top = _param_entero(params, "top") or self.top_por_defecto
+        top = max(1, min(top, self.top_maximo))
+
+        return Response(catalogo.contar_facetas(qs, condiciones_catalogo(params), top=top))
+
+
+class ListaActoresView(CatalogoETagMixin, ValoresSimplesListMixin, generics.ListAPIView):
     """
     GET /api/contenido/actores/
     Lista todos los actores
@@ -88,7 +272,7 @@ class ListaActoresView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class ListaDirectoresView(generics.ListAPIView):
+class ListaDirectoresView(CatalogoETagMixin, ValoresSimplesListMixin, generics.ListAPIView):
     """
     GET /api/contenido/directores/
     Lista todos los directores
@@ -98,7 +282,7 @@ class ListaDirectoresView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class ListaGenerosView(generics.ListAPIView):
+class ListaGenerosView(CatalogoETagMixin, ValoresSimplesListMixin, generics.ListAPIView):
     """
     GET /api/contenido/generos/
     Lista todos los géneros
@@ -22,4 +22,16 @@ END
 fi
 
 python manage.py migrate --noinput
-python manage.py runserver 0.0.0.0:8000
+
+# SERVIDOR=asgi (por defecto): uvicorn sobre backend.asgi, el streaming de video
+#   no ocupa un hilo por espectador. UVICORN_WORKERS procesos, UVICORN_RELOAD=1 para desarrollo.
+# SERVIDOR=runserver: servidor de desarrollo de Django (WSGI).
+if [ "${SERVIDOR:-asgi}" = "runserver" ]; then
+  exec python manage.py runserver 0.0.0.0:8000
+fi
+
+UVICORN_ARGS="--host 0.0.0.0 --port 8000 --workers ${UVICORN_WORKERS:-1}"
+if [ "${UVICORN_RELOAD:-0}" = "1" ]; then
+  UVICORN_ARGS="--host 0.0.0.0 --port 8000 --reload"
+fi
+exec uvicorn backend.asgi:application $UVICORN_ARGS
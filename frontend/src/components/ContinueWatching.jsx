@@ -6,9 +6,10 @@ import { useProfile } from '../context/ProfileContext';
 import ContinueWatchingSkeleton from './ContinueWatchingSkeleton';
 import './ContinueWatching.css';
 
-const ContinueWatching = () => {
-  const [movies, setMovies] = useState([]);
-  const [loading, setLoading] = useState(true);
+// initialMovies: filas ya cargadas (p. ej. por el home feed); evita pedirlas de nuevo
+const ContinueWatching = ({ initialMovies = null }) => {
+  const [movies, setMovies] = useState(initialMovies || []);
+  const [loading, setLoading] = useState(!initialMovies);
   const [scrollX, setScrollX] = useState(0);
   const [selectedMovie, setSelectedMovie] = useState(null);
   const rowRef = useRef(null);
@@ -28,7 +29,7 @@ const ContinueWatching = () => {
   };
 
   useEffect(() => {
-    if (activeProfile) {
+    if (activeProfile && !initialMovies) {
       loadHistory();
     }
   }, [activeProfile]);
@@ -42,14 +43,15 @@ const ContinueWatching = () => {
       });
 
       if (historyData.items && historyData.items.length > 0) {
-        // Obtener detalles de las películas
-        const moviePromises = historyData.items.map(item =>
-          movieService.getMovieDetail(item.pelicula_id).catch(() => null)
+        // Obtener detalles de las películas (una sola petición)
+        const { peliculas } = await movieService.getMoviesBatch(
+          historyData.items.map(item => item.pelicula_id)
         );
-        const movieDetails = await Promise.all(moviePromises);
 
         // Filtrar películas que se cargaron correctamente
-        const validMovies = movieDetails.filter(movie => movie !== null);
+        const validMovies = historyData.items
+          .map(item => peliculas[item.pelicula_id])
+          .filter(movie => movie !== undefined);
         setMovies(validMovies);
       }
     } catch (error) {
@@ -4,16 +4,19 @@ import api from '../services/api';
 import { movieService } from '../services/movies';
 import './Recommendations.css';
 
-const Recommendations = () => {
-  const [recommendations, setRecommendations] = useState([]);
-  const [loading, setLoading] = useState(true);
+// initialRecommendations: ya cargadas (p. ej. por el home feed); evita pedirlas de nuevo
+const Recommendations = ({ initialRecommendations = null }) => {
+  const [recommendations, setRecommendations] = useState(initialRecommendations || []);
+  const [loading, setLoading] = useState(!initialRecommendations);
   const [scrollX, setScrollX] = useState(0);
   const [selectedMovie, setSelectedMovie] = useState(null);
   const rowRef = useRef(null);
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetchRecommendations();
+    if (!initialRecommendations) {
+      fetchRecommendations();
+    }
   }, []);
 
   const fetchRecommendations = async () => {
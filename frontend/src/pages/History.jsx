@@ -45,21 +45,12 @@ const History = () => {
 
       setHistory(data.items || []);
 
-      // Cargar detalles de películas únicas
-      const uniqueMovieIds = [...new Set(data.items.map(item => item.pelicula_id))];
-      const movieDetailsPromises = uniqueMovieIds.map(id =>
-        movieService.getMovieDetail(id).catch(() => null)
+      // Cargar detalles de películas únicas (una sola petición)
+      const { peliculas } = await movieService.getMoviesBatch(
+        (data.items || []).map(item => item.pelicula_id)
       );
 
-      const movieDetails = await Promise.all(movieDetailsPromises);
-      const moviesMap = {};
-      movieDetails.forEach(movie => {
-        if (movie) {
-          moviesMap[movie.id_pelicula] = movie;
-        }
-      });
-
-      setMovies(moviesMap);
+      setMovies(peliculas);
     } catch (error) {
       console.error('Error cargando historial:', error);
       toast.error('Error al cargar el historial');
@@ -1,6 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { movieService } from '../services/movies';
+import { historyService } from '../services/history';
 import ContinueWatching from '../components/ContinueWatching';
 import ContinueWatchingSkeleton from '../components/ContinueWatchingSkeleton';
 import Recommendations from '../components/Recommendations';
@@ -17,46 +18,69 @@ const Home = () => {
   const [noSubscription, setNoSubscription] = useState(false);
   const [selectedMovie, setSelectedMovie] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
-  const [allMovies, setAllMovies] = useState([]);
+  // Resultados de la búsqueda en el servidor (null = todavía no llegaron)
+  const [searchResults, setSearchResults] = useState(null);
+  const [searchNext, setSearchNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const busquedaRef = useRef(''); // término de la búsqueda en curso
   const [filterType, setFilterType] = useState('titulo'); // titulo, genero, director, actor
+  const [continueWatching, setContinueWatching] = useState(null);
+  const [recommendations, setRecommendations] = useState(null);
   const [showFilters, setShowFilters] = useState(false);
 
   useEffect(() => {
     loadContent();
   }, []);
 
+  // Búsqueda de texto completo en todo el catálogo (ordenada por relevancia),
+  // no solo en las películas de las filas del home
+  useEffect(() => {
+    const term = searchTerm.trim();
+    busquedaRef.current = term;
+    setSearchResults(null);
+    setSearchNext(null);
+    if (!term) return;
+
+    let cancelado = false;
+    const timer = setTimeout(async () => {
+      try {
+        const page = await movieService.getMovies({ q: term });
+        if (cancelado) return;
+        setSearchResults(page.results);
+        setSearchNext(page.next);
+      } catch (error) {
+        console.error('Error buscando películas:', error);
+        if (!cancelado) setSearchResults([]);
+      }
+    }, 300);
+
+    return () => {
+      cancelado = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   const loadContent = async () => {
     try {
       setLoading(true);
       setError('');
       setNoSubscription(false);
 
-      // Cargar géneros primero
-      const filtersData = await movieService.getFilters();
-      setGeneros(filtersData.generos || []);
+      // Todas las filas del home en una sola petición
+      const feed = await historyService.getHomeFeed();
+      setGeneros(feed.filtros.generos || []);
+      setContinueWatching(feed.continuar_viendo || []);
+      setRecommendations(feed.recomendaciones || []);
 
-      // Cargar películas por género y recopilar todas las películas
+      // Películas por género
       const moviesByGenreTemp = {};
-      const allMoviesTemp = [];
-
-      for (const genero of filtersData.generos) {
-        const movies = await movieService.getMovies({ genero_id: genero.id_genero });
-        if (movies.length > 0) {
-          moviesByGenreTemp[genero.id_genero] = {
-            nombre: genero.nombre,
-            peliculas: movies,
-          };
-          // Agregar películas a la lista general (evitar duplicados)
-          movies.forEach(movie => {
-            if (!allMoviesTemp.find(m => m.id_pelicula === movie.id_pelicula)) {
-              allMoviesTemp.push(movie);
-            }
-          });
-        }
+      for (const fila of feed.filas_generos) {
+        moviesByGenreTemp[fila.id_genero] = {
+          nombre: fila.nombre,
+          peliculas: fila.peliculas,
+        };
       }
-
       setMoviesByGenre(moviesByGenreTemp);
-      setAllMovies(allMoviesTemp);
     } catch (error) {
       console.error('Error cargando contenido:', error);
 
@@ -99,21 +123,39 @@ const Home = () => {
     setSearchTerm('');
   };
 
+  // Siguiente página de resultados (paginación por cursor)
+  const loadMoreResults = async () => {
+    const term = searchTerm.trim();
+    try {
+      setLoadingMore(true);
+      const page = await movieService.getMovies({ q: term, cursor: searchNext });
+      if (busquedaRef.current !== term) return; // cambió la búsqueda mientras tanto
+      setSearchResults(prev => [...(prev || []), ...page.results]);
+      setSearchNext(page.next);
+    } catch (error) {
+      console.error('Error cargando más resultados:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Función para eliminar tildes/acentos
   const removeAccents = (str) => {
     return str.normalize("NFD").replace(/[\u0300-\u036f]/g, "");
   };
 
-  // Filtrar películas según el término de búsqueda y tipo de filtro
+  // El servidor busca en título, géneros, actores, directores y descripción
+  // (el título pesa más). Con otro tipo de filtro se dejan solo las películas
+  // donde el término aparece en ese campo.
   const getFilteredMovies = () => {
-    if (!searchTerm.trim()) return null;
+    if (!searchTerm.trim() || searchResults === null) return null;
 
     const term = removeAccents(searchTerm.toLowerCase().trim());
 
-    return allMovies.filter(movie => {
+    return searchResults.filter(movie => {
       switch(filterType) {
         case 'titulo':
-          return removeAccents(movie.titulo?.toLowerCase() || '').includes(term);
+          return true;
         case 'genero':
           return movie.generos?.some(g =>
             removeAccents(g.nombre?.toLowerCase() || '').includes(term)
@@ -241,10 +283,10 @@ const Home = () => {
       {!noSubscription && (
         <>
           {/* Continuar viendo */}
-          {!loading && !searchTerm && <ContinueWatching />}
+          {!loading && !searchTerm && <ContinueWatching initialMovies={continueWatching} />}
 
           {/* Recomendaciones */}
-          {!loading && !searchTerm && <Recommendations />}
+          {!loading && !searchTerm && <Recommendations initialRecommendations={recommendations} />}
 
           {/* Loading skeleton */}
           {loading ? (
@@ -260,12 +302,25 @@ const Home = () => {
           ) : searchTerm ? (
             /* Resultados de búsqueda */
             <div className="search-results">
-              {filteredMovies && filteredMovies.length > 0 ? (
-                <MovieRow
-                  title={`Resultados de búsqueda: "${searchTerm}" (${filteredMovies.length})`}
-                  movies={filteredMovies}
-                  onMovieClick={handleMovieClick}
-                />
+              {filteredMovies === null ? (
+                <div className="no-results">
+                  <p>Buscando...</p>
+                </div>
+              ) : filteredMovies.length > 0 || searchNext ? (
+                <>
+                  <MovieRow
+                    title={`Resultados de búsqueda: "${searchTerm}" (${filteredMovies.length}${searchNext ? '+' : ''})`}
+                    movies={filteredMovies}
+                    onMovieClick={handleMovieClick}
+                  />
+                  {searchNext && (
+                    <div className="search-more">
+                      <button onClick={loadMoreResults} className="btn-clear" disabled={loadingMore}>
+                        {loadingMore ? 'Cargando...' : 'Ver más resultados'}
+                      </button>
+                    </div>
+                  )}
+                </>
               ) : (
                 <div className="no-results">
                   <p>No se encontraron películas para "{searchTerm}"</p>
@@ -20,6 +20,9 @@ const Player = () => {
   const [showRotateMessage, setShowRotateMessage] = useState(false);
   const [progressLoaded, setProgressLoaded] = useState(false);
   const progressIntervalRef = useRef(null);
+  // Medición de QoE de esta reproducción (ver enviarQoe)
+  const qoeRef = useRef(null);
+  const qoeIntervalRef = useRef(null);
 
   useEffect(() => {
     if (!activeProfile) {
@@ -155,9 +158,10 @@ const Player = () => {
       setError('');
 
       // Cargar info de la película y URL de streaming en paralelo
+      const hints = streamingService.getPlaybackHints();
       const [movieData, streamInfo] = await Promise.all([
         movieService.getMovieDetail(movieId),
-        streamingService.getPlayUrl(movieId, { perfil: activeProfile.id_perfil })
+        streamingService.getPlayUrl(movieId, { perfil: activeProfile.id_perfil, ...hints })
       ]);
 
       console.log('Stream data recibida:', streamInfo);
@@ -165,6 +169,19 @@ const Player = () => {
 
       setMovieInfo(movieData);
       setStreamData(streamInfo);
+      qoeRef.current = {
+        perfil: activeProfile.id_perfil,
+        assetId: streamInfo.asset_id,
+        bitrate: streamInfo.abr?.bitrate_kbps, // kbps de la calidad elegida
+        kbits: 0, // descargados mientras el navegador estaba bajando datos
+        segundosDescarga: 0,
+        ultimoProgreso: null,
+        ultimoTiempo: null,
+        reproducido: 0,
+        rebuffer: 0,
+        cortes: 0,
+        esperaDesde: null,
+      };
     } catch (error) {
       console.error('Error cargando video:', error);
       setError(error.response?.data?.detail || 'Error al cargar el video');
@@ -173,6 +190,107 @@ const Player = () => {
     }
   };
 
+  // HLS segmentado si el navegador lo reproduce nativamente (Safari/iOS);
+  // si no, el MP4 progresivo por rangos
+  const getVideoSrc = () => {
+    if (!streamData) return undefined;
+    const video = document.createElement('video');
+    if (streamData.hls_url && video.canPlayType('application/vnd.apple.mpegurl')) {
+      return streamData.hls_url;
+    }
+    return streamData.url;
+  };
+
+  // Fin del rango descargado que contiene la posición actual (segundos de video)
+  const bufferedEnd = (video) => {
+    for (let i = 0; i < video.buffered.length; i++) {
+      if (video.buffered.start(i) <= video.currentTime && video.currentTime <= video.buffered.end(i)) {
+        return video.buffered.end(i);
+      }
+    }
+    return video.currentTime;
+  };
+
+  // Throughput: segundos de video que crece el buffer x bitrate, contando solo
+  // los intervalos en que el navegador está descargando (eventos progress
+  // seguidos); con el buffer lleno no descarga y no se mide.
+  const handleProgress = () => {
+    const video = videoRef.current;
+    const qoe = qoeRef.current;
+    if (!video || !qoe || !qoe.bitrate) return;
+    const ahora = performance.now();
+    const fin = bufferedEnd(video);
+    if (qoe.ultimoProgreso) {
+      const dt = (ahora - qoe.ultimoProgreso.t) / 1000;
+      const ds = fin - qoe.ultimoProgreso.fin;
+      if (dt > 0 && dt < 1.5 && ds > 0) {
+        qoe.kbits += ds * qoe.bitrate;
+        qoe.segundosDescarga += dt;
+      }
+    }
+    qoe.ultimoProgreso = { t: ahora, fin };
+  };
+
+  // Corte: el video se queda esperando datos en plena reproducción (no al buscar ni al arrancar)
+  const handleWaiting = () => {
+    const video = videoRef.current;
+    const qoe = qoeRef.current;
+    if (!video || !qoe || video.seeking || qoe.reproducido === 0) return;
+    qoe.esperaDesde = performance.now();
+  };
+
+  const handlePlaying = () => {
+    const qoe = qoeRef.current;
+    if (!qoe || qoe.esperaDesde === null) return;
+    qoe.rebuffer += (performance.now() - qoe.esperaDesde) / 1000;
+    qoe.cortes += 1;
+    qoe.esperaDesde = null;
+    enviarQoe(); // avisar enseguida: la próxima reproducción debería bajar de calidad
+  };
+
+  // Beacon de QoE con lo medido desde el anterior; alimenta la estimación del
+  // perfil que usa el servidor para elegir la calidad. Solo usa refs: se llama
+  // también desde el cleanup al desmontar (keepalive).
+  const enviarQoe = (keepalive = false) => {
+    const qoe = qoeRef.current;
+    if (!qoe) return;
+    if (qoe.esperaDesde !== null) {
+      qoe.rebuffer += (performance.now() - qoe.esperaDesde) / 1000;
+      qoe.cortes += 1;
+      qoe.esperaDesde = null;
+    }
+    if (qoe.reproducido === 0 && qoe.rebuffer === 0) return;
+    // Solo throughput medido: la pista del navegador es gruesa y ensuciaría la estimación del perfil
+    if (qoe.segundosDescarga < 1) return;
+    const kbps = qoe.kbits / qoe.segundosDescarga;
+
+    const payload = {
+      perfil: qoe.perfil,
+      asset_id: qoe.assetId,
+      kbps: Math.round(kbps),
+      segundos_reproduccion: Math.round(qoe.reproducido * 10) / 10,
+      segundos_rebuffer: Math.round(qoe.rebuffer * 10) / 10,
+      cortes: qoe.cortes,
+    };
+    Object.assign(qoe, { kbits: 0, segundosDescarga: 0, reproducido: 0, rebuffer: 0, cortes: 0 });
+
+    if (keepalive) {
+      const token = localStorage.getItem('access_token');
+      fetch('/api/streaming/qoe/', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        credentials: 'include',
+        body: JSON.stringify(payload),
+        keepalive: true,
+      }).catch(err => console.error('Error enviando QoE al salir:', err));
+    } else {
+      streamingService.sendQoeBeacon(payload).catch(err => console.error('Error enviando QoE:', err));
+    }
+  };
+
   const handleBack = () => {
     navigate(-1);
   };
@@ -207,6 +325,11 @@ const Player = () => {
       console.log('📺 Intentando entrar en fullscreen automáticamente...');
     }
 
+    // Beacon de QoE cada 30 segundos (y al terminar un corte, ver handlePlaying)
+    if (!qoeIntervalRef.current) {
+      qoeIntervalRef.current = setInterval(() => enviarQoe(), 30000);
+    }
+
     // Iniciar guardado automático cada 10 segundos
     if (!progressIntervalRef.current) {
       progressIntervalRef.current = setInterval(() => {
@@ -234,17 +357,29 @@ const Player = () => {
     }
   };
 
+  // Segundos efectivamente reproducidos (los saltos por seek no cuentan)
   const handleTimeUpdate = () => {
-    // Opcional: podrías agregar lógica aquí si necesitas hacer algo cada vez que cambia el tiempo
+    const video = videoRef.current;
+    const qoe = qoeRef.current;
+    if (!video || !qoe) return;
+    const delta = video.currentTime - (qoe.ultimoTiempo ?? video.currentTime);
+    if (!video.paused && delta > 0 && delta < 2) {
+      qoe.reproducido += delta;
+    }
+    qoe.ultimoTiempo = video.currentTime;
   };
 
   // Cleanup: guardar progreso al salir y limpiar interval
   useEffect(() => {
     return () => {
-      // Limpiar interval
+      // Limpiar intervals
       if (progressIntervalRef.current) {
         clearInterval(progressIntervalRef.current);
       }
+      if (qoeIntervalRef.current) {
+        clearInterval(qoeIntervalRef.current);
+      }
+      enviarQoe(true);
 
       // Guardar progreso cuando el componente se desmonte
       const currentTime = videoRef.current?.currentTime;
@@ -319,8 +454,12 @@ const Player = () => {
           onPlay={handlePlay}
           onPause={handlePause}
           onEnded={handleEnded}
+          onTimeUpdate={handleTimeUpdate}
+          onProgress={handleProgress}
+          onWaiting={handleWaiting}
+          onPlaying={handlePlaying}
           onContextMenu={(e) => e.preventDefault()}
-          src={streamData?.url}
+          src={getVideoSrc()}
         >
           Tu navegador no soporta el elemento de video.
         </video>
@@ -15,4 +15,10 @@ export const historyService = {
     const response = await api.get(url);
     return response.data;
   },
-};
\ No newline at end of file
+
+  // Todas las filas del home del perfil activo en una sola petición
+  getHomeFeed: async () => {
+    const response = await api.get('/history/home/');
+    return response.data;
+  },
+};
@@ -1,7 +1,9 @@
 import api from './api';
 
 export const movieService = {
-  // Obtener todas las películas
+  // Obtener una página de películas: { results, next }.
+  // `next` es el cursor de la página siguiente (getMovies({ ...params, cursor: next }))
+  // o null si no hay más.
   getMovies: async (params = {}) => {
     const queryParams = new URLSearchParams();
 
@@ -10,12 +12,19 @@ export const movieService = {
     if (params.actor_id) queryParams.append('actor_id', params.actor_id);
     if (params.director_id) queryParams.append('director_id', params.director_id);
     if (params.anio) queryParams.append('anio', params.anio);
+    if (params.page_size) queryParams.append('page_size', params.page_size);
+    if (params.cursor) queryParams.append('cursor', params.cursor);
 
     const queryString = queryParams.toString();
     const url = `/contenido/peliculas/${queryString ? '?' + queryString : ''}`;
 
     const response = await api.get(url);
-    return response.data;
+    // La lista viene paginada por cursor: { next, previous, results }, con links absolutos
+    const { results, next } = response.data;
+    return {
+      results,
+      next: next ? new URL(next, window.location.origin).searchParams.get('cursor') : null,
+    };
   },
 
   // Obtener detalle de una película
@@ -24,9 +33,34 @@ export const movieService = {
     return response.data;
   },
 
+  // Obtener el detalle de varias películas en una sola petición
+  // Retorna { peliculas: { [id]: detalle }, faltantes: [ids] }
+  getMoviesBatch: async (movieIds) => {
+    const ids = [...new Set(movieIds)];
+    if (ids.length === 0) return { peliculas: {}, faltantes: [] };
+    const response = await api.get(`/contenido/peliculas/batch/?ids=${ids.join(',')}`);
+    return response.data;
+  },
+
   // Obtener filtros disponibles (géneros, actores, directores)
   getFilters: async () => {
     const response = await api.get('/contenido/filtros/');
     return response.data;
   },
+
+  // Conteo de películas por filtro para el estado actual de los filtros
+  getFacets: async (params = {}) => {
+    const queryParams = new URLSearchParams();
+
+    if (params.q) queryParams.append('q', params.q);
+    if (params.genero_id) queryParams.append('genero_id', params.genero_id);
+    if (params.actor_id) queryParams.append('actor_id', params.actor_id);
+    if (params.director_id) queryParams.append('director_id', params.director_id);
+    if (params.anio) queryParams.append('anio', params.anio);
+    if (params.top) queryParams.append('top', params.top);
+
+    const queryString = queryParams.toString();
+    const response = await api.get(`/contenido/peliculas/facetas/${queryString ? '?' + queryString : ''}`);
+    return response.data;
+  },
 };
\ No newline at end of file
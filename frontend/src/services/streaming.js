@@ -8,6 +8,10 @@ export const streamingService = {
     if (params.perfil) queryParams.append('perfil', params.perfil);
     if (params.calidad) queryParams.append('calidad', params.calidad);
     if (params.trailer !== undefined) queryParams.append('trailer', params.trailer);
+    // Pistas para que el servidor elija la calidad (ver getPlaybackHints)
+    if (params.kbps) queryParams.append('kbps', params.kbps);
+    if (params.ancho) queryParams.append('ancho', params.ancho);
+    if (params.alto) queryParams.append('alto', params.alto);
 
     const queryString = queryParams.toString();
     const url = `/streaming/play/${movieId}/${queryString ? '?' + queryString : ''}`;
@@ -16,6 +20,25 @@ export const streamingService = {
     return response.data;
   },
 
+  // Ancho de banda del enlace (si el navegador lo informa) y resolución física
+  // de la pantalla. El servidor usa la menor entre esta pista y la estimación
+  // del perfil (beacons), que sí refleja los cortes.
+  getPlaybackHints: () => {
+    const hints = {};
+    const downlink = navigator.connection?.downlink; // Mbps
+    if (downlink) hints.kbps = Math.round(downlink * 1000);
+    const ratio = window.devicePixelRatio || 1;
+    hints.ancho = Math.round(window.screen.width * ratio);
+    hints.alto = Math.round(window.screen.height * ratio);
+    return hints;
+  },
+
+  // Beacon de QoE: throughput medido, segundos reproducidos y cortes desde el anterior
+  sendQoeBeacon: async (payload) => {
+    const response = await api.post('/streaming/qoe/', payload);
+    return response.data;
+  },
+
   // Listar todas las calidades disponibles para una película
   listStreams: async (movieId) => {
     const response = await api.get(`/streaming/list/${movieId}/`);
@@ -5,6 +5,7 @@ from .views import (
     UpdateProgressView,
     GetProgressView,
     RecommendationsView,
+    HomeFeedView,
 )
 
 urlpatterns = [
@@ -13,4 +14,5 @@ urlpatterns = [
     path('progress/', UpdateProgressView.as_view(), name='update-progress'),
     path('progress/<int:pelicula_id>/', GetProgressView.as_view(), name='get-progress'),
     path('recommendations/', RecommendationsView.as_view(), name='recommendations'),
+    path('home/', HomeFeedView.as_view(), name='home-feed'),
 ]
@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.signing import BadSignature
@@ -8,7 +12,7 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import generics
 from subscriptions.permissions import EsSuscriptorActivo
 from profiles.models import Perfil
-from content.models import Pelicula
+from content.models import CatalogoPelicula, Pelicula
 from .models import Historial
 from .serializers import HistorialSerializer, HistorialAdminSerializer
 
@@ -17,6 +21,9 @@ from .serializers import HistorialSerializer, HistorialAdminSerializer
 COOKIE_NAME = "perfil_activo"
 COOKIE_SALT = "perfil.activo.v1"
 
+# fracción de MediaAsset.duracion_segundos a partir de la cual una película cuenta como terminada
+UMBRAL_TERMINADO = 0.95
+
 
 # ---------------------- Helpers ----------------------
 def _perfil_del_usuario_o_404(user, perfil_id: int) -> Perfil:
@@ -162,17 +169,27 @@ class UpdateProgressView(APIView):
                 status=400
             )
 
-        # Verificar que la película existe
-        pelicula = get_object_or_404(Pelicula, pk=pelicula_id)
+        # Verificar que la película existe (y traer la duración real del video, en la misma consulta)
+        pelicula = get_object_or_404(
+            Pelicula.objects.annotate(
+                duracion_video=Max("assets__duracion_segundos", filter=Q(assets__es_trailer=False)),
+            ),
+            pk=pelicula_id,
+        )
 
         # Obtener o crear historial de hoy
         historial = _get_or_create_historial_hoy(perfil.id_perfil, pelicula_id)
 
         # Actualizar progreso y fecha_vista (para ordenar correctamente "continuar viendo")
         historial.progreso_segundos = int(progreso_segundos)
-        historial.terminado = bool(terminado)
+        # Se considera vista al llegar al UMBRAL_TERMINADO de la duración (créditos incluidos)
+        historial.terminado = bool(terminado) or bool(
+            pelicula.duracion_video
+            and historial.progreso_segundos >= pelicula.duracion_video * UMBRAL_TERMINADO
+        )
         historial.fecha_vista = timezone.now()  # Actualizar la fecha cada vez que se guarda progreso
         historial.save()
+        invalidar_home_feed(perfil.id_perfil)
 
         return Response({
             "success": True,
@@ -221,15 +238,79 @@ class GetProgressView(APIView):
         })
 
 
+def _historial_reciente(perfil_id: int, days: int = 30, limit: int = 20):
+    """Últimos registros de historial del perfil (más recientes primero)."""
+    desde = timezone.now() - timedelta(days=days)
+    return list(
+        Historial.objects
+        .filter(id_perfil=perfil_id, fecha_vista__gte=desde)
+        .order_by('-fecha_vista')[:limit]
+    )
+
+
+def _recomendaciones(pelicula_ids_vistas, tarjeta=False):
+    """
+    Películas similares (géneros, actores, directores) a las vistas, excluyendo
+    éstas. Retorna (datos serializados, conteo de géneros/actores/directores base).
+    """
+    from django.db.models import Q
+    from django.db.models.expressions import RawSQL
+    from content.serializers import CatalogoListaSerializer, CatalogoTarjetaSerializer
+
+    # Géneros, actores y directores de las películas vistas (modelo de lectura: 1 consulta)
+    generos_vistos = set()
+    actores_vistos = set()
+    directores_vistos = set()
+
+    vistas = (CatalogoPelicula.objects
+              .filter(pelicula_id__in=pelicula_ids_vistas)
+              .values_list("genero_ids", "actor_ids", "director_ids"))
+    for genero_ids, actor_ids, director_ids in vistas:
+        generos_vistos.update(genero_ids)
+        actores_vistos.update(actor_ids)
+        directores_vistos.update(director_ids)
+
+    # Buscar películas recomendadas (que NO haya visto); relevancia = coincidencias
+    generos_l, actores_l, directores_l = list(generos_vistos), list(actores_vistos), list(directores_vistos)
+    recomendaciones = (
+        CatalogoPelicula.objects
+        .exclude(pelicula_id__in=pelicula_ids_vistas)  # Excluir las que ya vio
+        .filter(
+            Q(genero_ids__overlap=generos_l) |
+            Q(actor_ids__overlap=actores_l) |
+            Q(director_ids__overlap=directores_l)
+        )
+        .annotate(relevancia=RawSQL(
+            "cardinality(ARRAY(SELECT unnest(catalogo_peliculas.genero_ids) INTERSECT SELECT unnest(%s::int[])))"
+            " + cardinality(ARRAY(SELECT unnest(catalogo_peliculas.actor_ids) INTERSECT SELECT unnest(%s::int[])))"
+            " + cardinality(ARRAY(SELECT unnest(catalogo_peliculas.director_ids) INTERSECT SELECT unnest(%s::int[])))",
+            (generos_l, actores_l, directores_l),
+        ))
+        .order_by('-relevancia', '-estreno_orden', 'titulo')[:20]  # Máximo 20, más relevantes primero
+    )
+
+    serializer_class = CatalogoTarjetaSerializer if tarjeta else CatalogoListaSerializer
+    based_on = {
+        "generos": len(generos_vistos),
+        "actores": len(actores_vistos),
+        "directores": len(directores_vistos)
+    }
+    return serializer_class(recomendaciones, many=True).data, based_on
+
+
 class RecommendationsView(APIView):
     """
     GET /api/history/recommendations/
     Obtiene recomendaciones basadas en el historial del perfil activo.
     Busca películas similares por géneros, actores y directores.
+    Query params opcionales:
+      - view=card -> proyección compacta (id, título, año, clasificación, miniatura, ids de géneros)
     """
     permission_classes = [IsAuthenticated, EsSuscriptorActivo]
 
     def get(self, request):
+        from content.serializers import es_vista_tarjeta
+
         # Obtener perfil activo
         perfil_id = _perfil_id_from_cookie(request)
         if not perfil_id:
@@ -241,12 +322,7 @@ class RecommendationsView(APIView):
         perfil = get_object_or_404(Perfil, pk=perfil_id, usuario_id=request.user.id_usuario)
 
         # Obtener historial reciente (últimos 30 días, max 20 películas)
-        desde = timezone.now() - timedelta(days=30)
-        historial = (
-            Historial.objects
-            .filter(id_perfil=perfil.id_perfil, fecha_vista__gte=desde)
-            .order_by('-fecha_vista')[:20]
-        )
+        historial = _historial_reciente(perfil.id_perfil)
 
         if not historial:
             return Response({
@@ -257,48 +333,176 @@ class RecommendationsView(APIView):
         # Obtener IDs de películas vistas
         pelicula_ids_vistas = [h.id_pelicula for h in historial]
 
-        # Obtener películas vistas con sus relaciones
-        peliculas_vistas = Pelicula.objects.filter(id_pelicula__in=pelicula_ids_vistas).prefetch_related('generos', 'actores', 'directores')
+        # Serializar recomendaciones (?view=card -> proyección compacta)
+        data, based_on = _recomendaciones(
+            pelicula_ids_vistas, tarjeta=es_vista_tarjeta(request.query_params)
+        )
 
-        # Recolectar géneros, actores y directores más vistos
-        generos_vistos = set()
-        actores_vistos = set()
-        directores_vistos = set()
+        return Response({
+            "perfil": perfil.id_perfil,
+            "recommendations": data,
+            "based_on": based_on,
+        })
 
-        for pelicula in peliculas_vistas:
-            generos_vistos.update(pelicula.generos.values_list('id_genero', flat=True))
-            actores_vistos.update(pelicula.actores.values_list('id_actor', flat=True))
-            directores_vistos.update(pelicula.directores.values_list('id_director', flat=True))
 
-        # Buscar películas recomendadas (que NO haya visto)
-        from django.db.models import Q, Count
+# ---------------------- Home feed ----------------------
+# Las filas independientes del home se consultan en paralelo; cada hilo usa su
+# propia conexión a la BD y la cierra al terminar.
+_home_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="home-feed")
 
-        recomendaciones = (
-            Pelicula.objects
-            .exclude(id_pelicula__in=pelicula_ids_vistas)  # Excluir las que ya vio
-            .filter(
-                Q(generos__id_genero__in=generos_vistos) |
-                Q(actores__id_actor__in=actores_vistos) |
-                Q(directores__id_director__in=directores_vistos)
-            )
-            .annotate(relevancia=Count('id_pelicula'))  # Contar coincidencias
-            .order_by('-relevancia')  # Más relevantes primero
-            .distinct()[:20]  # Máximo 20 recomendaciones
-        )
 
-        # Serializar recomendaciones
-        from content.serializers import PeliculaListaSerializer
-        serializer = PeliculaListaSerializer(recomendaciones, many=True)
+def _en_hilo(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        connections.close_all()
 
-        return Response({
-            "perfil": perfil.id_perfil,
-            "recommendations": serializer.data,
-            "based_on": {
-                "generos": len(generos_vistos),
-                "actores": len(actores_vistos),
-                "directores": len(directores_vistos)
-            }
+
+def _home_cache_key(perfil_id: int, tarjeta: bool) -> str:
+    return f"home_feed:{perfil_id}:{'card' if tarjeta else 'full'}"
+
+
+def invalidar_home_feed(perfil_id: int):
+    """
+    Descarta el home cacheado del perfil (p. ej. al guardar progreso). Solo
+    alcanza al cache de este proceso; en los demás workers la entrada deja de
+    valer porque cambia la marca del historial (_marca_historial).
+    """
+    cache.delete_many([_home_cache_key(perfil_id, False), _home_cache_key(perfil_id, True)])
+
+
+def _marca_historial(perfil_id: int):
+    """
+    Estado del historial del perfil: último fecha_vista y cantidad de registros.
+    Cambia con cada Play, progreso guardado o registro borrado, así un home
+    cacheado en otro proceso no se sirve con progreso viejo.
+    """
+    marca = Historial.objects.filter(id_perfil=perfil_id).aggregate(
+        ultima=Max("fecha_vista"), registros=Count("id_historial"),
+    )
+    return marca["ultima"], marca["registros"]
+
+
+def _continuar_viendo(historial, tarjeta=False):
+    """Una entrada por película (la más reciente) con su progreso."""
+    from content.serializers import CatalogoListaSerializer, CatalogoTarjetaSerializer
+
+    ultimos = {}
+    for h in historial:
+        ultimos.setdefault(h.id_pelicula, h)
+    ultimos = list(ultimos.values())[:10]
+
+    serializer_class = CatalogoTarjetaSerializer if tarjeta else CatalogoListaSerializer
+    peliculas = CatalogoPelicula.objects.in_bulk([h.id_pelicula for h in ultimos], field_name="pelicula_id")
+    items = []
+    for h in ultimos:
+        pelicula = peliculas.get(h.id_pelicula)
+        if pelicula is None:
+            continue
+        item = dict(serializer_class(pelicula).data)
+        item.update({
+            "progreso_segundos": h.progreso_segundos,
+            "terminado": h.terminado,
+            "fecha_vista": h.fecha_vista,
         })
+        items.append(item)
+    return items
+
+
+def _filas_generos(tarjeta=False):
+    from django.conf import settings
+    from content.catalogo import filas_por_genero
+    from content.serializers import CatalogoListaSerializer, CatalogoTarjetaSerializer
+
+    filas = filas_por_genero(settings.CATALOGO_PAGE_SIZE)
+    ids = {pid for _, _, pids in filas for pid in pids}
+    peliculas = CatalogoPelicula.objects.in_bulk(ids, field_name="pelicula_id")
+    serializer_class = CatalogoTarjetaSerializer if tarjeta else CatalogoListaSerializer
+    datos = {pid: serializer_class(p).data for pid, p in peliculas.items()}
+    return [
+        {
+            "id_genero": id_genero,
+            "nombre": nombre,
+            "peliculas": [datos[pid] for pid in pids if pid in datos],
+        }
+        for id_genero, nombre, pids in filas
+    ]
+
+
+def _filtros():
+    from content.models import Actor, Director, Genero
+    from content.serializers import ActorSerializer, DirectorSerializer, GeneroSerializer
+
+    return {
+        'generos': GeneroSerializer(Genero.objects.order_by('nombre'), many=True).data,
+        'actores': ActorSerializer(Actor.objects.order_by('nombre'), many=True).data,
+        'directores': DirectorSerializer(Director.objects.order_by('nombre'), many=True).data,
+    }
+
+
+class HomeFeedView(APIView):
+    """
+    GET /api/history/home/
+    Todas las filas del home del perfil activo en una sola respuesta:
+      - continuar_viendo: últimas películas vistas (30 días) con su progreso
+      - recomendaciones (+ recomendaciones_base): igual que /recommendations/
+      - filas_generos: [{id_genero, nombre, peliculas}] (CATALOGO_PAGE_SIZE por fila)
+      - filtros: géneros, actores y directores (igual que /contenido/filtros/)
+    Query params opcionales:
+      - view=card -> proyección compacta de las películas
+    Se cachea por perfil HOME_FEED_TTL segundos; se invalida al cambiar el
+    catálogo (CatalogoVersion) o el historial del perfil (_marca_historial). El
+    cache es por proceso (LocMemCache): la versión se compara en cada request.
+    """
+    permission_classes = [IsAuthenticated, EsSuscriptorActivo]
+
+    def get(self, request):
+        from django.conf import settings
+        from content.models import CatalogoVersion
+        from content.serializers import es_vista_tarjeta
+
+        perfil_id = _perfil_id_from_cookie(request)
+        if not perfil_id:
+            return Response(
+                {"detail": "No hay perfil activo."},
+                status=400
+            )
+        perfil = _perfil_del_usuario_o_404(request.user, perfil_id)
+        tarjeta = es_vista_tarjeta(request.query_params)
+
+        ttl = settings.HOME_FEED_TTL
+        key = _home_cache_key(perfil.id_perfil, tarjeta)
+        version = (CatalogoVersion.actual(), _marca_historial(perfil.id_perfil))
+        cacheado = cache.get(key)
+        if cacheado and cacheado["version"] == version:
+            data = cacheado["data"]
+        else:
+            historial = _historial_reciente(perfil.id_perfil)
+            vistas = [h.id_pelicula for h in historial]
+
+            # Filas independientes en paralelo
+            f_continuar = _home_pool.submit(_en_hilo, _continuar_viendo, historial, tarjeta)
+            f_generos = _home_pool.submit(_en_hilo, _filas_generos, tarjeta)
+            f_filtros = _home_pool.submit(_en_hilo, _filtros)
+            f_recomendaciones = (
+                _home_pool.submit(_en_hilo, _recomendaciones, vistas, tarjeta) if vistas else None
+            )
+
+            recomendaciones, base = f_recomendaciones.result() if f_recomendaciones else ([], {})
+            data = {
+                "perfil": perfil.id_perfil,
+                "continuar_viendo": f_continuar.result(),
+                "recomendaciones": recomendaciones,
+                "recomendaciones_base": base,
+                "filas_generos": f_generos.result(),
+                "filtros": f_filtros.result(),
+            }
+            cache.set(key, {"version": version, "data": data}, ttl)
+
+        response = Response(data)
+        # el cache es del servidor: el navegador no debe reusar un home con progreso viejo
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
 # ==================== VISTAS DE ADMINISTRACIÓN ====================
@@ -1,20 +1,22 @@
 # streaming/admin.py
 from django.contrib import admin, messages
 from django.utils.html import format_html
-from .models import MediaAssetReadOnly  # proxy
+from .models import EstimacionQoE, MediaAssetReadOnly  # proxy
 
 @admin.register(MediaAssetReadOnly)
 class MediaAssetReadOnlyAdmin(admin.ModelAdmin):
     list_display = (
-        "id", "pelicula", "origen", "calidad", "mime_type",
-        "peso_mb", "es_trailer", "creado_en", "ver",
+        "id", "pelicula", "tipo_origen", "calidad", "mime_type",
+        "peso_mb", "duracion", "es_trailer", "creado_en", "ver",
     )
     list_filter = ("es_trailer", "calidad", "mime_type")
     search_fields = ("pelicula__titulo", "mime_type", "calidad")
     ordering = ("-creado_en",)
     raw_id_fields = ("pelicula",)
     readonly_fields = ("pelicula", "archivo", "remote_url", "calidad",
-                       "mime_type", "es_trailer", "creado_en", "preview")
+                       "mime_type", "es_trailer", "creado_en", "preview",
+                       "peso_mb", "duracion", "bitrate_kbps", "codec_video", "codec_audio",
+                       "ancho", "alto", "checksum_sha256")
     actions = ["borrar_assets_completamente"]  # 👈 acción de borrado seguro
     fieldsets = (
         (None, {
@@ -26,6 +28,13 @@ class MediaAssetReadOnlyAdmin(admin.ModelAdmin):
                 "creado_en",
             )
         }),
+        ("Metadatos", {
+            "fields": (
+                ("peso_mb", "duracion", "bitrate_kbps"),
+                ("codec_video", "codec_audio", "ancho", "alto"),
+                "checksum_sha256",
+            )
+        }),
     )
 
     # —— solo lectura para add/change; sí permite delete ——
@@ -40,19 +49,25 @@ class MediaAssetReadOnlyAdmin(admin.ModelAdmin):
         return True  # 👈 permitir borrar
 
     # —— helpers visuales ——
-    def origen(self, obj):
+    # no se llama `origen`: ese nombre es el FK al mezzanine y el campo le gana al método
+    def tipo_origen(self, obj):
         return "Remoto" if obj.remote_url else ("Local" if obj.archivo else "—")
-    origen.short_description = "Origen"
+    tipo_origen.short_description = "Origen"
 
     def peso_mb(self, obj):
-        try:
-            if obj.archivo and hasattr(obj.archivo, "size") and obj.archivo.size:
-                return f"{obj.archivo.size / (1024 * 1024):.2f}"
-        except Exception:
-            pass
+        # columna guardada por el worker de media: no se toca el disco al listar
+        if obj.tamano_bytes:
+            return f"{obj.tamano_bytes / (1024 * 1024):.2f}"
         return "—"
     peso_mb.short_description = "Tamaño (MB)"
 
+    def duracion(self, obj):
+        if obj.duracion_segundos is None:
+            return "—"
+        minutos, segundos = divmod(int(obj.duracion_segundos), 60)
+        return f"{minutos}:{segundos:02d}"
+    duracion.short_description = "Duración"
+
     def _asset_url(self, obj):
         if obj.remote_url:
             return obj.remote_url
@@ -104,3 +119,25 @@ class MediaAssetReadOnlyAdmin(admin.ModelAdmin):
             level=messages.SUCCESS
         )
     borrar_assets_completamente.short_description = "Eliminar asset(s) y archivo(s) del disco"
+
+
+@admin.register(EstimacionQoE)
+class EstimacionQoEAdmin(admin.ModelAdmin):
+    list_display = ("perfil", "kbps_redondeados", "muestras", "rebuffer_pct", "cortes", "actualizado_en")
+    ordering = ("-actualizado_en",)
+    raw_id_fields = ("perfil",)
+    readonly_fields = ("perfil", "kbps", "muestras", "segundos_reproduccion",
+                       "segundos_rebuffer", "cortes", "actualizado_en")
+
+    def has_add_permission(self, request):
+        return False
+
+    def kbps_redondeados(self, obj):
+        return f"{obj.kbps:.0f}"
+    kbps_redondeados.short_description = "kbps estimados"
+
+    def rebuffer_pct(self, obj):
+        # tiempo en rebuffering sobre el total (reproducción + espera)
+        total = obj.segundos_reproduccion + obj.segundos_rebuffer
+        return f"{100 * obj.segundos_rebuffer / total:.2f}" if total else "—"
+    rebuffer_pct.short_description = "Rebuffer (%)"
@@ -0,0 +1,273 @@
+"""
+Simulación de espectadores para medir cuántos streams aguanta un nodo
+(manage.py benchmark_streaming).
+
+Cada espectador hace el flujo real por HTTP contra el servidor:
+  1. GET  /api/streaming/play/<id>/          -> URL firmada de StreamFileView
+  2. ráfagas de Range: el inicio del archivo, luego bloques secuenciales hasta
+     llenar el buffer objetivo y, con cierta probabilidad, saltos (seek) a otra posición
+  3. POST /api/history/progress/ cada N segundos de video reproducidos
+Reproduce en "tiempo real" según el bitrate: descarga a toda velocidad hasta
+tener `buffer_segundos` por delante y después al ritmo del video, como un
+reproductor. Si el buffer se vacía cuenta un corte (rebuffering).
+
+Del servidor (si se indica su PID y corre en este host) se muestrean desde /proc
+los descriptores abiertos y el CPU de ese proceso y sus hijos (workers de uvicorn).
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Parametros:
+    """Configuración común a todos los espectadores de una corrida."""
+
+    def __init__(self, url_base, token, cookies, peliculas, fin, bitrate_kbps=5000,
+                 buffer_segundos=30.0, inicio_bytes=1024 * 1024, bloque_bytes=2 * 1024 * 1024,
+                 prob_seek=0.1, progreso_cada=10.0, timeout=30.0):
+        self.url_base = url_base.rstrip("/")
+        self.token = token
+        self.cookies = cookies
+        self.peliculas = peliculas
+        self.fin = fin   # time.monotonic() en que termina la corrida
+        self.bitrate_kbps = bitrate_kbps
+        self.buffer_segundos = buffer_segundos
+        self.inicio_bytes = inicio_bytes
+        self.bloque_bytes = bloque_bytes
+        self.prob_seek = prob_seek
+        self.progreso_cada = progreso_cada
+        self.timeout = timeout
+
+
+class Metricas:
+    """Latencias (s) por tipo de request, bytes y eventos; seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.bytes = 0
+        self.eventos = defaultdict(int)
+        self.arranques = []
+
+    def latencia(self, tipo, segundos):
+        with self._lock:
+            self.latencias[tipo].append(segundos)
+
+    def error(self, tipo):
+        with self._lock:
+            self.errores[tipo] += 1
+
+    def sumar_bytes(self, n):
+        with self._lock:
+            self.bytes += n
+
+    def evento(self, nombre):
+        with self._lock:
+            self.eventos[nombre] += 1
+
+    def arranque(self, segundos):
+        with self._lock:
+            self.arranques.append(segundos)
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (valores sin ordenar); None si no hay datos."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def resumen(valores) -> dict:
+    return {
+        "n": len(valores),
+        "p50_ms": _ms(percentil(valores, 50)),
+        "p95_ms": _ms(percentil(valores, 95)),
+        "p99_ms": _ms(percentil(valores, 99)),
+        "max_ms": _ms(max(valores) if valores else None),
+    }
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 2) if segundos is not None else None
+
+
+class Espectador(threading.Thread):
+
+    def __init__(self, numero, parametros, metricas):
+        super().__init__(daemon=True, name=f"espectador-{numero}")
+        self.p = parametros
+        self.m = metricas
+        self.fin = parametros.fin
+        self.azar = random.Random(numero)
+        self.sesion = requests.Session()
+        self.sesion.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.sesion.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.sesion.headers["Authorization"] = f"Bearer {parametros.token}"
+        self.sesion.cookies.update(parametros.cookies)
+
+    def run(self):
+        try:
+            while time.monotonic() < self.fin:
+                try:
+                    self._reproducir(self.azar.choice(self.p.peliculas))
+                except requests.RequestException:
+                    self.m.error("conexion")
+                    time.sleep(0.5)
+        finally:
+            self.sesion.close()
+
+    # --- requests medidos ----------------------------------------------------
+
+    def _play(self, pelicula_id):
+        inicio = time.perf_counter()
+        r = self.sesion.get(f"{self.p.url_base}/api/streaming/play/{pelicula_id}/", timeout=self.p.timeout)
+        self.m.latencia("play", time.perf_counter() - inicio)
+        if r.status_code != 200:
+            self.m.error("play")
+            return None
+        return r.json()
+
+    def _rango(self, url, desde, hasta, tipo):
+        """GET con Range; mide hasta los headers (ttfb) y hasta el último byte."""
+        inicio = time.perf_counter()
+        with self.sesion.get(url, headers={"Range": f"bytes={desde}-{hasta}"},
+                             stream=True, timeout=self.p.timeout) as r:
+            self.m.latencia(f"{tipo}_ttfb", time.perf_counter() - inicio)
+            recibidos = sum(len(parte) for parte in r.iter_content(64 * 1024))
+            self.m.latencia(tipo, time.perf_counter() - inicio)
+            if r.status_code != 206:
+                self.m.error(tipo)
+                return None, 0
+            total = re.match(r"bytes \d+-\d+/(\d+)", r.headers.get("Content-Range", ""))
+        self.m.sumar_bytes(recibidos)
+        return (int(total.group(1)) if total else None), recibidos
+
+    def _progreso(self, pelicula_id, segundos):
+        inicio = time.perf_counter()
+        r = self.sesion.post(f"{self.p.url_base}/api/history/progress/",
+                             json={"pelicula_id": pelicula_id, "progreso_segundos": int(segundos)},
+                             timeout=self.p.timeout)
+        self.m.latencia("progreso", time.perf_counter() - inicio)
+        if r.status_code != 200:
+            self.m.error("progreso")
+
+    # --- una reproducción ----------------------------------------------------
+
+    def _reproducir(self, pelicula_id):
+        inicio_play = time.perf_counter()
+        datos = self._play(pelicula_id)
+        if datos is None:
+            time.sleep(1)
+            return
+        url = self.p.url_base + datos["url"]
+        tamano, recibidos = self._rango(url, 0, self.p.inicio_bytes - 1, "rango_inicio")
+        if not tamano:
+            return
+        self.m.arranque(time.perf_counter() - inicio_play)
+        self.m.evento("reproducciones")
+
+        bytes_por_segundo = self.p.bitrate_kbps * 1000 / 8
+        posicion = recibidos
+        reproduccion = time.monotonic()   # instante en que empezó a verse el video
+        descargado = recibidos / bytes_por_segundo   # segundos de video en el buffer
+        ultimo_progreso = 0.0
+        while posicion < tamano and time.monotonic() < self.fin:
+            visto = time.monotonic() - reproduccion
+            buffer = descargado - visto
+            if buffer < 0:
+                # el reproductor se quedó sin datos: corte y se reanuda desde aquí
+                self.m.evento("cortes")
+                reproduccion += -buffer
+                buffer = 0
+            elif buffer > self.p.buffer_segundos:
+                time.sleep(min(buffer - self.p.buffer_segundos, max(0.0, self.fin - time.monotonic())))
+                continue
+
+            tipo = "rango"
+            if self.azar.random() < self.p.prob_seek:
+                # seek: el buffer se descarta y se sigue desde otra posición
+                posicion = self.azar.randrange(0, tamano)
+                descargado = time.monotonic() - reproduccion
+                tipo = "rango_seek"
+                self.m.evento("seeks")
+            hasta = min(posicion + self.p.bloque_bytes, tamano) - 1
+            _, recibidos = self._rango(url, posicion, hasta, tipo)
+            if not recibidos:
+                return
+            posicion += recibidos
+            descargado += recibidos / bytes_por_segundo
+
+            visto = time.monotonic() - reproduccion
+            if visto - ultimo_progreso >= self.p.progreso_cada:
+                ultimo_progreso = visto
+                self._progreso(pelicula_id, posicion / bytes_por_segundo)
+
+
+# --- muestreo del servidor (/proc) ----------------------------------------------
+
+def _hijos(pid):
+    hijos = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                hijos += [int(h) for h in f.read().split()]
+    except OSError:
+        pass
+    return hijos
+
+
+def procesos_servidor(pid):
+    """El PID y todos sus descendientes."""
+    pendientes, vistos = [pid], []
+    while pendientes:
+        actual = pendientes.pop()
+        vistos.append(actual)
+        pendientes += _hijos(actual)
+    return vistos
+
+
+def cpu_segundos(pids) -> float:
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                campos = f.read().rsplit(")", 1)[1].split()
+            total += int(campos[11]) + int(campos[12])   # utime + stime
+        except (OSError, IndexError, ValueError):
+            pass
+    return total / ticks
+
+
+def descriptores(pids) -> int:
+    total = 0
+    for pid in pids:
+        try:
+            total += len(os.listdir(f"/proc/{pid}/fd"))
+        except OSError:
+            pass
+    return total
+
+
+class MuestreoServidor(threading.Thread):
+    """Muestrea los descriptores abiertos del servidor mientras dura la prueba."""
+
+    def __init__(self, pid, intervalo=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.detener = threading.Event()
+        self.fds = []
+
+    def run(self):
+        while not self.detener.wait(self.intervalo):
+            self.fds.append(descriptores(procesos_servidor(self.pid)))
@@ -0,0 +1,79 @@
+"""
+Caché en memoria del inicio de los videos más reproducidos.
+
+Cada arranque de reproducción pide los primeros MB del MP4 (ftyp/moov y los
+primeros GOPs). Se guardan los STREAMING_CACHE_INICIO_MB iniciales de cada
+archivo, con desalojo LRU y un tope total en bytes por proceso
+(STREAMING_CACHE_INICIO_TOTAL_MB); 0 desactiva la caché.
+
+La clave incluye tamaño y checksum (vienen en el token firmado), así un
+archivo regenerado nunca se sirve desde una entrada vieja.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class CacheInicio:
+
+    def __init__(self, prefijo_bytes, limite_bytes):
+        self.prefijo = prefijo_bytes
+        self.limite = limite_bytes
+        self._entradas = OrderedDict()   # clave -> bytes (la más reciente al final)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = self.fallos = self.desalojos = 0
+
+    @property
+    def activa(self) -> bool:
+        return self.prefijo > 0 and self.limite >= self.prefijo
+
+    def obtener(self, clave):
+        with self._lock:
+            datos = self._entradas.get(clave)
+            if datos is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return datos
+
+    def guardar(self, clave, datos: bytes):
+        if len(datos) > self.limite:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            while self._entradas and self._bytes + len(datos) > self.limite:
+                _, desalojada = self._entradas.popitem(last=False)
+                self._bytes -= len(desalojada)
+                self.desalojos += 1
+            self._entradas[clave] = datos
+            self._bytes += len(datos)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "limite_bytes": self.limite,
+                "prefijo_bytes": self.prefijo,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+            }
+
+
+cache_inicio = CacheInicio(
+    settings.STREAMING_CACHE_INICIO_MB * 1024 * 1024,
+    settings.STREAMING_CACHE_INICIO_TOTAL_MB * 1024 * 1024,
+)
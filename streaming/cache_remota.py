@@ -0,0 +1,243 @@
+"""
+Proxy con caché en disco para los assets con `remote_url`.
+
+Con STREAMING_REMOTO = "proxy", StreamFileView no redirige al origen: pide el
+archivo por bloques de STREAMING_PROXY_BLOQUE_KB con Range (pool de conexiones
+de urllib3) y guarda cada bloque en STREAMING_PROXY_DIR. Desde el segundo
+espectador los títulos populares salen del disco local.
+
+- Single-flight: si varios requests piden el mismo bloque a la vez, solo uno lo
+  descarga y los demás esperan su resultado (por proceso).
+- LRU por mtime: cada acierto renueva el mtime del bloque. Cada tanto se recorre
+  la carpeta y se borran los bloques más viejos hasta bajar del límite
+  (STREAMING_PROXY_CACHE_MB). Al usar el filesystem, varios procesos (workers
+  de uvicorn) comparten caché y límite.
+- Se asume que el contenido de una URL remota no cambia (storage versionado);
+  si el origen informa otro tamaño se descarta todo lo guardado de esa URL.
+
+Todo es síncrono (se llama en un hilo con asyncio.to_thread), así funciona
+igual bajo ASGI y WSGI.
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+import urllib3
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto (en fracción del límite escrito por este proceso) se recorre la carpeta
+_FRACCION_DEPURAR = 0.1
+# Al depurar se baja hasta este porcentaje del límite, para no depurar en cada escritura
+_OBJETIVO_DEPURAR = 0.9
+# No renovar el mtime de un bloque leído hace menos de esto (ahorra syscalls)
+_RENOVAR_SEGUNDOS = 60
+
+
+class OrigenNoDisponible(Exception):
+    """El origen no respondió o no soporta Range: se puede volver a la redirección."""
+
+
+class _Vuelo:
+    def __init__(self):
+        self.listo = threading.Event()
+        self.datos = None
+        self.error = None
+
+
+class CacheRemota:
+
+    def __init__(self, directorio, limite_bytes, bloque_bytes, timeout=10.0, conexiones=10):
+        self.directorio = directorio
+        self.limite = limite_bytes
+        self.tamano_bloque = bloque_bytes
+        self._http = urllib3.PoolManager(
+            maxsize=conexiones, block=False,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=0.2, raise_on_status=False),
+        )
+        self._lock = threading.Lock()
+        self._en_vuelo = {}   # ruta del bloque -> _Vuelo
+        self._tamanos = {}    # url -> bytes
+        self._escritos = 0    # bytes escritos desde la última depuración
+        self._depurando = threading.Lock()
+        self.aciertos = self.fallos = self.esperas = self.desalojos = 0
+        self.bytes_descargados = 0
+
+    # --- rutas ---------------------------------------------------------------
+
+    def _carpeta(self, url) -> str:
+        clave = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directorio, clave[:2], clave)
+
+    def _ruta(self, url, indice) -> str:
+        return os.path.join(self._carpeta(url), f"{indice:08d}.bin")
+
+    # --- origen --------------------------------------------------------------
+
+    def _pedir(self, url, inicio, fin):
+        try:
+            respuesta = self._http.request(
+                "GET", url, headers={"Range": f"bytes={inicio}-{fin}"}, preload_content=True,
+            )
+        except urllib3.exceptions.HTTPError as exc:
+            raise OrigenNoDisponible(f"Origen sin respuesta: {exc}") from exc
+        if respuesta.status != 206:
+            raise OrigenNoDisponible(f"El origen respondió {respuesta.status} a un Range.")
+        total = re.match(r"bytes \d+-\d+/(\d+)", respuesta.headers.get("Content-Range", ""))
+        if total is None:
+            raise OrigenNoDisponible("El origen no informó Content-Range.")
+        return respuesta.data, int(total.group(1))
+
+    def _registrar_tamano(self, url, total):
+        anterior = self._tamanos.get(url)
+        if anterior is not None and anterior != total:
+            # el archivo del origen cambió: lo guardado ya no vale
+            logger.warning("Cambió el tamaño remoto de %s (%s -> %s); se descarta su caché", url, anterior, total)
+            shutil.rmtree(self._carpeta(url), ignore_errors=True)
+        self._tamanos[url] = total
+
+    def tamano(self, url) -> int:
+        """Tamaño del archivo remoto (memo por proceso; si no, un Range de 1 byte)."""
+        total = self._tamanos.get(url)
+        if total is None:
+            _, total = self._pedir(url, 0, 0)
+            self._registrar_tamano(url, total)
+        return total
+
+    # --- bloques -------------------------------------------------------------
+
+    def _leer(self, ruta):
+        with open(ruta, "rb") as f:
+            datos = f.read()
+            if time.time() - os.fstat(f.fileno()).st_mtime > _RENOVAR_SEGUNDOS:
+                os.utime(f.fileno())
+        return datos
+
+    def _descargar(self, url, indice, tamano, ruta) -> bytes:
+        inicio = indice * self.tamano_bloque
+        fin = min(inicio + self.tamano_bloque, tamano) - 1
+        datos, total = self._pedir(url, inicio, fin)
+        self._registrar_tamano(url, total)
+        if total != tamano or len(datos) != fin - inicio + 1:
+            raise OrigenNoDisponible(f"Bloque {indice} de {url}: se esperaban {fin - inicio + 1} bytes "
+                                     f"de {tamano}, llegaron {len(datos)} de {total}.")
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.tmp-{uuid.uuid4().hex}"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+        return datos
+
+    def bloque(self, url, indice, tamano) -> bytes:
+        """Bytes del bloque `indice` de la URL: del disco o (una sola vez) del origen."""
+        ruta = self._ruta(url, indice)
+        try:
+            datos = self._leer(ruta)
+            with self._lock:
+                self.aciertos += 1
+            return datos
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            vuelo = self._en_vuelo.get(ruta)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._en_vuelo[ruta] = _Vuelo()
+                self.fallos += 1
+            else:
+                self.esperas += 1
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.datos
+
+        try:
+            vuelo.datos = self._descargar(url, indice, tamano, ruta)
+        except Exception as exc:
+            vuelo.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[ruta]
+                if vuelo.datos is not None:
+                    self.bytes_descargados += len(vuelo.datos)
+                    self._escritos += len(vuelo.datos)
+                    depurar = self._escritos >= self.limite * _FRACCION_DEPURAR
+                else:
+                    depurar = False
+            vuelo.listo.set()
+        if depurar:
+            self.depurar()
+        return vuelo.datos
+
+    # --- LRU -----------------------------------------------------------------
+
+    def depurar(self):
+        """Borra los bloques menos usados (mtime más viejo) hasta bajar del límite."""
+        if not self._depurando.acquire(blocking=False):
+            return   # otro hilo ya está depurando
+        try:
+            with self._lock:
+                self._escritos = 0
+            bloques = []
+            total = 0
+            for raiz, _, archivos in os.walk(self.directorio):
+                for nombre in archivos:
+                    if not nombre.endswith(".bin"):
+                        continue
+                    ruta = os.path.join(raiz, nombre)
+                    try:
+                        info = os.stat(ruta)
+                    except FileNotFoundError:
+                        continue
+                    bloques.append((info.st_mtime, info.st_size, ruta))
+                    total += info.st_size
+            if total <= self.limite:
+                return
+            bloques.sort()
+            objetivo = self.limite * _OBJETIVO_DEPURAR
+            for _, tamano, ruta in bloques:
+                if total <= objetivo:
+                    break
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+                total -= tamano
+                with self._lock:
+                    self.desalojos += 1
+        finally:
+            self._depurando.release()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos + self.esperas
+            return {
+                "directorio": self.directorio,
+                "limite_bytes": self.limite,
+                "bloque_bytes": self.tamano_bloque,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "esperas": self.esperas,
+                "desalojos": self.desalojos,
+                "bytes_descargados": self.bytes_descargados,
+                "en_vuelo": len(self._en_vuelo),
+                "tasa_aciertos": round((self.aciertos + self.esperas) / consultas, 4) if consultas else None,
+            }
+
+
+cache_remota = CacheRemota(
+    settings.STREAMING_PROXY_DIR,
+    settings.STREAMING_PROXY_CACHE_MB * 1024 * 1024,
+    settings.STREAMING_PROXY_BLOQUE_KB * 1024,
+    timeout=settings.STREAMING_PROXY_TIMEOUT,
+)
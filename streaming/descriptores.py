@@ -0,0 +1,160 @@
+"""
+Descriptores de archivo de la ruta de streaming.
+
+Cada Range de StreamFileView necesita leer el archivo. En vez de abrir uno por
+request (y depender del GC para cerrarlo), los archivos calientes comparten un
+único descriptor de solo lectura: las lecturas son posicionales (os.pread), no
+hay offset compartido y varios requests lo usan a la vez sin seek.
+
+- Solo se reutilizan descriptores con una `clave` que identifique el contenido
+  (asset, tamaño y checksum del token): un archivo regenerado en la misma ruta
+  tiene otra clave y nunca se lee con el descriptor del archivo viejo.
+- Presupuesto: como mucho STREAMING_DESCRIPTORES_MAX descriptores en el pool;
+  se cierran primero los que nadie usa hace más tiempo (LRU). Si todos están en
+  uso, el request usa un descriptor transitorio que se cierra al terminar.
+- Cada adquirir() tiene su liberar() en un finally: al completar la respuesta o
+  si el cliente se desconecta (Django cierra el iterador) el descriptor se suelta.
+- Un descriptor abierto retiene el espacio de un archivo ya borrado (el original
+  que reemplazó faststart, un asset eliminado). Cada REVISION_SEGUNDOS, adquirir()
+  cierra los libres cuyo archivo ya no tiene nombre en el disco (st_nlink == 0).
+"""
+import os
+import resource
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Cada cuánto adquirir() busca descriptores libres de archivos borrados
+REVISION_SEGUNDOS = 30
+
+
+class Descriptor:
+    __slots__ = ("fd", "clave", "usos", "en_pool")
+
+    def __init__(self, fd, clave, en_pool):
+        self.fd = fd
+        self.clave = clave
+        self.usos = 1
+        self.en_pool = en_pool
+
+
+class PoolDescriptores:
+
+    def __init__(self, maximo, revision_segundos=REVISION_SEGUNDOS):
+        self.maximo = maximo
+        self.revision_segundos = revision_segundos
+        self._entradas = OrderedDict()   # (ruta, clave) -> Descriptor (el más reciente al final)
+        self._lock = threading.Lock()
+        self._ultima_revision = time.monotonic()
+        self.transitorios = 0   # abiertos ahora fuera del pool
+        self.aperturas = self.reutilizaciones = self.cierres = self.desalojos = self.borrados = 0
+
+    def _desalojar_uno(self) -> bool:
+        """Cierra el descriptor libre usado hace más tiempo (con el lock tomado)."""
+        for llave, descriptor in self._entradas.items():
+            if descriptor.usos == 0:
+                del self._entradas[llave]
+                os.close(descriptor.fd)
+                self.cierres += 1
+                self.desalojos += 1
+                return True
+        return False
+
+    def _cerrar_borrados(self):
+        """
+        Cierra los descriptores libres de archivos borrados (con el lock tomado):
+        mientras sigan abiertos el sistema no libera su espacio.
+        """
+        ahora = time.monotonic()
+        if ahora - self._ultima_revision < self.revision_segundos:
+            return
+        self._ultima_revision = ahora
+        for llave, descriptor in list(self._entradas.items()):
+            if descriptor.usos == 0 and os.fstat(descriptor.fd).st_nlink == 0:
+                del self._entradas[llave]
+                os.close(descriptor.fd)
+                self.cierres += 1
+                self.borrados += 1
+
+    def adquirir(self, ruta, clave=None) -> Descriptor:
+        """Descriptor de solo lectura para `ruta`; devolverlo siempre con liberar()."""
+        llave = (ruta, clave)
+        if clave is not None and self.maximo > 0:
+            with self._lock:
+                self._cerrar_borrados()
+                descriptor = self._entradas.get(llave)
+                if descriptor is not None:
+                    descriptor.usos += 1
+                    self._entradas.move_to_end(llave)
+                    self.reutilizaciones += 1
+                    return descriptor
+
+        fd = os.open(ruta, os.O_RDONLY)
+        with self._lock:
+            self.aperturas += 1
+            if clave is not None and self.maximo > 0:
+                existente = self._entradas.get(llave)
+                if existente is not None:
+                    # otro request lo abrió mientras tanto: usar ese
+                    os.close(fd)
+                    self.cierres += 1
+                    existente.usos += 1
+                    self._entradas.move_to_end(llave)
+                    self.reutilizaciones += 1
+                    return existente
+                if len(self._entradas) < self.maximo or self._desalojar_uno():
+                    descriptor = self._entradas[llave] = Descriptor(fd, llave, en_pool=True)
+                    return descriptor
+            self.transitorios += 1
+            return Descriptor(fd, llave, en_pool=False)
+
+    def liberar(self, descriptor):
+        with self._lock:
+            descriptor.usos -= 1
+            if descriptor.en_pool:
+                return   # queda abierto para el próximo request
+            self.transitorios -= 1
+            self.cierres += 1
+        os.close(descriptor.fd)
+
+    @contextmanager
+    def abierto(self, ruta, clave=None):
+        descriptor = self.adquirir(ruta, clave)
+        try:
+            yield descriptor.fd
+        finally:
+            self.liberar(descriptor)
+
+    def cerrar_todos(self):
+        """Cierra los descriptores libres del pool (los que están en uso siguen)."""
+        with self._lock:
+            while self._desalojar_uno():
+                pass
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            en_uso = sum(1 for d in self._entradas.values() if d.usos)
+            datos = {
+                "pool": len(self._entradas),
+                "pool_en_uso": en_uso,
+                "pool_maximo": self.maximo,
+                "transitorios": self.transitorios,
+                "aperturas": self.aperturas,
+                "reutilizaciones": self.reutilizaciones,
+                "cierres": self.cierres,
+                "desalojos": self.desalojos,
+                "borrados": self.borrados,
+            }
+        # descriptores de todo el proceso frente al límite del sistema (RLIMIT_NOFILE)
+        try:
+            datos["proceso_abiertos"] = len(os.listdir("/proc/self/fd"))
+        except OSError:
+            datos["proceso_abiertos"] = None
+        datos["proceso_limite"] = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        return datos
+
+
+descriptores = PoolDescriptores(settings.STREAMING_DESCRIPTORES_MAX)
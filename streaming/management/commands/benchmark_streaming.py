@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+import uuid
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from content.models import Pelicula
+from profiles.models import Perfil
+from streaming import benchmark
+from subscriptions.models import Plan, Suscripcion
+from uploader.models import MediaAsset
+from users.models import Usuario
+
+# métricas que se comparan entre corridas: (ruta en el JSON, menor es mejor)
+_COMPARABLES = (
+    ("latencias.play.p50_ms", True),
+    ("latencias.play.p95_ms", True),
+    ("latencias.play.p99_ms", True),
+    ("latencias.rango_inicio_ttfb.p95_ms", True),
+    ("latencias.rango_ttfb.p50_ms", True),
+    ("latencias.rango_ttfb.p95_ms", True),
+    ("latencias.rango_ttfb.p99_ms", True),
+    ("latencias.rango_seek_ttfb.p95_ms", True),
+    ("latencias.progreso.p95_ms", True),
+    ("arranque.p95_ms", True),
+    ("throughput_mb_s", False),
+    ("requests_s", False),
+    ("cortes", True),
+    ("errores_total", True),
+    ("servidor.cpu_por_stream", True),
+    ("servidor.fds_max", True),
+)
+
+
+def _valor(datos, ruta):
+    for parte in ruta.split("."):
+        if not isinstance(datos, dict):
+            return None
+        datos = datos.get(parte)
+    return datos
+
+
+def _formato(valor):
+    return f"{valor:.6g}" if isinstance(valor, float) else str(valor)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=settings.BASE_DIR).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Prueba de carga del streaming: crea películas y archivos sintéticos y simula N "
+            "espectadores (Play, Range con seeks, pings de progreso) contra un servidor en marcha. "
+            "Reporta p50/p95/p99, throughput, descriptores y CPU por stream; --salida guarda el "
+            "resultado en JSON y --comparar compara corridas (p. ej. de distintos commits).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000",
+                            help="Servidor a probar (misma base y MEDIA_ROOT que este proceso)")
+        parser.add_argument("--espectadores", type=int, default=20)
+        parser.add_argument("--duracion", type=float, default=30.0, help="Segundos de prueba")
+        parser.add_argument("--peliculas", type=int, default=3, help="Películas sintéticas")
+        parser.add_argument("--tamano-mb", type=int, default=64, help="Tamaño de cada archivo sintético")
+        parser.add_argument("--bitrate-kbps", type=int, default=5000, help="Bitrate simulado del video")
+        parser.add_argument("--buffer-segundos", type=float, default=30.0,
+                            help="Segundos de video que cada reproductor mantiene por delante")
+        parser.add_argument("--bloque-kb", type=int, default=2048, help="Tamaño de cada Range secuencial")
+        parser.add_argument("--prob-seek", type=float, default=0.1, help="Probabilidad de seek por Range")
+        parser.add_argument("--pid", type=int, help="PID del servidor (en este host) para medir CPU y descriptores")
+        parser.add_argument("--salida", help="Guarda el resultado en este archivo JSON")
+        parser.add_argument("--etiqueta", default="", help="Nombre de la corrida en el JSON")
+        parser.add_argument("--conservar", action="store_true",
+                            help="No borra usuario, películas ni archivos sintéticos al terminar")
+        parser.add_argument("--comparar", nargs="+", metavar="JSON",
+                            help="No corre la prueba: compara resultados guardados con --salida")
+
+    def handle(self, *args, **options):
+        if options["comparar"]:
+            self._comparar(options["comparar"])
+            return
+
+        corrida = uuid.uuid4().hex[:8]
+        self.stdout.write(f"Preparando {options['peliculas']} película(s) de {options['tamano_mb']} MB ...")
+        datos = self._preparar(corrida, options)
+        try:
+            resultado = self._correr(datos, options)
+            self._reportar(resultado)
+            if options["salida"]:
+                with open(options["salida"], "w") as f:
+                    json.dump(resultado, f, indent=2)
+                self.stdout.write(self.style.SUCCESS(f"Resultado guardado en {options['salida']}."))
+        finally:
+            if not options["conservar"]:
+                self._limpiar(datos)
+
+    # --- datos sintéticos ----------------------------------------------------
+
+    def _preparar(self, corrida, options):
+        carpeta = os.path.join("benchmark", corrida)
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, carpeta), exist_ok=True)
+        password = uuid.uuid4().hex
+        usuario = Usuario.objects.create_user(
+            email=f"benchmark-{corrida}@example.com", name=f"benchmark {corrida}", password=password,
+        )
+        plan = Plan.objects.create(nombre=f"[benchmark] {corrida}", precio=0, duracion_dias=1)
+        Suscripcion.crear_desde_plan(usuario, plan)
+        perfil = Perfil.objects.create(usuario=usuario, nombre="benchmark")
+
+        # bulk_create: sin señales, así no se encolan trabajos de media ni se toca el catálogo
+        peliculas = Pelicula.objects.bulk_create([
+            Pelicula(titulo=f"[benchmark {corrida}] {i + 1}") for i in range(options["peliculas"])
+        ])
+        assets = []
+        for pelicula in peliculas:
+            nombre = os.path.join(carpeta, f"pelicula_{pelicula.pk}.mp4")
+            tamano, checksum = self._archivo_sintetico(os.path.join(settings.MEDIA_ROOT, nombre),
+                                                       options["tamano_mb"])
+            assets.append(MediaAsset(
+                pelicula=pelicula, archivo=nombre, calidad="1080p", mime_type="video/mp4",
+                tamano_bytes=tamano, duracion_segundos=tamano * 8 / (options["bitrate_kbps"] * 1000),
+                bitrate_kbps=options["bitrate_kbps"], checksum_sha256=checksum, metadatos_en=timezone.now(),
+            ))
+        MediaAsset.objects.bulk_create(assets)
+        return {"usuario": usuario, "password": password, "plan": plan, "perfil": perfil,
+                "peliculas": peliculas, "carpeta": carpeta}
+
+    @staticmethod
+    def _archivo_sintetico(ruta, megas):
+        h = hashlib.sha256()
+        with open(ruta, "wb") as f:
+            for _ in range(megas):
+                bloque = os.urandom(1024 * 1024)
+                h.update(bloque)
+                f.write(bloque)
+        return megas * 1024 * 1024, h.hexdigest()
+
+    def _limpiar(self, datos):
+        ids = [p.pk for p in datos["peliculas"]]
+        # primero los assets: su post_delete reindexa la película, que aún debe existir
+        MediaAsset.objects.filter(pelicula_id__in=ids).delete()
+        Pelicula.objects.filter(pk__in=ids).delete()
+        datos["usuario"].delete()
+        datos["plan"].delete()
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, datos["carpeta"]), ignore_errors=True)
+
+    # --- corrida -------------------------------------------------------------
+
+    def _sesion(self, url, datos):
+        """Login (JWT) y perfil activo (cookie firmada), una vez para todos los espectadores."""
+        sesion = requests.Session()
+        r = sesion.post(f"{url}/api/users/login/",
+                        json={"email": datos["usuario"].email, "password": datos["password"]})
+        if r.status_code != 200:
+            raise CommandError(f"Login falló ({r.status_code}): {r.text[:300]}")
+        token = r.json()["access"]
+        r = sesion.post(f"{url}/api/perfiles/{datos['perfil'].pk}/activar/",
+                        headers={"Authorization": f"Bearer {token}"})
+        if r.status_code != 200:
+            raise CommandError(f"No se pudo activar el perfil ({r.status_code}): {r.text[:300]}")
+        return token, sesion.cookies.get_dict()
+
+    def _correr(self, datos, options):
+        url = options["url"].rstrip("/")
+        token, cookies = self._sesion(url, datos)
+        metricas = benchmark.Metricas()
+        inicio = time.monotonic()
+        parametros = benchmark.Parametros(
+            url, token, cookies, [p.pk for p in datos["peliculas"]], inicio + options["duracion"],
+            bitrate_kbps=options["bitrate_kbps"], buffer_segundos=options["buffer_segundos"],
+            bloque_bytes=options["bloque_kb"] * 1024, prob_seek=options["prob_seek"],
+        )
+
+        muestreo = None
+        if options["pid"]:
+            pids = benchmark.procesos_servidor(options["pid"])
+            cpu_inicio = benchmark.cpu_segundos(pids)
+            muestreo = benchmark.MuestreoServidor(options["pid"])
+            muestreo.start()
+
+        self.stdout.write(f"{options['espectadores']} espectador(es) durante {options['duracion']:.0f} s "
+                          f"contra {url} ...")
+        espectadores = [benchmark.Espectador(i, parametros, metricas) for i in range(options["espectadores"])]
+        for espectador in espectadores:
+            espectador.start()
+        for espectador in espectadores:
+            espectador.join()
+        transcurrido = time.monotonic() - inicio
+
+        servidor = None
+        if muestreo is not None:
+            muestreo.detener.set()
+            muestreo.join()
+            cpu = benchmark.cpu_segundos(benchmark.procesos_servidor(options["pid"])) - cpu_inicio
+            servidor = {
+                "cpu_segundos": round(cpu, 3),
+                "cpu_por_stream": round(cpu / transcurrido / options["espectadores"], 4),
+                "fds_max": max(muestreo.fds, default=None),
+                "fds_promedio": round(sum(muestreo.fds) / len(muestreo.fds), 1) if muestreo.fds else None,
+            }
+
+        requests_total = sum(len(v) for k, v in metricas.latencias.items() if not k.endswith("_ttfb"))
+        return {
+            "etiqueta": options["etiqueta"],
+            "commit": _commit(),
+            "fecha": timezone.now().isoformat(),
+            "parametros": {clave: options[clave] for clave in (
+                "url", "espectadores", "duracion", "peliculas", "tamano_mb", "bitrate_kbps",
+                "buffer_segundos", "bloque_kb", "prob_seek")},
+            "duracion_real": round(transcurrido, 2),
+            "latencias": {tipo: benchmark.resumen(valores) for tipo, valores in sorted(metricas.latencias.items())},
+            "arranque": benchmark.resumen(metricas.arranques),
+            "errores": dict(metricas.errores),
+            "errores_total": sum(metricas.errores.values()),
+            "bytes": metricas.bytes,
+            "throughput_mb_s": round(metricas.bytes / transcurrido / 1024 / 1024, 2),
+            "requests_s": round(requests_total / transcurrido, 1),
+            "reproducciones": metricas.eventos["reproducciones"],
+            "seeks": metricas.eventos["seeks"],
+            "cortes": metricas.eventos["cortes"],
+            "servidor": servidor,
+        }
+
+    # --- reportes ------------------------------------------------------------
+
+    def _reportar(self, r):
+        self.stdout.write("")
+        self.stdout.write(f"{'request':<22}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for tipo, datos in r["latencias"].items():
+            self.stdout.write(f"{tipo:<22}{datos['n']:>7}" + "".join(
+                f"{datos[k] if datos[k] is not None else '-':>10}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")))
+        a = r["arranque"]
+        self.stdout.write(f"{'arranque (play+inicio)':<22}{a['n']:>7}{a['p50_ms'] or '-':>10}"
+                          f"{a['p95_ms'] or '-':>10}{a['p99_ms'] or '-':>10}{a['max_ms'] or '-':>10}")
+        self.stdout.write("")
+        self.stdout.write(f"Throughput: {r['throughput_mb_s']} MB/s, {r['requests_s']} requests/s")
+        self.stdout.write(f"Reproducciones: {r['reproducciones']}, seeks: {r['seeks']}, cortes: {r['cortes']}")
+        self.stdout.write(f"Errores: {r['errores_total']} {r['errores'] or ''}")
+        if r["servidor"]:
+            s = r["servidor"]
+            self.stdout.write(f"Servidor: {s['cpu_segundos']} s de CPU, {s['cpu_por_stream']} núcleos por stream, "
+                              f"descriptores máx {s['fds_max']} (prom. {s['fds_promedio']})")
+
+    def _comparar(self, archivos):
+        corridas = []
+        for archivo in archivos:
+            with open(archivo) as f:
+                corridas.append(json.load(f))
+        nombres = [c.get("etiqueta") or c.get("commit") or os.path.basename(a) for c, a in zip(corridas, archivos)]
+        self.stdout.write(f"{'métrica':<36}" + "".join(f"{n[:20]:>22}" for n in nombres))
+        for ruta, menor_mejor in _COMPARABLES:
+            valores = [_valor(c, ruta) for c in corridas]
+            if all(v is None for v in valores):
+                continue
+            referencia = valores[0]
+            celdas = []
+            for i, v in enumerate(valores):
+                if v is None:
+                    celdas.append("-")
+                elif i == 0 or not referencia:
+                    celdas.append(_formato(v))
+                else:
+                    cambio = (v - referencia) / referencia * 100
+                    mejor = (cambio < 0) == menor_mejor
+                    celdas.append(f"{_formato(v)} ({cambio:+.0f}%{'' if abs(cambio) < 5 else ' ✓' if mejor else ' ✗'})")
+            self.stdout.write(f"{ruta:<36}" + "".join(f"{c:>22}" for c in celdas))
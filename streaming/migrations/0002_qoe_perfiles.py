@@ -0,0 +1,30 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+        ('streaming', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstimacionQoE',
+            fields=[
+                ('perfil', models.OneToOneField(db_column='id_perfil', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='qoe', serialize=False, to='profiles.perfil')),
+                ('kbps', models.FloatField()),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('segundos_reproduccion', models.FloatField(default=0)),
+                ('segundos_rebuffer', models.FloatField(default=0)),
+                ('cortes', models.PositiveIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Estimación de QoE',
+                'verbose_name_plural': 'Estimaciones de QoE',
+                'db_table': 'qoe_perfiles',
+            },
+        ),
+    ]
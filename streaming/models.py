@@ -1,9 +1,34 @@
 # streaming/models.py
 from django.db import models
 from uploader.models import MediaAsset  # reutilizamos el modelo real
+from profiles.models import Perfil
 
 class MediaAssetReadOnly(MediaAsset):
     class Meta:
         proxy = True
         verbose_name = "Revisión de media"
-        verbose_name_plural = "Revisión de media"
\ No newline at end of file
+        verbose_name_plural = "Revisión de media"
+
+class EstimacionQoE(models.Model):
+    """
+    Estimación móvil del ancho de banda de un perfil, alimentada por el beacon
+    de QoE del reproductor (POST /api/streaming/qoe/). PlayPeliculaView la usa
+    para elegir la rendición cuando el cliente no informa su throughput.
+    """
+    perfil = models.OneToOneField(
+        Perfil, on_delete=models.CASCADE, primary_key=True, db_column="id_perfil", related_name="qoe"
+    )
+    kbps = models.FloatField()                      # media móvil exponencial del throughput
+    muestras = models.PositiveIntegerField(default=0)
+    segundos_reproduccion = models.FloatField(default=0)
+    segundos_rebuffer = models.FloatField(default=0)
+    cortes = models.PositiveIntegerField(default=0)
+    actualizado_en = models.DateTimeField()
+
+    class Meta:
+        db_table = "qoe_perfiles"
+        verbose_name = "Estimación de QoE"
+        verbose_name_plural = "Estimaciones de QoE"
+
+    def __str__(self):
+        return f"Perfil {self.perfil_id}: {self.kbps:.0f} kbps"
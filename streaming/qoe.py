@@ -0,0 +1,176 @@
+"""
+Selección de rendición según el ancho de banda del espectador.
+
+PlayPeliculaView ya no entrega siempre la mejor calidad: elige la mejor
+rendición cuyo bitrate entra en el presupuesto (throughput estimado por
+STREAMING_ABR_MARGEN) y cuya resolución no excede lo que la pantalla puede
+mostrar. El throughput sale de:
+
+1. la pista del cliente en el Play (?kbps=, p. ej. navigator.connection.downlink),
+2. la estimación del perfil (tabla qoe_perfiles): media móvil exponencial de lo
+   que informa el beacon de QoE del reproductor (POST /api/streaming/qoe/).
+   Si el beacon reporta cortes, la muestra se limita a una fracción del bitrate
+   que se estaba reproduciendo: ese bitrate no era sostenible.
+
+Con las dos vale la menor (ver estimar): la pista es gruesa (Chromium la redondea
+y la topa en 10 Mbps) y no sabe de los cortes que bajaron la estimación del perfil.
+
+La pantalla (?ancho=&alto=) limita la resolución a la menor rendición que la
+cubre; no tiene sentido bajar 1080p a un teléfono de 720 líneas.
+Sin pistas ni estimación vigente se mantiene el orden fijo de PREFERRED.
+Los trailers solo se eligen si la película no tiene otro asset (o si se piden).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from uploader.transcodificacion import AUDIO_KBPS, ESCALERA
+
+# Peso de cada muestra nueva en la media móvil
+ALFA = 0.3
+# Con cortes, la muestra vale como mucho esta fracción del bitrate reproducido
+TOPE_CON_CORTES = 0.8
+# Pistas fuera de rango se ignoran (errores del cliente o valores absurdos)
+_KBPS_MAX = 10_000_000
+_PIXELES_MAX = 20_000
+
+# Alto y bitrate total nominales por calidad, para assets sin metadatos extraídos
+_NOMINALES = {calidad.upper(): (alto, kbps + AUDIO_KBPS) for calidad, (alto, kbps) in ESCALERA.items()}
+
+
+def vigente_desde():
+    """Las estimaciones más viejas que esto no se usan (la red del perfil pudo cambiar)."""
+    return timezone.now() - timedelta(hours=settings.STREAMING_QOE_VIGENCIA_HORAS)
+
+
+def _numero(valor, maximo):
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if 0 < numero <= maximo else None
+
+
+def pistas_cliente(query_params):
+    """
+    (kbps, alto de pantalla) informados en el Play; None si faltan o no son válidos.
+    El alto útil es el lado menor: el video se ve a pantalla completa apaisado.
+    """
+    kbps = _numero(query_params.get("kbps"), _KBPS_MAX)
+    ancho = _numero(query_params.get("ancho"), _PIXELES_MAX)
+    alto = _numero(query_params.get("alto"), _PIXELES_MAX)
+    lados = [lado for lado in (ancho, alto) if lado]
+    return kbps, (int(min(lados)) if lados else None)
+
+
+def estimar(kbps_cliente, kbps_perfil):
+    """(kbps estimados, fuente) con la pista del Play y la estimación vigente del perfil."""
+    if kbps_cliente and kbps_perfil:
+        if kbps_perfil <= kbps_cliente:
+            return kbps_perfil, "perfil"
+        return kbps_cliente, "cliente"
+    if kbps_cliente:
+        return kbps_cliente, "cliente"
+    if kbps_perfil:
+        return kbps_perfil, "perfil"
+    return None, None
+
+
+def kbps_asset(asset):
+    """Bitrate total del asset: el de metadatos, si no tamaño/duración, si no el nominal."""
+    if asset["bitrate_kbps"]:
+        return asset["bitrate_kbps"]
+    if asset["tamano_bytes"] and asset["duracion_segundos"]:
+        return asset["tamano_bytes"] * 8 / 1000 / asset["duracion_segundos"]
+    return _NOMINALES.get((asset["calidad"] or "").upper(), (None, None))[1]
+
+
+def alto_asset(asset):
+    return asset["alto"] or _NOMINALES.get((asset["calidad"] or "").upper(), (None, None))[0]
+
+
+def elegir(candidatos, presupuesto, pantalla, preferidas):
+    """
+    El asset a reproducir entre `candidatos` (dicts con las columnas de
+    media_assets). Los que entran en `presupuesto` (kbps) y en la pantalla
+    (`pantalla`: alto en píxeles) se ordenan por `preferidas` y después el más
+    reciente; si ninguno entra, el de menor bitrate. Un dato desconocido (sin
+    presupuesto, sin pantalla, asset sin bitrate ni alto) no descarta a nadie.
+    """
+    peliculas = [c for c in candidatos if not c["es_trailer"]]
+    candidatos = peliculas or candidatos
+
+    orden = [calidad.upper() for calidad in preferidas]
+    altos = [alto_asset(c) for c in candidatos]
+    cubren = [alto for alto in altos if alto and pantalla and alto >= pantalla]
+    alto_max = min(cubren) if cubren else None
+
+    def clave(par):
+        asset, alto = par
+        kbps = kbps_asset(asset)
+        entra = ((presupuesto is None or kbps is None or kbps <= presupuesto)
+                 and (alto_max is None or alto is None or alto <= alto_max))
+        calidad = (asset["calidad"] or "").upper()
+        posicion = orden.index(calidad) if calidad in orden else len(orden)
+        return (
+            not entra,
+            posicion if entra else 0,
+            0 if entra else (kbps if kbps is not None else float("inf")),
+            posicion,
+            -asset["creado_en"].timestamp(),
+        )
+
+    return min(zip(candidatos, altos), key=clave)[0]
+
+
+# Un INSERT ... ON CONFLICT por beacon: valida el perfil, calcula la muestra
+# (limitada si hubo cortes) y actualiza la media móvil. Una estimación vencida
+# se reemplaza por la muestra en vez de promediarse.
+_SQL_BEACON = """
+WITH muestra AS (
+    SELECT CASE
+        WHEN %(rebuffer)s > 0 OR %(cortes)s > 0 THEN LEAST(%(kbps)s, COALESCE(
+            (SELECT a.bitrate_kbps * %(tope)s FROM media_assets a WHERE a.id = %(asset)s), %(kbps)s))
+        ELSE %(kbps)s
+    END AS kbps
+)
+INSERT INTO qoe_perfiles (id_perfil, kbps, muestras, segundos_reproduccion,
+                          segundos_rebuffer, cortes, actualizado_en)
+SELECT p.id_perfil, m.kbps, 1, %(reproduccion)s, %(rebuffer)s, %(cortes)s, %(ahora)s
+FROM perfiles p, muestra m
+WHERE p.id_perfil = %(perfil)s AND p.id_usuario = %(usuario)s
+ON CONFLICT (id_perfil) DO UPDATE SET
+    kbps = CASE WHEN qoe_perfiles.actualizado_en < %(vigente)s THEN EXCLUDED.kbps
+                ELSE %(alfa)s * EXCLUDED.kbps + (1 - %(alfa)s) * qoe_perfiles.kbps END,
+    muestras = qoe_perfiles.muestras + 1,
+    segundos_reproduccion = qoe_perfiles.segundos_reproduccion + EXCLUDED.segundos_reproduccion,
+    segundos_rebuffer = qoe_perfiles.segundos_rebuffer + EXCLUDED.segundos_rebuffer,
+    cortes = qoe_perfiles.cortes + EXCLUDED.cortes,
+    actualizado_en = EXCLUDED.actualizado_en
+RETURNING kbps, muestras
+"""
+
+
+def registrar_beacon(usuario_id, perfil_id, kbps, asset_id=None, segundos_reproduccion=0,
+                     segundos_rebuffer=0, cortes=0):
+    """
+    Suma una muestra del reproductor a la estimación del perfil.
+    Retorna (kbps estimados, muestras) o None si el perfil no es del usuario.
+    """
+    with connection.cursor() as cur:
+        cur.execute(_SQL_BEACON, {
+            "usuario": usuario_id,
+            "perfil": perfil_id,
+            "asset": asset_id,
+            "kbps": float(kbps),
+            "reproduccion": float(segundos_reproduccion),
+            "rebuffer": float(segundos_rebuffer),
+            "cortes": int(cortes),
+            "tope": TOPE_CON_CORTES,
+            "alfa": ALFA,
+            "vigente": vigente_desde(),
+            "ahora": timezone.now(),
+        })
+        return cur.fetchone()
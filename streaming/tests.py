@@ -1,3 +1,352 @@
-from django.test import TestCase
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from .cache_remota import CacheRemota, OrigenNoDisponible
+from .descriptores import PoolDescriptores
+from .qoe import elegir, estimar, pistas_cliente
+from .views import StreamFileView, _expiracion_url, _sign_stream, range_file_iterator
+
+CONTENIDO = bytes(range(256)) * 4000   # ~1 MB con bytes distintos por posición
+
+
+class _Origen(BaseHTTPRequestHandler):
+    """Origen HTTP local: sirve CONTENIDO con soporte de Range y cuenta los GET."""
+
+    pedidos = []
+    demora = 0
+    soporta_range = True
+
+    def do_GET(self):
+        type(self).pedidos.append(self.headers.get("Range"))
+        time.sleep(self.demora)
+        rango = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range") or "")
+        if rango and self.soporta_range:
+            inicio, fin = int(rango.group(1)), min(int(rango.group(2)), len(CONTENIDO) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fin}/{len(CONTENIDO)}")
+        else:
+            inicio, fin = 0, len(CONTENIDO) - 1
+            self.send_response(200)
+        cuerpo = CONTENIDO[inicio:fin + 1]
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class CacheRemotaTests(SimpleTestCase):
+    bloque = 64 * 1024
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Origen)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.servidor.server_port}/video.mp4"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _Origen.pedidos = []
+        _Origen.demora = 0
+        _Origen.soporta_range = True
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, True)
+        self.cache = CacheRemota(self.directorio, 100 * self.bloque, self.bloque)
+
+    def _bloques_en_disco(self):
+        return sorted(nombre for _, _, archivos in os.walk(self.directorio)
+                      for nombre in archivos if nombre.endswith(".bin"))
+
+    def test_tamano_y_bloques(self):
+        tamano = self.cache.tamano(self.url)
+        self.assertEqual(tamano, len(CONTENIDO))
+        ultimo = (tamano - 1) // self.bloque
+        self.assertEqual(self.cache.bloque(self.url, 0, tamano), CONTENIDO[:self.bloque])
+        self.assertEqual(self.cache.bloque(self.url, ultimo, tamano), CONTENIDO[ultimo * self.bloque:])
+
+    def test_segunda_lectura_sale_del_disco(self):
+        tamano = len(CONTENIDO)
+        self.cache.bloque(self.url, 3, tamano)
+        pedidos = len(_Origen.pedidos)
+        for _ in range(5):
+            self.assertEqual(self.cache.bloque(self.url, 3, tamano),
+                             CONTENIDO[3 * self.bloque:4 * self.bloque])
+        self.assertEqual(len(_Origen.pedidos), pedidos)
+        self.assertEqual(self.cache.estadisticas()["aciertos"], 5)
+
+    def test_single_flight(self):
+        _Origen.demora = 0.3
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(
+            self.cache.bloque(self.url, 2, len(CONTENIDO)))) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(len(_Origen.pedidos), 1)
+        self.assertEqual(resultados, [CONTENIDO[2 * self.bloque:3 * self.bloque]] * 8)
+
+    def test_desalojo_lru(self):
+        cache = CacheRemota(self.directorio, 4 * self.bloque, self.bloque)
+        tamano = len(CONTENIDO)
+        for indice in range(4):
+            cache.bloque(self.url, indice, tamano)
+        # el bloque 0 es el más usado recientemente
+        hace_rato = time.time() - 3600
+        for i, nombre in enumerate(self._bloques_en_disco()):
+            os.utime(os.path.join(cache._carpeta(self.url), nombre), (hace_rato + i, hace_rato + i))
+        cache.bloque(self.url, 0, tamano)
+        cache.bloque(self.url, 4, tamano)
+        cache.depurar()
+        en_disco = self._bloques_en_disco()
+        self.assertLessEqual(len(en_disco), 4)
+        self.assertIn("00000000.bin", en_disco)
+        self.assertIn("00000004.bin", en_disco)
+        self.assertNotIn("00000001.bin", en_disco)
+
+    def test_origen_sin_range(self):
+        _Origen.soporta_range = False
+        with self.assertRaises(OrigenNoDisponible):
+            self.cache.bloque(self.url, 0, len(CONTENIDO))
+        self.assertEqual(self._bloques_en_disco(), [])
+
+    def _url_stream(self, **extra):
+        datos = {"a": 7, "u": self.url, "m": "video/mp4", "p": 1, "e": _expiracion_url(), **extra}
+        return reverse("stream-file", args=[7, _sign_stream(datos)])
+
+    @staticmethod
+    async def _cuerpo(respuesta):
+        return b"".join([parte async for parte in respuesta.streaming_content])
+
+    async def test_stream_file_proxy(self):
+        with override_settings(STREAMING_REMOTO="proxy"), \
+                mock.patch("streaming.views.cache_remota", self.cache):
+            respuesta = await self.async_client.get(self._url_stream(s=len(CONTENIDO)),
+                                                    headers={"Range": f"bytes=100-{3 * self.bloque + 10}"})
+            self.assertEqual(respuesta.status_code, 206)
+            self.assertEqual(respuesta["Content-Range"], f"bytes 100-{3 * self.bloque + 10}/{len(CONTENIDO)}")
+            self.assertEqual(await self._cuerpo(respuesta), CONTENIDO[100:3 * self.bloque + 11])
+
+            # sin tamaño en el token vale el que informó el origen; el bloque ya está en disco
+            pedidos = len(_Origen.pedidos)
+            respuesta = await self.async_client.get(self._url_stream(), headers={"Range": "bytes=0-999"})
+            self.assertEqual(await self._cuerpo(respuesta), CONTENIDO[:1000])
+            self.assertEqual(len(_Origen.pedidos), pedidos)
+
+    def test_stream_file_proxy_wsgi(self):
+        with override_settings(STREAMING_REMOTO="proxy"), \
+                mock.patch("streaming.views.cache_remota", self.cache):
+            respuesta = self.client.get(self._url_stream(s=len(CONTENIDO)),
+                                        headers={"Range": f"bytes=100-{2 * self.bloque}"})
+            self.assertFalse(respuesta.is_async)
+            self.assertEqual(b"".join(respuesta.streaming_content), CONTENIDO[100:2 * self.bloque + 1])
+
+    def test_stream_file_redirect(self):
+        respuesta = self.client.get(self._url_stream())
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(respuesta["Location"], self.url)
+        with override_settings(STREAMING_REMOTO="proxy"), \
+                mock.patch("streaming.views.cache_remota", self.cache):
+            _Origen.soporta_range = False
+            with self.assertLogs("streaming.views", "WARNING"):
+                respuesta = self.client.get(self._url_stream(s=len(CONTENIDO)))
+            self.assertEqual(respuesta.status_code, 302)
+
+
+class DescriptoresTests(SimpleTestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, True)
+        self.rutas = []
+        for i in range(3):
+            ruta = os.path.join(directorio, f"{i}.mp4")
+            with open(ruta, "wb") as f:
+                f.write(CONTENIDO)
+            self.rutas.append(ruta)
+        self.pool = PoolDescriptores(2)
+
+    def test_reutiliza_y_libera(self):
+        a = self.pool.adquirir(self.rutas[0], "c0")
+        b = self.pool.adquirir(self.rutas[0], "c0")
+        self.assertIs(a, b)
+        self.assertEqual(os.pread(a.fd, 4, 256), CONTENIDO[:4])
+        self.pool.liberar(a)
+        self.pool.liberar(b)
+        datos = self.pool.estadisticas()
+        self.assertEqual((datos["aperturas"], datos["reutilizaciones"], datos["pool"]), (1, 1, 1))
+        # otra clave (archivo regenerado) no usa el descriptor viejo
+        self.assertIsNot(self.pool.adquirir(self.rutas[0], "otro"), a)
+
+    def test_presupuesto(self):
+        en_uso = [self.pool.adquirir(ruta, "c") for ruta in self.rutas[:2]]
+        # pool lleno y todo en uso: descriptor transitorio, se cierra al liberar
+        extra = self.pool.adquirir(self.rutas[2], "c")
+        self.assertFalse(extra.en_pool)
+        self.pool.liberar(extra)
+        with self.assertRaises(OSError):
+            os.fstat(extra.fd)
+        # al liberar uno, el siguiente desaloja el libre más viejo
+        self.pool.liberar(en_uso[0])
+        self.assertTrue(self.pool.adquirir(self.rutas[2], "c").en_pool)
+        with self.assertRaises(OSError):
+            os.fstat(en_uso[0].fd)
+        self.assertEqual(self.pool.estadisticas()["desalojos"], 1)
+
+    def test_cierra_archivos_borrados(self):
+        pool = PoolDescriptores(2, revision_segundos=0)
+        viejo = pool.adquirir(self.rutas[0], "c0")
+        pool.liberar(viejo)
+        en_uso = pool.adquirir(self.rutas[1], "c1")
+        os.remove(self.rutas[0])   # p. ej. borrar_reemplazado tras faststart
+        os.remove(self.rutas[1])
+        pool.liberar(pool.adquirir(self.rutas[2], "c2"))
+        self.assertNotIn((self.rutas[0], "c0"), pool._entradas)
+        # el que está en uso sigue abierto hasta que lo liberen
+        self.assertEqual(os.pread(en_uso.fd, 4, 256), CONTENIDO[:4])
+        datos = pool.estadisticas()
+        self.assertEqual((datos["borrados"], datos["pool"]), (1, 2))
+
+    def test_iterador_cerrado_a_mitad(self):
+        with mock.patch("streaming.views.descriptores", self.pool):
+            partes = range_file_iterator(self.rutas[0], 10, len(CONTENIDO) - 1, chunk_size=1000)
+            self.assertEqual(next(partes), CONTENIDO[10:1010])
+            self.assertEqual(self.pool.estadisticas()["transitorios"], 1)
+            partes.close()   # lo que hace Django si el cliente se desconecta
+        datos = self.pool.estadisticas()
+        self.assertEqual((datos["transitorios"], datos["cierres"]), (0, 1))
+
+
+class PistasClienteTests(SimpleTestCase):
+
+    def test_pistas(self):
+        self.assertEqual(pistas_cliente({"kbps": "3500.5", "ancho": "1080", "alto": "2400"}), (3500.5, 1080))
+        self.assertEqual(pistas_cliente({"alto": "720"}), (None, 720))
+        self.assertEqual(pistas_cliente({}), (None, None))
+        # valores inválidos o absurdos se ignoran
+        self.assertEqual(pistas_cliente({"kbps": "-1", "ancho": "abc", "alto": "0"}), (None, None))
+        self.assertEqual(pistas_cliente({"kbps": "nan"}), (None, None))
+
+    def test_estimar(self):
+        # el perfil bajó por cortes: la pista (downlink, topada en 10 Mbps) no lo pisa
+        self.assertEqual(estimar(10000, 2400.0), (2400.0, "perfil"))
+        self.assertEqual(estimar(1500, 2400.0), (1500, "cliente"))
+        self.assertEqual(estimar(None, 2400.0), (2400.0, "perfil"))
+        self.assertEqual(estimar(10000, None), (10000, "cliente"))
+        self.assertEqual(estimar(None, None), (None, None))
+
+
+class StreamFileServidorTests(SimpleTestCase):
+    """El body es asíncrono solo bajo ASGI; bajo WSGI un iterador asíncrono se leería entero."""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, True)
+        with open(os.path.join(self.media, "video.mp4"), "wb") as f:
+            f.write(CONTENIDO)
+        datos = {"a": 7, "f": "video.mp4", "s": len(CONTENIDO), "m": "video/mp4", "p": 1, "e": _expiracion_url()}
+        self.url = reverse("stream-file", args=[7, _sign_stream(datos)])
+
+    async def _respuesta(self, fabrica, rango):
+        request = fabrica.get(self.url, headers={"Range": rango} if rango else {})
+        with override_settings(MEDIA_ROOT=self.media):
+            return await StreamFileView.as_view()(request, asset_id=7, token=self.url.split("/")[-2])
+
+    async def test_wsgi_sincrono(self):
+        for rango in ("bytes=0-", "bytes=10-99", None):
+            respuesta = await self._respuesta(RequestFactory(), rango)
+            self.assertFalse(respuesta.is_async)
+            cuerpo = b"".join(respuesta.streaming_content)
+            self.assertEqual(cuerpo, CONTENIDO[10:100] if rango == "bytes=10-99" else CONTENIDO)
+            respuesta.close()
+
+    async def test_asgi_asincrono(self):
+        for rango in ("bytes=0-", "bytes=10-99", None):
+            respuesta = await self._respuesta(AsyncRequestFactory(), rango)
+            self.assertTrue(respuesta.is_async)
+            cuerpo = b"".join([parte async for parte in respuesta.streaming_content])
+            self.assertEqual(cuerpo, CONTENIDO[10:100] if rango == "bytes=10-99" else CONTENIDO)
+
+    async def test_sendfile(self):
+        # el body termina donde dice Content-Length (antes seguía hasta el final del archivo)
+        for fabrica in (RequestFactory(), AsyncRequestFactory()):
+            for rango in ("bytes=0-99", "bytes=10-", None):
+                with override_settings(STREAMING_DELIVERY="sendfile"):
+                    respuesta = await self._respuesta(fabrica, rango)
+                if respuesta.is_async:
+                    cuerpo = b"".join([parte async for parte in respuesta.streaming_content])
+                else:
+                    cuerpo = b"".join(respuesta.streaming_content)
+                    respuesta.close()
+                esperado = {"bytes=0-99": CONTENIDO[:100], "bytes=10-": CONTENIDO[10:]}.get(rango, CONTENIDO)
+                self.assertEqual(cuerpo, esperado)
+                self.assertEqual(int(respuesta["Content-Length"]), len(esperado))
+
+
+def _asset(nombre, calidad, kbps=None, alto=None, es_trailer=False, minutos=0):
+    return {"id": nombre, "calidad": calidad, "bitrate_kbps": kbps, "alto": alto, "es_trailer": es_trailer,
+            "tamano_bytes": None, "duracion_segundos": None,
+            "creado_en": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutos)}
+
+
+class ElegirRendicionTests(SimpleTestCase):
+    preferidas = ("1080p", "720p", "480p", "360p")
+
+    def setUp(self):
+        self.escalera = [
+            _asset("mezz", "1080p", 18000, 1080),
+            _asset("1080", "1080p", 5128, 1080, minutos=1),
+            _asset("720", "720p", 2928, 720, minutos=1),
+            _asset("480", "480p", minutos=1),   # sin metadatos: bitrate y alto nominales
+            _asset("360", "360p", 928, 360, minutos=1),
+        ]
+
+    def _elegir(self, presupuesto=None, pantalla=None, candidatos=None):
+        return elegir(candidatos or self.escalera, presupuesto, pantalla, self.preferidas)["id"]
+
+    def test_sin_pistas_orden_preferido(self):
+        # misma calidad: la más reciente (la rendición, no el mezzanine)
+        self.assertEqual(self._elegir(), "1080")
+
+    def test_entra_en_el_presupuesto(self):
+        self.assertEqual(self._elegir(40000), "1080")
+        self.assertEqual(self._elegir(3200), "720")
+        self.assertEqual(self._elegir(2000), "480")
+
+    def test_ninguno_entra(self):
+        self.assertEqual(self._elegir(240), "360")
+
+    def test_pantalla(self):
+        self.assertEqual(self._elegir(pantalla=700), "720")
+        self.assertEqual(self._elegir(pantalla=300), "360")
+        # pantalla mayor que todas las rendiciones: sin tope
+        self.assertEqual(self._elegir(pantalla=2160), "1080")
+        self.assertEqual(self._elegir(7000, pantalla=480), "480")
+
+    def test_trailer_excluido(self):
+        candidatos = self.escalera + [
+            _asset("trailer", "360p", 300, 360, es_trailer=True, minutos=5),
+            _asset("trailer-hd", "1080p", 3000, 1080, es_trailer=True, minutos=5),
+        ]
+        self.assertEqual(self._elegir(candidatos=candidatos), "1080")
+        self.assertEqual(self._elegir(100, candidatos=candidatos), "360")
+        self.assertEqual(self._elegir(3500, candidatos=candidatos), "720")
+        # solo trailers (o ?trailer=true): se elige entre ellos
+        self.assertEqual(self._elegir(1000, candidatos=candidatos[-2:]), "trailer")
@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import PlayPeliculaView, ListStreamsView, StreamFileView
+from .views import PlayPeliculaView, QoEBeaconView, ListStreamsView, StreamFileView, DerivadoView, CacheInicioView, CacheRemotaView, DescriptoresView
 
 urlpatterns = [
     path('play/<int:pelicula_id>/', PlayPeliculaView.as_view(), name='play-pelicula'),
     path('list/<int:pelicula_id>/', ListStreamsView.as_view(), name='list-streams'),
+    path('qoe/', QoEBeaconView.as_view(), name='stream-qoe'),
     path('file/<int:asset_id>/<str:token>/', StreamFileView.as_view(), name='stream-file'),
+    path('derivados/<int:asset_id>/<int:exp>/<str:token>/<path:ruta>', DerivadoView.as_view(), name='stream-derivado'),
+    path('cache-inicio/', CacheInicioView.as_view(), name='stream-cache-inicio'),
+    path('cache-remota/', CacheRemotaView.as_view(), name='stream-cache-remota'),
+    path('descriptores/', DescriptoresView.as_view(), name='stream-descriptores'),
 ]
@@ -1,26 +1,49 @@
 # streaming/views.py
+import asyncio
+import base64
+import json
 import time
 import hmac
 import hashlib
+import logging
+
+from datetime import timedelta
 
 from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import parse_etags
+from django.utils.http import http_date, parse_http_date_safe
+from django.views import View
 import os
 import re
+import stat
+from urllib.parse import quote
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 from subscriptions.permissions import EsSuscriptorActivo
+from uploader.empaquetado import directorio_derivados
+from .cache_inicio import cache_inicio
+from .cache_remota import OrigenNoDisponible, cache_remota
+from .descriptores import descriptores
+from . import qoe
 from uploader.models import MediaAsset
 from content.models import Pelicula
-from profiles.models import Perfil
-from history.models import Historial  # mapea a public.historial
+from django.core.exceptions import SuspiciousFileOperation
 from django.core.signing import BadSignature
+from django.utils._os import safe_join
+
+logger = logging.getLogger(__name__)
 
 COOKIE_NAME = "perfil_activo"
 COOKIE_SALT = "perfil.activo.v1"
@@ -48,20 +71,155 @@ def _verify_download(asset_id: int, exp_ts: int, token: str) -> bool:
     return hmac.compare_digest(expected, token)
 
 
-def _get_or_create_historial_hoy(perfil_id: int, pelicula_id: int) -> Historial:
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _firma_stream(payload: str) -> str:
+    key = settings.SECRET_KEY.encode()
+    return _b64(hmac.new(key, f"stream:{payload}".encode(), hashlib.sha256).digest())
+
+
+def _sign_stream(datos: dict) -> str:
     """
-    Upsert por día (perfil + película + fecha).
-    Si existe un registro hoy, lo retorna; si no, lo crea.
+    Token autocontenido "<payload>.<firma>" para StreamFileView.
+    payload = JSON en base64url con todo lo necesario para servir el archivo:
+      a: asset_id, f: ruta en MEDIA_ROOT | u: URL remota, s: tamaño en bytes,
+      m: mime type, p: perfil, e: expiración (epoch),
+      c: checksum (ETag) y t: Last-Modified (epoch), si el worker ya los extrajo
     """
-    hoy = timezone.localdate()
-    h = (Historial.objects
-         .filter(id_perfil=perfil_id, id_pelicula=pelicula_id, fecha_vista__date=hoy)
-         .first())
-    if h:
-        return h
-    h = Historial(id_perfil=perfil_id, id_pelicula=pelicula_id)
-    h.save(force_insert=True)
-    return h
+    payload = _b64(json.dumps(datos, separators=(",", ":")).encode())
+    return f"{payload}.{_firma_stream(payload)}"
+
+
+def _verify_stream(token: str):
+    """Retorna el payload del token si la firma es válida y no venció; si no, None."""
+    payload, _, firma = token.rpartition(".")
+    if not payload or not hmac.compare_digest(_firma_stream(payload), firma):
+        return None
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    if datos.get("e", 0) < int(time.time()):
+        return None
+    return datos
+
+
+# Las URLs firmadas vencen en el borde de ventanas de 5 minutos: dentro de una
+# misma ventana Play devuelve la misma URL, así que recargar la página o volver
+# a dar Play reutiliza lo que el navegador ya tiene en caché.
+_VIGENCIA_URL = 15 * 60
+_VENTANA_URL = 5 * 60
+
+
+def _expiracion_url() -> int:
+    return (int(time.time()) // _VENTANA_URL + 1) * _VENTANA_URL + _VIGENCIA_URL
+
+
+# Un solo viaje a la base para "Play": valida película y perfil, trae los assets
+# candidatos y la estimación de ancho de banda del perfil, y hace el upsert del
+# historial del día. El INSERT solo corre si perfil y algún asset son válidos.
+# Las miniaturas del seek bar son las del propio asset o, si es una rendición, las
+# de su mezzanine (trickplay_id indica de qué asset son los derivados).
+# Una fila por candidato (son pocos por película); qoe.elegir decide cuál se reproduce.
+_SQL_REPRODUCCION = """
+WITH perfil AS (
+    SELECT id_perfil FROM perfiles
+    WHERE id_perfil = %(perfil)s AND id_usuario = %(usuario)s
+),
+candidatos AS (
+    SELECT a.id, a.archivo, a.remote_url, a.calidad, a.mime_type, a.es_trailer,
+           a.hls_manifest, a.dash_manifest, a.tamano_bytes, a.duracion_segundos,
+           a.checksum_sha256, a.metadatos_en, a.creado_en, a.bitrate_kbps, a.alto,
+           CASE WHEN a.trickplay_vtt <> '' THEN a.id WHEN o.trickplay_vtt <> '' THEN o.id END
+               AS trickplay_id,
+           COALESCE(NULLIF(a.trickplay_vtt, ''), o.trickplay_vtt, '') AS trickplay_vtt
+    FROM media_assets a
+    LEFT JOIN media_assets o ON o.id = a.id_origen
+    WHERE a.id_pelicula = %(pelicula)s
+      AND (%(trailer)s::boolean IS NULL OR a.es_trailer = %(trailer)s::boolean)
+      AND (%(calidad)s::text IS NULL OR UPPER(a.calidad) = UPPER(%(calidad)s::text))
+),
+hoy AS (
+    SELECT id_historial FROM historial
+    WHERE id_perfil = %(perfil)s AND id_pelicula = %(pelicula)s
+      AND fecha_vista >= %(desde)s AND fecha_vista < %(hasta)s
+    ORDER BY fecha_vista DESC
+    LIMIT 1
+),
+nuevo AS (
+    INSERT INTO historial (id_perfil, id_pelicula, fecha_vista, progreso_segundos, terminado)
+    SELECT %(perfil)s, %(pelicula)s, %(ahora)s, 0, false
+    WHERE EXISTS (SELECT 1 FROM perfil) AND EXISTS (SELECT 1 FROM candidatos)
+      AND NOT EXISTS (SELECT 1 FROM hoy)
+    RETURNING id_historial
+)
+SELECT EXISTS (SELECT 1 FROM peliculas WHERE id_pelicula = %(pelicula)s),
+       EXISTS (SELECT 1 FROM perfil),
+       (SELECT kbps FROM qoe_perfiles
+        WHERE id_perfil = %(perfil)s AND actualizado_en >= %(vigente)s),
+       COALESCE((SELECT id_historial FROM hoy), (SELECT id_historial FROM nuevo)),
+       c.*
+FROM (SELECT 1) AS uno
+LEFT JOIN candidatos c ON true
+"""
+
+
+def _preparar_reproduccion(usuario_id, perfil_id, pelicula_id, calidad, es_trailer, preferidas,
+                           kbps=None, pantalla=None):
+    """
+    Ejecuta _SQL_REPRODUCCION. Lanza Http404 si no existe la película, el perfil
+    no es del usuario o no hay media; si no, retorna (asset, id_historial, trickplay, abr),
+    con trickplay = (id del asset dueño de las miniaturas, ruta del VTT) o None y
+    abr = datos de la elección por ancho de banda (`kbps` y `pantalla`: pistas del cliente).
+    """
+    ahora = timezone.now()
+    desde = timezone.localtime(ahora).replace(hour=0, minute=0, second=0, microsecond=0)
+    with connection.cursor() as cur:
+        cur.execute(_SQL_REPRODUCCION, {
+            "usuario": usuario_id,
+            "perfil": perfil_id,
+            "pelicula": pelicula_id,
+            "calidad": calidad or None,
+            "trailer": es_trailer,
+            "desde": desde,
+            "hasta": desde + timedelta(days=1),
+            "ahora": ahora,
+            "vigente": qoe.vigente_desde(),
+        })
+        columnas = [col.name for col in cur.description[4:]]
+        filas = cur.fetchall()
+
+    existe_pelicula, perfil_valido, kbps_perfil, historial_id = filas[0][:4]
+    if not existe_pelicula:
+        raise Http404("No existe la película.")
+    if not perfil_valido:
+        raise Http404("El perfil no existe o no pertenece al usuario.")
+    candidatos = [dict(zip(columnas, fila[4:])) for fila in filas if fila[4] is not None]
+    if not candidatos:
+        raise Http404("No hay media para esta película.")
+
+    estimados, fuente = qoe.estimar(kbps, kbps_perfil)
+    presupuesto = estimados * settings.STREAMING_ABR_MARGEN if estimados else None
+    elegido = qoe.elegir(candidatos, presupuesto, pantalla, preferidas)
+
+    asset = MediaAsset(
+        id=elegido["id"], pelicula_id=pelicula_id, archivo=elegido["archivo"],
+        remote_url=elegido["remote_url"], calidad=elegido["calidad"], mime_type=elegido["mime_type"],
+        es_trailer=elegido["es_trailer"], hls_manifest=elegido["hls_manifest"],
+        dash_manifest=elegido["dash_manifest"], tamano_bytes=elegido["tamano_bytes"],
+        duracion_segundos=elegido["duracion_segundos"], checksum_sha256=elegido["checksum_sha256"],
+        metadatos_en=elegido["metadatos_en"],
+    )
+    trickplay = (elegido["trickplay_id"], elegido["trickplay_vtt"]) if elegido["trickplay_id"] else None
+    kbps_asset = qoe.kbps_asset(elegido)
+    abr = {
+        "kbps_estimados": round(estimados) if estimados else None,
+        "fuente": fuente,
+        "bitrate_kbps": round(kbps_asset) if kbps_asset else None,
+    }
+    return asset, historial_id, trickplay, abr
 
 
 class PlayPeliculaView(APIView):
@@ -74,14 +232,15 @@ class PlayPeliculaView(APIView):
       - perfil (opcional): id del perfil que reproduce. Si no viene, usa cookie de perfil activo.
       - calidad (opcional): '1080p' | '720p' | '480p' | '360p'
       - trailer=true/false (opcional)
+      - kbps, ancho, alto (opcionales): throughput medido y tamaño de pantalla del
+        cliente. Sin `calidad`, se elige la rendición que entra en ese ancho de banda
+        (o en la estimación del perfil, ver streaming.qoe) y en esa pantalla.
     """
     permission_classes = [IsAuthenticated, EsSuscriptorActivo]
     PREFERRED = ("1080p", "720p", "480p", "360p")
 
     def get(self, request, pelicula_id: int):
 
-        get_object_or_404(Pelicula, pk=pelicula_id)
-
         # 1) Tomar perfil: querystring o cookie firmada
         perfil_id = request.query_params.get("perfil")
         if not perfil_id:
@@ -95,62 +254,132 @@ class PlayPeliculaView(APIView):
                 {"detail": "No hay perfil activo. Llama a POST /api/perfiles/<id>/activar/."},
                 status=400
             )
+        if not str(perfil_id).isdigit():
+            raise Http404("El perfil no existe o no pertenece al usuario.")
 
-        # Valida que el perfil pertenezca al usuario
-        get_object_or_404(Perfil, pk=perfil_id, usuario=request.user)
-
-        # 3) Seleccionar asset (por calidad o mejor disponible)
+        # 2) Filtros de selección del asset
         calidad = request.query_params.get("calidad")
         trailer_q = request.query_params.get("trailer")
         es_trailer = None
         if trailer_q is not None:
             es_trailer = trailer_q.lower() in ("1", "true", "t", "yes", "si")
 
-        qs = MediaAsset.objects.filter(pelicula_id=pelicula_id)
-        if es_trailer is not None:
-            qs = qs.filter(es_trailer=es_trailer)
+        kbps, pantalla = qoe.pistas_cliente(request.query_params)
 
-        asset = None
-        if calidad:
-            asset = qs.filter(calidad__iexact=calidad).order_by("-creado_en").first()
+        # 3) Película + perfil del usuario + asset + historial del día, en una sola consulta
+        asset, historial_id, trickplay, abr = _preparar_reproduccion(
+            request.user.pk, int(perfil_id), int(pelicula_id), calidad, es_trailer, self.PREFERRED,
+            kbps, pantalla,
+        )
+
+        # 4) Generar URL firmada (15-20 minutos). El token lleva ruta, tamaño, mime y
+        #    validadores: StreamFileView sirve cada Range sin consultar la base ni hacer stat.
+        exp = _expiracion_url()
+        datos = {"a": asset.id, "m": asset.mime_type or "video/mp4", "p": int(perfil_id), "e": exp}
+        if asset.remote_url:
+            datos["u"] = asset.remote_url
+            if asset.tamano_bytes:
+                datos["s"] = asset.tamano_bytes   # el proxy (STREAMING_REMOTO) no consulta al origen
+        elif asset.archivo:
+            # tamaño y checksum guardados por el worker (uploader.metadatos);
+            # stat solo si aún no se extrajeron, y entonces sin validadores
+            tamano = asset.tamano_bytes
+            if tamano is None:
+                try:
+                    tamano = os.path.getsize(asset.archivo.path)
+                except OSError:
+                    raise Http404("Archivo no disponible.")
+            datos.update(f=asset.archivo.name, s=tamano)
+            if asset.checksum_sha256 and asset.metadatos_en:
+                datos.update(c=asset.checksum_sha256[:32], t=int(asset.metadatos_en.timestamp()))
         else:
-            for c in self.PREFERRED:
-                asset = qs.filter(calidad__iexact=c).order_by("-creado_en").first()
-                if asset:
-                    break
-            if not asset:
-                asset = qs.order_by("-creado_en").first()
-
-        if not asset:
-            raise Http404("No hay media para esta película.")
-
-        # 4) Historial: crea/actualiza automáticamente el registro del día
-        historial = _get_or_create_historial_hoy(int(perfil_id), int(pelicula_id))
-        # (Opcional) resetear terminado si vuelve a reproducir:
-        # if historial.terminado:
-        #     historial.terminado = False
-        #     historial.save(update_fields=["terminado"])
-
-        # 5) Generar URL firmada (15 minutos)
-        exp = int(time.time()) + 15 * 60
-        token = _sign_download(asset.id, exp)
+            raise Http404("Archivo no disponible.")
 
-        file_path = reverse("stream-file", args=[asset.id, token])
         # Usar ruta relativa en lugar de URL absoluta para que funcione con Docker
-        stream_url = f"{file_path}?exp={exp}&perfil={perfil_id}"
+        stream_url = reverse("stream-file", args=[asset.id, _sign_stream(datos)])
+
+        token = _sign_download(asset.id, exp)
+
+        # Manifiestos segmentados (si el worker ya empaquetó el asset)
+        hls_url = dash_url = None
+        if asset.hls_manifest:
+            hls_url = reverse("stream-derivado", args=[asset.id, exp, token, asset.hls_manifest])
+        if asset.dash_manifest:
+            dash_url = reverse("stream-derivado", args=[asset.id, exp, token, asset.dash_manifest])
+
+        # Miniaturas del seek bar: el reproductor las pide en vez de leer el video al buscar
+        thumbnails_url = None
+        if trickplay:
+            trickplay_id, trickplay_vtt = trickplay
+            thumbnails_url = reverse("stream-derivado", args=[
+                trickplay_id, exp,
+                token if trickplay_id == asset.id else _sign_download(trickplay_id, exp),
+                trickplay_vtt,
+            ])
 
         return Response({
             "pelicula_id": pelicula_id,
             "asset_id": asset.id,
-            "historial_id": historial.id_historial,  # para pings de progreso opcionales
+            "historial_id": historial_id,  # para pings de progreso opcionales
             "url": stream_url,
+            "hls_url": hls_url,
+            "dash_url": dash_url,
+            "thumbnails_url": thumbnails_url,
             "calidad": asset.calidad,
+            "abr": abr,
             "mime_type": asset.mime_type,
             "es_trailer": asset.es_trailer,
+            "duracion_segundos": asset.duracion_segundos,
             "expires_at": exp,
         })
 
 
+class QoEBeaconView(APIView):
+    """
+    POST /api/streaming/qoe/
+    Beacon del reproductor (cada ~30 s y al terminar) con lo medido desde el anterior.
+    Body: {
+        "kbps": float (throughput medido de las descargas),
+        "asset_id": int (opcional, lo que se estaba reproduciendo),
+        "segundos_reproduccion": float, "segundos_rebuffer": float, "cortes": int (opcionales),
+        "perfil": int (opcional, si no la cookie de perfil activo)
+    }
+    Actualiza la estimación del perfil que usa PlayPeliculaView (streaming.qoe).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        perfil_id = request.data.get("perfil")
+        if not perfil_id:
+            try:
+                perfil_id = request.get_signed_cookie(COOKIE_NAME, salt=COOKIE_SALT)
+            except (KeyError, BadSignature):
+                perfil_id = None
+        if not perfil_id:
+            return Response({"detail": "No hay perfil activo."}, status=400)
+        if not str(perfil_id).isdigit():
+            raise Http404("El perfil no existe o no pertenece al usuario.")
+
+        try:
+            kbps = float(request.data.get("kbps"))
+            asset_id = request.data.get("asset_id")
+            asset_id = int(asset_id) if asset_id is not None else None
+            reproduccion = float(request.data.get("segundos_reproduccion") or 0)
+            rebuffer = float(request.data.get("segundos_rebuffer") or 0)
+            cortes = int(request.data.get("cortes") or 0)
+        except (TypeError, ValueError):
+            return Response({"detail": "kbps es requerido y los campos deben ser numéricos."}, status=400)
+        if not 0 < kbps <= 10_000_000 or min(reproduccion, rebuffer, cortes) < 0:
+            return Response({"detail": "Valores fuera de rango."}, status=400)
+
+        fila = qoe.registrar_beacon(request.user.pk, int(perfil_id), kbps, asset_id,
+                                    reproduccion, rebuffer, cortes)
+        if fila is None:
+            raise Http404("El perfil no existe o no pertenece al usuario.")
+        kbps_estimados, muestras = fila
+        return Response({"kbps_estimados": round(kbps_estimados), "muestras": muestras})
+
+
 class ListStreamsView(APIView):
     """
     Lista todas las variantes disponibles para una película (útil para selector de calidad).
@@ -180,93 +409,457 @@ class ListStreamsView(APIView):
         return Response({"pelicula_id": pelicula_id, "assets": data})
 
 
-def range_file_iterator(file_object, start, end, chunk_size=8192):
+def range_file_iterator(file_path, start, end, clave=None, chunk_size=64 * 1024):
     """
-    Generador que lee el archivo por chunks desde 'start' hasta 'end'.
+    Generador que lee el archivo por chunks desde 'start' hasta 'end' (os.pread
+    sobre un descriptor de streaming.descriptores, sin seek).
+    El descriptor se toma al empezar a iterar y se libera en el finally: Django
+    cierra el generador al terminar la respuesta o si el cliente se desconecta.
     """
-    file_object.seek(start)
-    remaining = end - start + 1
-    while remaining > 0:
-        chunk_size_to_read = min(chunk_size, remaining)
-        data = file_object.read(chunk_size_to_read)
-        if not data:
-            break
-        remaining -= len(data)
-        yield data
+    descriptor = descriptores.adquirir(file_path, clave)
+    try:
+        offset = start
+        while offset <= end:
+            data = os.pread(descriptor.fd, min(chunk_size, end - offset + 1), offset)
+            if not data:
+                break
+            offset += len(data)
+            yield data
+    finally:
+        descriptores.liberar(descriptor)
+
+
+def _leer_inicio(file_path, n, clave=None):
+    with descriptores.abierto(file_path, clave) as fd:
+        return os.pread(fd, n, 0)
 
 
-class StreamFileView(APIView):
+async def _adquirir_descriptor(file_path, clave):
+    """descriptores.adquirir en un hilo; si cancelan la espera, se libera igual."""
+    tarea = asyncio.ensure_future(asyncio.to_thread(descriptores.adquirir, file_path, clave))
+    try:
+        return await asyncio.shield(tarea)
+    except asyncio.CancelledError:
+        tarea.add_done_callback(
+            lambda t: t.cancelled() or t.exception() or descriptores.liberar(t.result()))
+        raise
+
+
+async def _rango_asincrono(file_path, start, end, clave_cache=None, chunk_size=64 * 1024):
+    """
+    Iterador asíncrono de los bytes [start, end] del archivo. Cada lectura es un
+    os.pread en un hilo, así el event loop nunca se bloquea en disco.
+    Backpressure: Django (ASGI) espera cada envío antes de pedir el siguiente
+    chunk, así que para un cliente lento no se lee más de lo que acepta.
+    Cancelación: si el cliente se desconecta Django cancela la respuesta y el
+    finally libera el descriptor (se toma recién al empezar a enviar; ver
+    streaming.descriptores, que lo comparte entre requests si hay `clave_cache`).
+    Con `clave_cache`, la parte del rango dentro del inicio del archivo sale de
+    cache_inicio (memoria) y el resto del disco.
+    """
+    if clave_cache is not None and cache_inicio.activa and start < cache_inicio.prefijo:
+        inicio = cache_inicio.obtener(clave_cache)
+        if inicio is None:
+            inicio = await asyncio.to_thread(_leer_inicio, file_path, cache_inicio.prefijo, clave_cache)
+            cache_inicio.guardar(clave_cache, inicio)
+        vista = memoryview(inicio)
+        hasta = min(end + 1, len(inicio))
+        for offset in range(start, hasta, chunk_size):
+            yield bytes(vista[offset:min(offset + chunk_size, hasta)])
+            # sin lecturas de disco nada cede el event loop: ceder entre chunks
+            # para que las demás conexiones también avancen
+            await asyncio.sleep(0)
+        start = max(start, hasta)
+        if start > end:
+            return
+
+    descriptor = await _adquirir_descriptor(file_path, clave_cache)
+    try:
+        offset = start
+        while offset <= end:
+            data = await asyncio.to_thread(os.pread, descriptor.fd, min(chunk_size, end - offset + 1), offset)
+            if not data:
+                break
+            offset += len(data)
+            yield data
+    finally:
+        descriptores.liberar(descriptor)
+
+
+async def _rango_remoto(url, tamano, start, end, primero):
     """
-    Sirve el archivo local protegido por token + expiración y perfil válido.
+    Iterador asíncrono de los bytes [start, end] de un asset remoto, bloque a
+    bloque desde cache_remota (disco local o, la primera vez, el origen).
+    `primero` es el bloque de `start`, ya obtenido antes de responder.
+    """
+    tamano_bloque = cache_remota.tamano_bloque
+    for indice in range(start // tamano_bloque, end // tamano_bloque + 1):
+        if primero is not None:
+            datos, primero = primero, None
+        else:
+            datos = await asyncio.to_thread(cache_remota.bloque, url, indice, tamano)
+        base = indice * tamano_bloque
+        yield datos[max(start, base) - base:min(end + 1, base + len(datos)) - base]
+
+
+def _rango_remoto_sincrono(url, tamano, start, end, primero):
+    """_rango_remoto para WSGI: el servidor itera el body en su propio hilo."""
+    tamano_bloque = cache_remota.tamano_bloque
+    for indice in range(start // tamano_bloque, end // tamano_bloque + 1):
+        if primero is not None:
+            datos, primero = primero, None
+        else:
+            datos = cache_remota.bloque(url, indice, tamano)
+        base = indice * tamano_bloque
+        yield datos[max(start, base) - base:min(end + 1, base + len(datos)) - base]
+
+
+async def _entregar_remoto(request, datos, cache_control, asincrono=True):
+    """
+    Respuesta con soporte de Range para un asset remoto a través del proxy
+    (STREAMING_REMOTO = "proxy"). Si el origen no responde o no soporta Range
+    se vuelve a la redirección. `asincrono` como en _entregar_archivo.
+    """
+    url = datos["u"]
+    try:
+        file_size = datos.get("s") or await asyncio.to_thread(cache_remota.tamano, url)
+        rango = _rango_solicitado(request, file_size)
+        start, end = rango or (0, file_size - 1)
+        # el primer bloque antes de responder: si el origen falla aún se puede redirigir
+        primero = await asyncio.to_thread(
+            cache_remota.bloque, url, start // cache_remota.tamano_bloque, file_size,
+        )
+    except ValueError:
+        return _rango_insatisfacible(file_size)
+    except OrigenNoDisponible as exc:
+        logger.warning("Proxy remoto no disponible para %s: %s", url, exc)
+        return HttpResponseRedirect(url)
+
+    iterador = _rango_remoto if asincrono else _rango_remoto_sincrono
+    response = StreamingHttpResponse(
+        iterador(url, file_size, start, end, primero),
+        status=206 if rango else 200,
+        content_type=datos["m"],
+    )
+    response['Content-Length'] = str(end - start + 1)
+    if rango:
+        response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+    return response
+
+
+class StreamFileView(View):
+    """
+    Sirve el archivo local protegido por un token autocontenido (_sign_stream).
     SOPORTA RANGE REQUESTS para permitir seek en videos.
-    NO requiere autenticación JWT porque la URL está firmada con HMAC.
+    NO requiere autenticación JWT porque la URL está firmada con HMAC: el token
+    trae ruta, tamaño, mime, perfil y expiración, así que cada Range se sirve
+    sin consultas a la base ni stat del archivo.
+
+    Vista asíncrona (Django puro, sin DRF): bajo ASGI (backend.asgi + uvicorn)
+    una descarga larga no ocupa un hilo, el body sale de un iterador asíncrono
+    (_rango_asincrono). Bajo WSGI (runserver) el body es un generador síncrono:
+    Django consumiría entero un iterador asíncrono antes de enviar el primer byte.
+
+    settings.STREAMING_DELIVERY decide quién copia los bytes:
+      - "python" (por defecto): Django lee y envía el archivo por chunks
+      - "x-accel": X-Accel-Redirect para nginx (STREAMING_ACCEL_PREFIX)
+      - "x-sendfile": X-Sendfile para Apache/lighttpd
+      - "sendfile": wsgi.file_wrapper -> os.sendfile() en el servidor WSGI
+        (ASGI no tiene sendfile: bajo uvicorn se entrega como en "python")
+    En todos los casos Django solo valida token y rango.
+
+    Assets remotos (remote_url): redirección al origen, o con
+    STREAMING_REMOTO = "proxy" se sirven por bloques desde cache_remota.
     """
-    permission_classes = []  # Sin autenticación, la seguridad viene del token HMAC
 
-    def get(self, request, asset_id: int, token: str):
-        exp = request.query_params.get("exp")
-        perfil_id = request.query_params.get("perfil")
+    async def get(self, request, asset_id: int, token: str):
+        # Todo viene en el token firmado por PlayPeliculaView (perfil ya validado allí)
+        datos = _verify_stream(token)
+        if datos is None or datos.get("a") != asset_id:
+            raise Http404("Link vencido o inválido.")
+
+        # Los bytes detrás de esta URL no cambian (el token fija tamaño y checksum):
+        # se pueden cachear en el navegador mientras la firma siga vigente.
+        cache_control = f"private, max-age={max(0, datos['e'] - int(time.time()))}, immutable"
 
-        if not exp or not perfil_id:
-            raise Http404("Parámetros inválidos.")
+        asincrono = isinstance(request, ASGIRequest)
+        if datos.get("u"):
+            if settings.STREAMING_REMOTO == "proxy":
+                return await _entregar_remoto(request, datos, cache_control, asincrono)
+            # Para producción considera URLs firmadas del storage (S3, etc.)
+            return HttpResponseRedirect(datos["u"])
+
+        try:
+            file_path = safe_join(settings.MEDIA_ROOT, datos["f"])
+        except (KeyError, SuspiciousFileOperation):
+            raise Http404("Archivo no disponible.")
+        etag = f'"{asset_id}-{datos["c"]}"' if datos.get("c") else None
+        # solo con checksum: identifica el contenido exacto del archivo
+        clave_cache = (asset_id, datos["s"], datos["c"]) if datos.get("c") else None
+
+        # Entregar el archivo (según STREAMING_DELIVERY)
+        return _entregar_archivo(
+            request, file_path, datos["f"], datos["m"], cache_control,
+            file_size=datos["s"], etag=etag, last_modified=datos.get("t"),
+            asincrono=asincrono, clave_cache=clave_cache,
+        )
+
+
+# Tipos de los derivados (uploader.empaquetado y uploader.trickplay)
+_TIPOS_DERIVADOS = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".mpd": "application/dash+xml",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".vtt": "text/vtt",
+    ".jpg": "image/jpeg",
+}
+
+
+class DerivadoView(APIView):
+    """
+    GET /api/streaming/derivados/<asset_id>/<exp>/<token>/<ruta>
+    Sirve manifiestos y segmentos HLS/DASH y las miniaturas (trickplay) de un asset.
+    La firma va en la ruta (no en la query) para que las URLs relativas de
+    los manifiestos hereden la misma firma que _sign_download.
+    """
+    permission_classes = []  # Sin autenticación, la seguridad viene del token HMAC
+    authentication_classes = []
 
+    def get(self, request, asset_id: int, exp: int, token: str, ruta: str):
         if not _verify_download(asset_id, exp, token):
             raise Http404("Link vencido o inválido.")
 
-        # Validar que el perfil exista (sin verificar usuario porque no hay JWT)
-        get_object_or_404(Perfil, pk=perfil_id)
+        try:
+            file_path = safe_join(directorio_derivados(asset_id), ruta)
+        except SuspiciousFileOperation:
+            raise Http404("Ruta inválida.")
+        try:
+            info = os.stat(file_path)
+        except OSError:
+            raise Http404("Segmento no disponible.")
+        if not stat.S_ISREG(info.st_mode):
+            raise Http404("Segmento no disponible.")
+
+        extension = os.path.splitext(file_path)[1].lower()
+        content_type = _TIPOS_DERIVADOS.get(extension, "application/octet-stream")
+        # contenido inmutable: se puede cachear mientras la firma siga vigente
+        cache_control = f"private, max-age={max(0, exp - int(time.time()))}"
+        # un reempaquetado reescribe los archivos: cambian mtime y/o tamaño
+        etag = f'"{asset_id}-{info.st_mtime_ns:x}-{info.st_size:x}"'
+        return _entregar_archivo(
+            request, file_path, os.path.relpath(file_path, settings.MEDIA_ROOT),
+            content_type, cache_control,
+            file_size=info.st_size, etag=etag, last_modified=int(info.st_mtime),
+        )
+
+
+def _no_modificado(request, etag, last_modified) -> bool:
+    """If-None-Match (comparación débil) o, si no viene, If-Modified-Since."""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        etags = [e.removeprefix('W/') for e in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since and last_modified is not None:
+        fecha = parse_http_date_safe(if_modified_since)
+        return fecha is not None and last_modified <= fecha
+    return False
+
+
+def _if_range_vigente(request, etag, last_modified) -> bool:
+    """
+    If-Range: el Range solo vale si el validador coincide exactamente con el
+    actual (ETag fuerte o fecha); si no, se responde el archivo completo.
+    """
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return etag is not None and if_range == etag
+    fecha = parse_http_date_safe(if_range)
+    return fecha is not None and last_modified is not None and fecha == last_modified
 
-        asset = get_object_or_404(MediaAsset, pk=asset_id)
 
-        if asset.remote_url:
-            # Para producción considera URLs firmadas del storage (S3, etc.)
-            return HttpResponseRedirect(asset.remote_url)
+def _rango_solicitado(request, file_size, etag=None, last_modified=None):
+    """
+    (start, end) del header Range, o None si no hay Range (o If-Range no
+    coincide) y va el archivo completo. ValueError si el rango es insatisfacible.
+    """
+    range_header = request.META.get('HTTP_RANGE', '').strip()
+    if range_header and not _if_range_vigente(request, etag, last_modified):
+        range_header = ''
+    range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+    if not range_match:
+        return None
+    start = int(range_match.group(1))
+    end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
+    if start >= file_size or end >= file_size or start > end:
+        raise ValueError(range_header)
+    return start, end
+
+
+def _rango_insatisfacible(file_size):
+    response = StreamingHttpResponse(status=416)  # Range Not Satisfiable
+    response['Content-Range'] = f'bytes */{file_size}'
+    return response
+
+
+class _TramoArchivo:
+    """
+    Archivo abierto limitado a `largo` bytes desde su posición actual, para
+    FileResponse. Sin sendfile (runserver, o una vista síncrona bajo ASGI)
+    Django lee con read() hasta b"": sin el límite mandaría hasta el final del
+    archivo, más de lo que declara Content-Length en un Range. Con sendfile el
+    servidor usa fileno(), la posición y Content-Length.
+    """
 
-        if not asset.archivo:
-            raise Http404("Archivo no disponible.")
+    def __init__(self, archivo, largo):
+        self.archivo = archivo
+        self.restante = largo
 
-        # Obtener el path del archivo
-        file_path = asset.archivo.path
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.restante:
+            size = self.restante
+        datos = self.archivo.read(size) if size else b""
+        self.restante -= len(datos)
+        return datos
+
+    def fileno(self):
+        return self.archivo.fileno()
+
+    def close(self):
+        self.archivo.close()
+
+
+def _entregar_archivo(request, file_path, nombre_media, content_type, cache_control,
+                      file_size=None, etag=None, last_modified=None, asincrono=False,
+                      clave_cache=None):
+    """
+    Respuesta para un archivo bajo MEDIA_ROOT con soporte de Range.
+    settings.STREAMING_DELIVERY decide quién copia los bytes (ver StreamFileView);
+    `nombre_media` es la ruta relativa a MEDIA_ROOT (para X-Accel-Redirect).
+    `file_size` evita el stat cuando ya se conoce (token de StreamFileView).
+    `etag` (fuerte) y `last_modified` (epoch) habilitan 304 e If-Range.
+    `asincrono` (solo bajo ASGI): en modo "python" y "sendfile" el body es un iterador asíncrono,
+    que sirve el inicio del archivo desde cache_inicio si viene `clave_cache`.
+    `clave_cache` identifica además el contenido del archivo, así su descriptor
+    se reutiliza entre requests (streaming.descriptores).
+    """
+    if file_size is None:
         file_size = os.path.getsize(file_path)
-        content_type = asset.mime_type or 'video/mp4'
 
-        # Parsear el header Range si existe
-        range_header = request.META.get('HTTP_RANGE', '').strip()
-        range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+    validadores = {}
+    if etag:
+        validadores['ETag'] = etag
+    if last_modified is not None:
+        validadores['Last-Modified'] = http_date(last_modified)
+
+    # Condicionales antes que Range: si el cliente ya tiene los bytes, 304
+    if _no_modificado(request, etag, last_modified):
+        response = HttpResponseNotModified()
+        for header, valor in validadores.items():
+            response[header] = valor
+        response['Cache-Control'] = cache_control
+        return response
 
+    try:
+        range_match = _rango_solicitado(request, file_size, etag, last_modified)
+    except ValueError:
+        return _rango_insatisfacible(file_size)
+    start, end = range_match or (None, None)
+
+    modo = getattr(settings, "STREAMING_DELIVERY", "python")
+    if modo == "x-accel":
+        # nginx sirve el archivo (y el Range) desde una location "internal"
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.STREAMING_ACCEL_PREFIX + quote(nombre_media)
+    elif modo == "x-sendfile":
+        # Apache (mod_xsendfile) / lighttpd sirven el archivo por su cuenta
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = file_path
+    elif modo == "sendfile" and not asincrono:
+        # FileResponse expone el archivo como wsgi.file_wrapper: un servidor
+        # como gunicorn lo envía con os.sendfile() desde la posición actual
+        # hasta Content-Length, sin pasar los bytes por Python. sendfile usa la
+        # posición del archivo, así que acá no sirve un descriptor compartido;
+        # FileResponse lo cierra al terminar la respuesta.
+        file_object = open(file_path, 'rb')
+        file_object.seek(start or 0)
+        largo = end - start + 1 if range_match else file_size
+        response = FileResponse(_TramoArchivo(file_object, largo), content_type=content_type)
+        response['Content-Length'] = str(end - start + 1 if range_match else file_size)
         if range_match:
-            # Range Request - permitir seek en el video
-            start = int(range_match.group(1))
-            end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
-
-            # Validar rango
-            if start >= file_size or end >= file_size or start > end:
-                response = StreamingHttpResponse(status=416)  # Range Not Satisfiable
-                response['Content-Range'] = f'bytes */{file_size}'
-                return response
-
-            # Abrir archivo y crear respuesta con el rango
-            file_object = open(file_path, 'rb')
-            response = StreamingHttpResponse(
-                range_file_iterator(file_object, start, end),
-                status=206,  # Partial Content
-                content_type=content_type
-            )
-            response['Content-Length'] = str(end - start + 1)
+            response.status_code = 206  # Partial Content
             response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
-            response['Accept-Ranges'] = 'bytes'
+    elif asincrono:
+        response = StreamingHttpResponse(
+            _rango_asincrono(file_path, start or 0, end if range_match else file_size - 1, clave_cache),
+            status=206 if range_match else 200,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(end - start + 1 if range_match else file_size)
+        if range_match:
+            response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+    elif range_match:
+        # Range Request - permitir seek en el video
+        response = StreamingHttpResponse(
+            range_file_iterator(file_path, start, end, clave_cache),
+            status=206,  # Partial Content
+            content_type=content_type
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+    else:
+        # Request completo sin range
+        response = StreamingHttpResponse(
+            range_file_iterator(file_path, 0, file_size - 1, clave_cache),
+            content_type=content_type
+        )
+        response['Content-Length'] = str(file_size)
+
+    for header, valor in validadores.items():
+        response[header] = valor
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+
+    return response
+
+
+class CacheInicioView(APIView):
+    """
+    GET /api/streaming/cache-inicio/
+    Aciertos, fallos, desalojos y uso de memoria de cache_inicio (de este proceso).
+    """
+    permission_classes = [IsAdminUser]
 
-        else:
-            # Request completo sin range
-            file_object = open(file_path, 'rb')
-            response = StreamingHttpResponse(
-                file_object,
-                content_type=content_type
-            )
-            response['Content-Length'] = str(file_size)
-            response['Accept-Ranges'] = 'bytes'
+    def get(self, request):
+        return Response(cache_inicio.estadisticas())
 
-        # Headers adicionales para el video
-        response['Cache-Control'] = 'no-cache, private'
 
-        return response
+class CacheRemotaView(APIView):
+    """
+    GET /api/streaming/cache-remota/
+    Aciertos, fallos, esperas (single-flight) y desalojos del proxy de assets remotos.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_remota.estadisticas())
+
+
+class DescriptoresView(APIView):
+    """
+    GET /api/streaming/descriptores/
+    Descriptores del pool de streaming (en uso, reutilizaciones, desalojos) y
+    los abiertos por el proceso frente a su límite (ulimit -n).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(descriptores.estadisticas())
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import MediaAsset
+from .models import MediaAsset, TrabajoMedia
+from . import trabajos
 
 @admin.register(MediaAsset)
 class MediaAssetAdmin(admin.ModelAdmin):
@@ -10,7 +11,25 @@ class MediaAssetAdmin(admin.ModelAdmin):
     search_fields = ('pelicula__titulo',)
     raw_id_fields = ('pelicula',)
     ordering = ('-creado_en',)
-    readonly_fields = ('ver_video_link', 'archivo_path')
+    readonly_fields = ('ver_video_link', 'archivo_path', 'origen',
+                       'tamano_bytes', 'duracion_segundos', 'bitrate_kbps', 'codec_video',
+                       'codec_audio', 'ancho', 'alto', 'checksum_sha256', 'metadatos_en',
+                       'trickplay_vtt')
+    actions = ('generar_calidades', 'generar_trickplay')
+
+    @admin.action(description='Generar calidades 1080p/720p/480p/360p (worker de media)')
+    def generar_calidades(self, request, queryset):
+        assets = [a for a in queryset if a.archivo]
+        for asset in assets:
+            trabajos.encolar_escalera(asset)
+        self.message_user(request, f"Transcodificación encolada para {len(assets)} asset(s).")
+
+    @admin.action(description='Generar miniaturas del seek bar (worker de media)')
+    def generar_trickplay(self, request, queryset):
+        assets = [a for a in queryset if a.archivo]
+        for asset in assets:
+            trabajos.encolar(asset, TrabajoMedia.TIPO_TRICKPLAY)
+        self.message_user(request, f"Miniaturas encoladas para {len(assets)} asset(s).")
 
     def ver_video(self, obj):
         """Muestra un enlace para ver el video con localhost"""
@@ -62,7 +81,13 @@ class MediaAssetAdmin(admin.ModelAdmin):
             'fields': ('pelicula', 'calidad', 'mime_type', 'es_trailer')
         }),
         ('Archivo', {
-            'fields': ('archivo', 'archivo_path', 'remote_url')
+            'fields': ('archivo', 'archivo_path', 'remote_url', 'origen', 'trickplay_vtt')
+        }),
+        ('Metadatos', {
+            'fields': (('tamano_bytes', 'duracion_segundos', 'bitrate_kbps'),
+                       ('codec_video', 'codec_audio', 'ancho', 'alto'),
+                       'checksum_sha256', 'metadatos_en'),
+            'classes': ('collapse',)
         }),
         ('Reproducción', {
             'fields': ('ver_video_link',),
@@ -73,3 +98,12 @@ class MediaAssetAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(TrabajoMedia)
+class TrabajoMediaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'asset', 'tipo', 'calidad', 'estado', 'progreso', 'intentos', 'worker', 'actualizado_en')
+    list_filter = ('estado', 'tipo', 'calidad')
+    raw_id_fields = ('asset',)
+    ordering = ('-id',)
+    readonly_fields = ('progreso', 'worker', 'bloqueado_hasta', 'no_antes_de', 'creado_en', 'actualizado_en')
@@ -0,0 +1,130 @@
+"""
+Empaquetado segmentado (HLS y, opcionalmente, DASH) de un MediaAsset con ffmpeg.
+
+Los derivados de cada asset viven en MEDIA_ROOT/derivados/<asset_id>/:
+    hls/index.m3u8 + hls/seg_00000.ts ...
+    dash/manifest.mpd + dash/*.m4s
+    trickplay/ (uploader.trickplay, trabajo aparte)
+Se copian los streams (-c copy): no se recodifica, solo se corta en segmentos.
+Cada formato es un symlink a su carpeta versionada (hls -> hls.v-<uuid>), ver
+publicar_directorio.
+"""
+import glob
+import os
+import shutil
+import subprocess
+import uuid
+
+from django.conf import settings
+
+HLS_MANIFEST = "hls/index.m3u8"
+DASH_MANIFEST = "dash/manifest.mpd"
+
+
+def directorio_derivados(asset_id) -> str:
+    return os.path.join(settings.MEDIA_ROOT, "derivados", str(asset_id))
+
+
+def borrar_derivados(asset_id):
+    shutil.rmtree(directorio_derivados(asset_id), ignore_errors=True)
+
+
+def publicar_directorio(nuevo, destino):
+    """
+    Publica la carpeta `nuevo` como `destino` de forma atómica: `destino` es un
+    symlink a una carpeta versionada (`<destino>.v-<uuid>`) y se cambia con
+    os.replace. Quien lee ve la versión vieja o la nueva completa, nunca un
+    hueco, y si el proceso muere a mitad queda publicada una de las dos.
+    Con `nuevo` None se retira `destino`. Después se borran las versiones viejas
+    y los restos de publicaciones interrumpidas.
+    """
+    if nuevo is not None:
+        version = f"{destino}.v-{uuid.uuid4().hex}"
+        os.rename(nuevo, version)
+        enlace = f"{destino}.enlace-{uuid.uuid4().hex}"
+        # relativo: sigue valiendo si se mueve MEDIA_ROOT
+        os.symlink(os.path.basename(version), enlace)
+        if os.path.isdir(destino) and not os.path.islink(destino):
+            # publicado antes como carpeta real: se aparta una única vez
+            os.rename(destino, f"{destino}.viejo-{uuid.uuid4().hex}")
+        os.replace(enlace, destino)
+    elif os.path.islink(destino):
+        os.remove(destino)
+    elif os.path.isdir(destino):
+        os.rename(destino, f"{destino}.viejo-{uuid.uuid4().hex}")
+
+    vigente = os.path.realpath(destino) if os.path.islink(destino) else None
+    for resto in glob.glob(f"{glob.escape(destino)}.[ve]*-*"):
+        if resto == vigente:
+            continue
+        if os.path.islink(resto):
+            os.remove(resto)
+        else:
+            shutil.rmtree(resto, ignore_errors=True)
+
+
+def ejecutar_ffmpeg(args):
+    """Corre ffmpeg y lanza RuntimeError con su stderr si falla."""
+    cmd = [settings.FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y", *args]
+    proceso = subprocess.run(cmd, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {proceso.returncode}: {proceso.stderr.strip()[-2000:]}")
+
+
+def _hls(origen, destino):
+    os.makedirs(destino)
+    ejecutar_ffmpeg([
+        "-i", origen,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", str(settings.MEDIA_SEGMENTO_SEGUNDOS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(destino, "seg_%05d.ts"),
+        os.path.join(destino, "index.m3u8"),
+    ])
+
+
+def _dash(origen, destino):
+    os.makedirs(destino)
+    ejecutar_ffmpeg([
+        "-i", origen,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-c", "copy",
+        "-f", "dash",
+        "-seg_duration", str(settings.MEDIA_SEGMENTO_SEGUNDOS),
+        "-use_template", "1", "-use_timeline", "1",
+        os.path.join(destino, "manifest.mpd"),
+    ])
+
+
+def empaquetar(asset):
+    """
+    Genera HLS (y DASH si MEDIA_EMPAQUETAR_DASH) para el archivo local del asset.
+    Escribe en una carpeta temporal y publica cada formato al final con
+    publicar_directorio, así nunca se sirve un manifiesto a medio escribir ni
+    falta la carpeta mientras se reemplaza (y no se tocan otros derivados).
+    """
+    from .models import MediaAsset
+
+    if not asset.archivo:
+        raise ValueError("El asset no tiene archivo local para empaquetar.")
+
+    final = directorio_derivados(asset.id)
+    temporal = f"{final}.tmp-{uuid.uuid4().hex}"
+    try:
+        _hls(asset.archivo.path, os.path.join(temporal, "hls"))
+        if settings.MEDIA_EMPAQUETAR_DASH:
+            _dash(asset.archivo.path, os.path.join(temporal, "dash"))
+        os.makedirs(final, exist_ok=True)
+        for formato in ("hls", "dash"):
+            nuevo = os.path.join(temporal, formato)
+            publicar_directorio(nuevo if os.path.isdir(nuevo) else None, os.path.join(final, formato))
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    # update(): no es un cambio del catálogo, no hace falta disparar post_save
+    MediaAsset.objects.filter(pk=asset.pk).update(
+        hls_manifest=HLS_MANIFEST,
+        dash_manifest=DASH_MANIFEST if settings.MEDIA_EMPAQUETAR_DASH else "",
+    )
@@ -0,0 +1,127 @@
+"""
+Faststart: MP4 con el átomo `moov` (índice de muestras) al inicio del archivo.
+
+Muchos MP4 subidos traen el `moov` después de `mdat`; el reproductor tiene que
+pedir primero el final del archivo antes de poder arrancar. Se detecta leyendo
+solo las cabeceras de los átomos de primer nivel y se corrige con un remux de
+ffmpeg (`-c copy -movflags +faststart`) en un trabajo del worker.
+
+El remux cambia tamaño y offsets, así que no se escribe sobre el archivo original:
+los tokens de stream ya firmados llevan el tamaño y el checksum viejos. El nuevo
+archivo se publica con otro nombre, el asset pasa a apuntarlo en un solo UPDATE y
+el original se borra con un trabajo diferido cuando ya no queda ningún token vigente.
+"""
+import glob
+import os
+import struct
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .transcodificacion import _ffmpeg_con_progreso
+
+EXTENSIONES = (".mp4", ".m4v", ".mov")
+# más que la vigencia máxima de una URL de stream firmada (~20 min)
+GRACIA_BORRADO = timedelta(minutes=30)
+
+
+def moov_al_final(ruta) -> bool:
+    """
+    True si el archivo es ISO BMFF (MP4/MOV) y su `mdat` aparece antes del `moov`.
+    Solo lee las cabeceras (tamaño + tipo) de los átomos de primer nivel.
+    """
+    if not ruta.lower().endswith(EXTENSIONES):
+        return False
+    try:
+        with open(ruta, "rb") as f:
+            total = os.fstat(f.fileno()).st_size
+            posicion = 0
+            while posicion + 8 <= total:
+                f.seek(posicion)
+                cabecera = f.read(8)
+                if len(cabecera) < 8:
+                    return False
+                tamano, tipo = struct.unpack(">I4s", cabecera)
+                if tamano == 1:   # tamaño de 64 bits a continuación del tipo
+                    extendido = f.read(8)
+                    if len(extendido) < 8:
+                        return False
+                    tamano = struct.unpack(">Q", extendido)[0]
+                elif tamano == 0:   # el átomo llega hasta el final del archivo
+                    tamano = total - posicion
+                if tamano < 8:
+                    return False   # no es un MP4 válido
+                if tipo == b"moov":
+                    return False
+                if tipo == b"mdat":
+                    return True
+                posicion += tamano
+    except OSError:
+        return False
+    return False
+
+
+def _nombre_faststart(nombre) -> str:
+    base, ext = os.path.splitext(nombre)
+    return f"{base}-faststart{ext or '.mp4'}"
+
+
+def remux(asset, reportar=lambda progreso: None):
+    """
+    Reescribe el archivo del asset con el `moov` al inicio (sin recodificar) y
+    cambia el asset al nuevo archivo. Retorna False si ya estaba en faststart.
+    """
+    from .models import MediaAsset, TrabajoMedia
+    from . import trabajos
+
+    if not asset.archivo:
+        raise ValueError("El asset no tiene archivo local.")
+    original = asset.archivo.path
+    if not moov_al_final(original):
+        return False
+
+    storage = asset.archivo.storage
+    nombre = storage.get_available_name(_nombre_faststart(asset.archivo.name))
+    final = storage.path(nombre)
+    # restos de un intento anterior cuyo worker murió (este trabajo tiene el lease)
+    for resto in glob.glob(f"{glob.escape(original)}.faststart-*"):
+        os.remove(resto)
+    temporal = f"{original}.faststart-{uuid.uuid4().hex}"
+    try:
+        _ffmpeg_con_progreso(
+            ["-i", original, "-map", "0", "-c", "copy", "-ignore_unknown",
+             "-movflags", "+faststart", "-f", "mp4", temporal],
+            asset.duracion_segundos or 0, reportar,
+        )
+        os.replace(temporal, final)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    # el cambio de archivo es atómico para Play: o firma el viejo o el nuevo;
+    # sin tamaño/checksum, el token del nuevo no lleva validadores hasta releer metadatos
+    MediaAsset.objects.filter(pk=asset.pk).update(
+        archivo=nombre, tamano_bytes=None, checksum_sha256="", metadatos_en=None,
+    )
+    asset.archivo.name = nombre
+    trabajos.encolar(asset, TrabajoMedia.TIPO_METADATOS)
+    trabajos.encolar(asset, TrabajoMedia.TIPO_BORRAR_ARCHIVO,
+                     parametros={"ruta": os.path.relpath(original, settings.MEDIA_ROOT)},
+                     no_antes_de=timezone.now() + GRACIA_BORRADO)
+    return True
+
+
+def borrar_reemplazado(ruta):
+    """Borra un archivo reemplazado (relativo a MEDIA_ROOT) si ningún asset lo usa."""
+    from .models import MediaAsset
+
+    if MediaAsset.objects.filter(archivo=ruta).exists():
+        return False
+    completa = os.path.join(settings.MEDIA_ROOT, ruta)
+    try:
+        os.remove(completa)
+    except FileNotFoundError:
+        return False
+    return True
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+
+from uploader import metadatos, trabajos
+from uploader.models import MediaAsset, TrabajoMedia
+
+
+class Command(BaseCommand):
+    help = ("Completa tamaño, duración, codecs y checksum de los assets existentes. "
+            "Por defecto encola un trabajo por asset para el worker (procesar_media).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--directo", action="store_true",
+                            help="Extrae los metadatos en este proceso en vez de encolarlos")
+        parser.add_argument("--todos", action="store_true",
+                            help="Incluye los assets que ya tienen metadatos")
+
+    def handle(self, *args, **options):
+        pendiente = TrabajoMedia.objects.filter(
+            asset=OuterRef("pk"), tipo=TrabajoMedia.TIPO_METADATOS,
+            estado__in=(TrabajoMedia.PENDIENTE, TrabajoMedia.EN_PROCESO),
+        )
+        assets = (MediaAsset.objects
+                  .exclude(Q(archivo__isnull=True) | Q(archivo=""), Q(remote_url__isnull=True) | Q(remote_url=""))
+                  .exclude(Exists(pendiente))
+                  .order_by("id"))
+        if not options["todos"]:
+            assets = assets.filter(metadatos_en__isnull=True)
+
+        if not options["directo"]:
+            total = 0
+            for asset in assets.iterator():
+                trabajos.encolar(asset, TrabajoMedia.TIPO_METADATOS)
+                total += 1
+            self.stdout.write(self.style.SUCCESS(f"{total} trabajo(s) de metadatos encolados."))
+            return
+
+        ok = errores = 0
+        for asset in assets.iterator():
+            try:
+                campos = metadatos.actualizar_metadatos(asset)
+            except Exception as exc:
+                errores += 1
+                self.stdout.write(self.style.ERROR(f"Asset {asset.pk}: {exc}"))
+                continue
+            ok += 1
+            self.stdout.write(f"Asset {asset.pk}: {campos['duracion_segundos']} s, "
+                              f"{campos['codec_video']}/{campos['codec_audio']}")
+        self.stdout.write(self.style.SUCCESS(f"{ok} asset(s) actualizados, {errores} con error."))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+
+from uploader import faststart, trabajos
+from uploader.models import MediaAsset, TrabajoMedia
+
+
+class Command(BaseCommand):
+    help = ("Busca assets MP4/MOV con el átomo moov al final y los remuxea con "
+            "faststart. Por defecto encola un trabajo por asset para el worker (procesar_media).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--directo", action="store_true",
+                            help="Hace el remux en este proceso en vez de encolarlo")
+        parser.add_argument("--solo-listar", action="store_true",
+                            help="Solo muestra los assets afectados")
+
+    def handle(self, *args, **options):
+        pendiente = TrabajoMedia.objects.filter(
+            asset=OuterRef("pk"), tipo=TrabajoMedia.TIPO_FASTSTART,
+            estado__in=(TrabajoMedia.PENDIENTE, TrabajoMedia.EN_PROCESO),
+        )
+        assets = (MediaAsset.objects
+                  .exclude(Q(archivo__isnull=True) | Q(archivo=""))
+                  .exclude(Exists(pendiente))
+                  .order_by("id"))
+
+        revisados = afectados = ok = errores = 0
+        for asset in assets.iterator():
+            revisados += 1
+            if not faststart.moov_al_final(asset.archivo.path):
+                continue
+            afectados += 1
+            if options["solo_listar"]:
+                self.stdout.write(f"Asset {asset.pk}: {asset.archivo.name}")
+            elif not options["directo"]:
+                trabajos.encolar(asset, TrabajoMedia.TIPO_FASTSTART)
+            else:
+                try:
+                    faststart.remux(asset)
+                except Exception as exc:
+                    errores += 1
+                    self.stdout.write(self.style.ERROR(f"Asset {asset.pk}: {exc}"))
+                    continue
+                ok += 1
+                self.stdout.write(f"Asset {asset.pk}: {asset.archivo.name}")
+
+        resumen = f"{revisados} asset(s) revisados, {afectados} con moov al final"
+        if options["directo"] and not options["solo_listar"]:
+            resumen += f"; {ok} corregidos, {errores} con error"
+        elif not options["solo_listar"]:
+            resumen += f"; {afectados} trabajo(s) de faststart encolados"
+        self.stdout.write(self.style.SUCCESS(resumen + "."))
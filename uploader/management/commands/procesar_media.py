@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from uploader import trabajos
+
+
+def _detener(signum, frame):
+    # SystemExit dentro del proceso: trabajos.ejecutar libera el trabajo en curso
+    sys.exit(0)
+
+
+class Command(BaseCommand):
+    help = ("Worker de la cola de media (transcodificación ABR y empaquetado HLS/DASH). "
+            "Lanza un proceso por núcleo y corre hasta que se detenga.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Procesa los trabajos pendientes y termina")
+        parser.add_argument("--espera", type=float, default=5.0,
+                            help="Segundos entre consultas cuando la cola está vacía")
+        parser.add_argument("--procesos", type=int, default=settings.MEDIA_WORKERS,
+                            help="Procesos del worker (0 = uno por núcleo)")
+
+    def handle(self, *args, **options):
+        nucleos = os.cpu_count() or 1
+        procesos = options["procesos"] or nucleos
+        # cada ffmpeg usa su parte de los núcleos para no sobrecargar el host
+        hilos = max(1, nucleos // procesos)
+
+        if procesos == 1:
+            self._bucle(options["una_vez"], options["espera"], hilos)
+            return
+
+        self.stdout.write(f"Iniciando {procesos} procesos ({hilos} hilos de ffmpeg c/u).")
+        connections.close_all()   # los hijos no deben heredar la conexión del padre
+        contexto = multiprocessing.get_context("fork")
+        hijos = [
+            contexto.Process(target=self._bucle, args=(options["una_vez"], options["espera"], hilos))
+            for _ in range(procesos)
+        ]
+        for hijo in hijos:
+            hijo.start()
+
+        def reenviar(signum, frame):
+            for hijo in hijos:
+                if hijo.is_alive():
+                    hijo.terminate()
+
+        signal.signal(signal.SIGTERM, reenviar)
+        try:
+            for hijo in hijos:
+                hijo.join()
+        except KeyboardInterrupt:
+            # Ctrl+C ya llegó a todo el grupo de procesos; solo esperamos a que liberen sus trabajos
+            for hijo in hijos:
+                hijo.join()
+
+    def _bucle(self, una_vez, espera, hilos):
+        signal.signal(signal.SIGTERM, _detener)
+        worker = trabajos.identificador_worker()
+        try:
+            while True:
+                close_old_connections()
+                trabajo = trabajos.tomar_siguiente(worker)
+                if trabajo is None:
+                    if una_vez:
+                        break
+                    time.sleep(espera)
+                    continue
+
+                self.stdout.write(f"[{worker}] Procesando {trabajo} ...")
+                if trabajos.ejecutar(trabajo, hilos):
+                    self.stdout.write(self.style.SUCCESS(f"Trabajo {trabajo.pk} terminado."))
+                else:
+                    self.stdout.write(self.style.ERROR(
+                        f"Trabajo {trabajo.pk} con error ({trabajo.estado}): {trabajo.error}"))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,89 @@
+"""
+Metadatos técnicos de un MediaAsset: tamaño, duración, bitrate, codecs,
+resolución y checksum SHA-256, extraídos con ffprobe por el worker de media.
+
+Se guardan en columnas del asset para que las rutas calientes (Play, admin,
+progreso) no tengan que tocar el filesystem.
+"""
+import hashlib
+import json
+import subprocess
+
+from django.conf import settings
+from django.utils import timezone
+
+_BLOQUE = 1024 * 1024
+
+
+def ffprobe(origen) -> dict:
+    """Formato y streams del archivo (ruta local o URL) según ffprobe, como dict."""
+    proceso = subprocess.run(
+        [settings.FFPROBE_BIN, "-v", "error", "-show_format", "-show_streams", "-of", "json", origen],
+        capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"ffprobe terminó con código {proceso.returncode}: {proceso.stderr.strip()[-2000:]}")
+    return json.loads(proceso.stdout or "{}")
+
+
+def _numero(valor, tipo=float):
+    try:
+        return tipo(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def extraer(origen) -> dict:
+    """Campos de metadatos del MediaAsset a partir de la salida de ffprobe."""
+    datos = ffprobe(origen)
+    formato = datos.get("format") or {}
+    streams = datos.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    bitrate = _numero(formato.get("bit_rate"), int)
+    return {
+        "tamano_bytes": _numero(formato.get("size"), int),
+        "duracion_segundos": _numero(formato.get("duration")),
+        "bitrate_kbps": bitrate // 1000 if bitrate else None,
+        "codec_video": video.get("codec_name", ""),
+        "codec_audio": audio.get("codec_name", ""),
+        "ancho": video.get("width"),
+        "alto": video.get("height"),
+    }
+
+
+def checksum(ruta) -> str:
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(_BLOQUE), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def actualizar_metadatos(asset):
+    """
+    Extrae y guarda los metadatos del asset (archivo local o remote_url).
+    El checksum solo se calcula para archivos locales.
+    Solo se guardan si el asset sigue apuntando al archivo medido: si mientras
+    tanto se reemplazó (uploader.faststart), los valores son del archivo viejo y
+    el trabajo de metadatos que encoló el reemplazo medirá el nuevo.
+    """
+    from .models import MediaAsset
+
+    if asset.archivo:
+        ruta = asset.archivo.path
+        campos = extraer(ruta)
+        campos["checksum_sha256"] = checksum(ruta)
+        mismo_origen = {"archivo": asset.archivo.name}
+    elif asset.remote_url:
+        campos = extraer(asset.remote_url)
+        mismo_origen = {"remote_url": asset.remote_url}
+    else:
+        raise ValueError("El asset no tiene archivo ni remote_url.")
+
+    campos["metadatos_en"] = timezone.now()
+    # update(): no es un cambio del catálogo, no hace falta disparar post_save
+    MediaAsset.objects.filter(pk=asset.pk, **mismo_origen).update(**campos)
+    for campo, valor in campos.items():
+        setattr(asset, campo, valor)
+    return campos
@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0002_mediaasset_manifiestos_trabajomedia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='origen',
+            field=models.ForeignKey(blank=True, db_column='id_origen', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='renditions', to='uploader.mediaasset'),
+        ),
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='bloqueado_hasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='calidad',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='progreso',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='trabajomedia',
+            name='tipo',
+            field=models.CharField(choices=[('empaquetar', 'Empaquetado HLS/DASH'), ('transcodificar', 'Transcodificación')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0004_mediaasset_metadatos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='no_antes_de',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trabajomedia',
+            name='parametros',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='trabajomedia',
+            name='tipo',
+            field=models.CharField(choices=[('empaquetar', 'Empaquetado HLS/DASH'), ('transcodificar', 'Transcodificación'), ('metadatos', 'Metadatos'), ('faststart', 'Faststart (moov al inicio)'), ('borrar_archivo', 'Borrar archivo reemplazado')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0005_trabajomedia_faststart'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='trickplay_vtt',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='trabajomedia',
+            name='tipo',
+            field=models.CharField(choices=[('empaquetar', 'Empaquetado HLS/DASH'), ('transcodificar', 'Transcodificación'), ('metadatos', 'Metadatos'), ('faststart', 'Faststart (moov al inicio)'), ('borrar_archivo', 'Borrar archivo reemplazado'), ('trickplay', 'Miniaturas del seek bar')], max_length=20),
+        ),
+    ]
@@ -22,6 +22,31 @@ class MediaAsset(models.Model):
     mime_type = models.CharField(max_length=50, default="video/mp4")
     es_trailer = models.BooleanField(default=False)
 
+    # Si es una rendición generada por transcodificación: el archivo fuente (mezzanine)
+    origen = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True,
+        db_column="id_origen", related_name="renditions",
+    )
+
+    # Versión segmentada (la genera el worker de media a partir de `archivo`).
+    # Rutas relativas a la carpeta de derivados del asset, p. ej. "hls/index.m3u8"
+    hls_manifest = models.CharField(max_length=255, blank=True, default="")
+    dash_manifest = models.CharField(max_length=255, blank=True, default="")
+    # Índice WebVTT de las miniaturas para el seek bar (sprites en la misma carpeta)
+    trickplay_vtt = models.CharField(max_length=255, blank=True, default="")
+
+    # Metadatos técnicos (los extrae el worker con ffprobe; ver uploader.metadatos).
+    # Las rutas calientes y el admin leen estas columnas en vez del filesystem.
+    tamano_bytes = models.BigIntegerField(null=True, blank=True)
+    duracion_segundos = models.FloatField(null=True, blank=True)
+    bitrate_kbps = models.PositiveIntegerField(null=True, blank=True)
+    codec_video = models.CharField(max_length=30, blank=True, default="")
+    codec_audio = models.CharField(max_length=30, blank=True, default="")
+    ancho = models.PositiveIntegerField(null=True, blank=True)
+    alto = models.PositiveIntegerField(null=True, blank=True)
+    checksum_sha256 = models.CharField(max_length=64, blank=True, default="")
+    metadatos_en = models.DateTimeField(null=True, blank=True)
+
     creado_en = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -36,3 +61,66 @@ class MediaAsset(models.Model):
         if not self.archivo and not self.remote_url:
             from django.core.exceptions import ValidationError
             raise ValidationError("Debes enviar archivo o remote_url.")
+
+
+class TrabajoMedia(models.Model):
+    """
+    Cola de trabajos de procesamiento de video (en la BD).
+    La atiende `manage.py procesar_media`, nunca un hilo de request.
+    """
+    TIPO_EMPAQUETAR = "empaquetar"   # HLS (y DASH opcional) a partir del archivo
+    TIPO_TRANSCODIFICAR = "transcodificar"   # una rendición (`calidad`) desde el mezzanine
+    TIPO_METADATOS = "metadatos"   # tamaño, duración, codecs y checksum (ffprobe)
+    TIPO_FASTSTART = "faststart"   # remux con el átomo moov al inicio del MP4
+    TIPO_BORRAR_ARCHIVO = "borrar_archivo"   # parametros["ruta"], diferido con no_antes_de
+    TIPO_TRICKPLAY = "trickplay"   # sprites de miniaturas + índice WebVTT
+    TIPOS = [
+        (TIPO_EMPAQUETAR, "Empaquetado HLS/DASH"),
+        (TIPO_TRANSCODIFICAR, "Transcodificación"),
+        (TIPO_METADATOS, "Metadatos"),
+        (TIPO_FASTSTART, "Faststart (moov al inicio)"),
+        (TIPO_BORRAR_ARCHIVO, "Borrar archivo reemplazado"),
+        (TIPO_TRICKPLAY, "Miniaturas del seek bar"),
+    ]
+
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    TERMINADO = "terminado"
+    ERROR = "error"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (EN_PROCESO, "En proceso"),
+        (TERMINADO, "Terminado"),
+        (ERROR, "Error"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    asset = models.ForeignKey(
+        MediaAsset, on_delete=models.CASCADE, db_column="id_asset", related_name="trabajos"
+    )
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    calidad = models.CharField(max_length=20, blank=True, default="")   # solo transcodificar
+    parametros = models.JSONField(default=dict, blank=True)
+    no_antes_de = models.DateTimeField(null=True, blank=True)   # trabajo diferido
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    progreso = models.PositiveSmallIntegerField(default=0)   # 0-100
+    intentos = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    # Lease: el worker que lo procesa lo renueva periódicamente; si vence
+    # (el proceso murió o se reinició el host) otro worker lo retoma.
+    worker = models.CharField(max_length=100, blank=True, default="")
+    bloqueado_hasta = models.DateTimeField(null=True, blank=True)
+
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "media_trabajos"
+        indexes = [
+            models.Index(fields=["estado", "id"], name="media_trabajos_cola"),
+        ]
+
+    def __str__(self):
+        tipo = f"{self.tipo} {self.calidad}" if self.calidad else self.tipo
+        return f"[{self.asset_id}] {tipo} ({self.estado})"
@@ -1,8 +1,20 @@
 from rest_framework import serializers
-from .models import MediaAsset
+from .models import MediaAsset, TrabajoMedia
+from . import trabajos
+
+
+class TrabajoMediaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TrabajoMedia
+        fields = ("id", "tipo", "calidad", "estado", "progreso", "intentos", "error", "actualizado_en")
+        read_only_fields = fields
+
 
 class MediaAssetSerializer(serializers.ModelSerializer):
     pelicula_id = serializers.IntegerField(write_only=True)
+    # Mezzanine: genera en segundo plano las rendiciones 1080p/720p/480p/360p
+    generar_calidades = serializers.BooleanField(write_only=True, required=False, default=False)
+    trabajos = TrabajoMediaSerializer(many=True, read_only=True)
 
     class Meta:
         model = MediaAsset
@@ -14,17 +26,41 @@ class MediaAssetSerializer(serializers.ModelSerializer):
             "calidad",
             "mime_type",
             "es_trailer",
+            "origen",
+            "generar_calidades",
+            "trabajos",
+            "tamano_bytes",
+            "duracion_segundos",
+            "bitrate_kbps",
+            "codec_video",
+            "codec_audio",
+            "ancho",
+            "alto",
+            "checksum_sha256",
             "creado_en",
         )
-        read_only_fields = ("id", "creado_en")
+        read_only_fields = ("id", "origen", "tamano_bytes", "duracion_segundos", "bitrate_kbps",
+                            "codec_video", "codec_audio", "ancho", "alto", "checksum_sha256",
+                            "creado_en")
 
     def validate(self, attrs):
         archivo = attrs.get("archivo")
         remote_url = attrs.get("remote_url")
         if not archivo and not remote_url:
             raise serializers.ValidationError("Debes enviar archivo o remote_url.")
+        if attrs.get("generar_calidades") and not archivo:
+            raise serializers.ValidationError("Para generar calidades se necesita un archivo local.")
         return attrs
 
     def create(self, validated_data):
+        generar_calidades = validated_data.pop("generar_calidades", False)
         # El ModelSerializer ya toma pelicula_id -> FK (por el nombre del campo)
-        return super().create(validated_data)
+        asset = super().create(validated_data)
+        if generar_calidades:
+            # la transcodificación la hace el worker (manage.py procesar_media), nunca el request
+            trabajos.encolar_escalera(asset)
+        return asset
+
+    def update(self, instance, validated_data):
+        validated_data.pop("generar_calidades", None)
+        return super().update(instance, validated_data)
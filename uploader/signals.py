@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from content.signals import notificar_cambio_catalogo
+from . import empaquetado, faststart, trabajos
+from .models import MediaAsset, TrabajoMedia
+
+
+@receiver(post_save, sender=MediaAsset)
+@receiver(post_delete, sender=MediaAsset)
+def asset_modificado(sender, instance, **kwargs):
+    # tiene_video / calidades de la película dependen de sus assets
+    notificar_cambio_catalogo(sender, [instance.pelicula_id])
+
+
+@receiver(post_save, sender=MediaAsset)
+def encolar_procesamiento(sender, instance, created, **kwargs):
+    # el worker (manage.py procesar_media) extrae metadatos y genera HLS/DASH fuera del request
+    if not created:
+        return
+    if instance.archivo and faststart.moov_al_final(instance.archivo.path):
+        # cubre la API y el admin; el remux encola los metadatos al terminar
+        trabajos.encolar(instance, TrabajoMedia.TIPO_FASTSTART)
+    elif instance.archivo or instance.remote_url:
+        trabajos.encolar(instance, TrabajoMedia.TIPO_METADATOS)
+    if instance.archivo:
+        trabajos.encolar(instance, TrabajoMedia.TIPO_EMPAQUETAR)
+    if instance.archivo and not instance.es_trailer and instance.origen_id is None:
+        # las rendiciones usan las miniaturas de su mezzanine
+        trabajos.encolar(instance, TrabajoMedia.TIPO_TRICKPLAY)
+
+
+@receiver(post_delete, sender=MediaAsset)
+def borrar_derivados(sender, instance, **kwargs):
+    empaquetado.borrar_derivados(instance.pk)
@@ -1,3 +1,50 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .empaquetado import publicar_directorio
+
+
+class PublicarDirectorioTests(SimpleTestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base, True)
+        self.destino = os.path.join(self.base, "hls")
+
+    def _nueva_version(self, contenido):
+        carpeta = tempfile.mkdtemp(dir=self.base, prefix="tmp-")
+        with open(os.path.join(carpeta, "index.m3u8"), "w") as f:
+            f.write(contenido)
+        return carpeta
+
+    def _leer(self):
+        with open(os.path.join(self.destino, "index.m3u8")) as f:
+            return f.read()
+
+    def test_reemplazo_sin_hueco(self):
+        # publicado por una versión anterior como carpeta real
+        os.rename(self._nueva_version("v0"), self.destino)
+        publicar_directorio(self._nueva_version("v1"), self.destino)
+        self.assertTrue(os.path.islink(self.destino))
+        self.assertEqual(self._leer(), "v1")
+
+        publicar_directorio(self._nueva_version("v2"), self.destino)
+        self.assertEqual(self._leer(), "v2")
+        # solo queda el enlace y su versión vigente
+        self.assertEqual(sorted(n.split("-")[0] for n in os.listdir(self.base)), ["hls", "hls.v"])
+
+    def test_restos_de_publicacion_interrumpida(self):
+        publicar_directorio(self._nueva_version("v1"), self.destino)
+        # murió entre el rename de la versión y el cambio del enlace
+        os.rename(self._nueva_version("huerfana"), f"{self.destino}.v-huerfana")
+        publicar_directorio(self._nueva_version("v2"), self.destino)
+        self.assertEqual(self._leer(), "v2")
+        self.assertFalse(os.path.exists(f"{self.destino}.v-huerfana"))
+
+    def test_retirar(self):
+        publicar_directorio(self._nueva_version("v1"), self.destino)
+        publicar_directorio(None, self.destino)
+        self.assertEqual(os.listdir(self.base), [])
@@ -0,0 +1,177 @@
+"""
+Cola de trabajos de media sobre la tabla media_trabajos.
+
+Varios workers pueden tomar trabajos a la vez: cada uno reclama el siguiente
+pendiente con SELECT ... FOR UPDATE SKIP LOCKED, así nunca dos procesan el mismo.
+
+Cada trabajo en proceso tiene un lease (`bloqueado_hasta`) que su worker renueva
+mientras corre; si el worker muere o el host se reinicia, el lease vence y el
+trabajo vuelve a estar disponible (hasta MEDIA_MAX_INTENTOS).
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import empaquetado, faststart, metadatos, transcodificacion, trickplay
+from .models import TrabajoMedia
+
+logger = logging.getLogger(__name__)
+
+
+def _empaquetar(trabajo, reportar, hilos):
+    empaquetado.empaquetar(trabajo.asset)
+
+
+def _transcodificar(trabajo, reportar, hilos):
+    transcodificacion.transcodificar(trabajo.asset, trabajo.calidad, reportar, hilos)
+
+
+def _metadatos(trabajo, reportar, hilos):
+    metadatos.actualizar_metadatos(trabajo.asset)
+
+
+def _faststart(trabajo, reportar, hilos):
+    faststart.remux(trabajo.asset, reportar)
+
+
+def _borrar_archivo(trabajo, reportar, hilos):
+    faststart.borrar_reemplazado(trabajo.parametros["ruta"])
+
+
+def _trickplay(trabajo, reportar, hilos):
+    trickplay.generar(trabajo.asset, reportar, hilos)
+
+
+# tipo de trabajo -> función(trabajo, reportar(progreso), hilos de ffmpeg)
+MANEJADORES = {
+    TrabajoMedia.TIPO_EMPAQUETAR: _empaquetar,
+    TrabajoMedia.TIPO_TRANSCODIFICAR: _transcodificar,
+    TrabajoMedia.TIPO_METADATOS: _metadatos,
+    TrabajoMedia.TIPO_FASTSTART: _faststart,
+    TrabajoMedia.TIPO_BORRAR_ARCHIVO: _borrar_archivo,
+    TrabajoMedia.TIPO_TRICKPLAY: _trickplay,
+}
+
+
+def encolar(asset, tipo, calidad="", parametros=None, no_antes_de=None):
+    """Encola un trabajo; con `no_antes_de` ningún worker lo toma antes de esa hora."""
+    return TrabajoMedia.objects.create(asset=asset, tipo=tipo, calidad=calidad,
+                                       parametros=parametros or {}, no_antes_de=no_antes_de)
+
+
+def encolar_escalera(asset):
+    """Un trabajo de transcodificación por cada calidad de la escalera ABR."""
+    return TrabajoMedia.objects.bulk_create([
+        TrabajoMedia(asset=asset, tipo=TrabajoMedia.TIPO_TRANSCODIFICAR, calidad=calidad)
+        for calidad in transcodificacion.ESCALERA
+    ])
+
+
+def identificador_worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease():
+    return timezone.now() + timedelta(seconds=settings.MEDIA_LEASE_SEGUNDOS)
+
+
+def tomar_siguiente(worker=None):
+    """
+    Reclama el trabajo disponible más antiguo (o None si no hay): pendiente (y no
+    diferido) o en proceso con el lease vencido. Los que ya agotaron sus intentos se marcan error.
+    """
+    worker = worker or identificador_worker()
+    while True:
+        ahora = timezone.now()
+        with transaction.atomic():
+            trabajo = (TrabajoMedia.objects
+                       .select_for_update(skip_locked=True)
+                       .filter(Q(estado=TrabajoMedia.PENDIENTE)
+                               & (Q(no_antes_de__isnull=True) | Q(no_antes_de__lte=ahora))
+                               | Q(estado=TrabajoMedia.EN_PROCESO, bloqueado_hasta__lt=ahora))
+                       .order_by("id")
+                       .first())
+            if trabajo is None:
+                return None
+
+            if trabajo.estado == TrabajoMedia.EN_PROCESO and trabajo.intentos >= settings.MEDIA_MAX_INTENTOS:
+                trabajo.estado = TrabajoMedia.ERROR
+                trabajo.error = f"El worker {trabajo.worker} dejó de responder ({trabajo.intentos} intentos)."
+                trabajo.bloqueado_hasta = None
+                trabajo.save(update_fields=["estado", "error", "bloqueado_hasta", "actualizado_en"])
+                continue
+
+            trabajo.estado = TrabajoMedia.EN_PROCESO
+            trabajo.intentos += 1
+            trabajo.progreso = 0
+            trabajo.worker = worker
+            trabajo.bloqueado_hasta = _lease()
+            trabajo.save(update_fields=["estado", "intentos", "progreso", "worker",
+                                        "bloqueado_hasta", "actualizado_en"])
+        return trabajo
+
+
+class _Latido(threading.Thread):
+    """Renueva el lease del trabajo y guarda el último progreso reportado."""
+
+    def __init__(self, trabajo):
+        super().__init__(daemon=True)
+        self.trabajo = trabajo
+        self.progreso = 0
+        self.detener = threading.Event()
+
+    def reportar(self, progreso):
+        self.progreso = progreso
+
+    def run(self):
+        # el progreso se publica cada pocos segundos; el lease se renueva con margen
+        intervalo = max(1, min(5, settings.MEDIA_LEASE_SEGUNDOS // 3))
+        try:
+            while not self.detener.wait(intervalo):
+                TrabajoMedia.objects.filter(pk=self.trabajo.pk, worker=self.trabajo.worker).update(
+                    progreso=self.progreso, bloqueado_hasta=_lease(), actualizado_en=timezone.now(),
+                )
+        finally:
+            connection.close()   # conexión propia de este hilo
+
+
+def _cerrar(trabajo, **campos):
+    # solo si el trabajo sigue siendo nuestro (otro worker pudo retomarlo si el lease venció)
+    campos.update(bloqueado_hasta=None, actualizado_en=timezone.now())
+    TrabajoMedia.objects.filter(pk=trabajo.pk, worker=trabajo.worker).update(**campos)
+    for campo, valor in campos.items():
+        setattr(trabajo, campo, valor)
+
+
+def ejecutar(trabajo, hilos=0):
+    """
+    Corre el trabajo y deja registrado el resultado. Retorna True si terminó bien.
+    Si falla y le quedan intentos vuelve a la cola; si el worker se detiene
+    (SIGTERM/Ctrl+C) el trabajo se libera sin gastar el intento.
+    """
+    latido = _Latido(trabajo)
+    latido.start()
+    try:
+        try:
+            MANEJADORES[trabajo.tipo](trabajo, latido.reportar, hilos)
+        finally:
+            # detener el latido antes de registrar el resultado
+            latido.detener.set()
+            latido.join()
+    except Exception as exc:
+        logger.exception("Falló el trabajo de media %s", trabajo.pk)
+        reintentar = trabajo.intentos < settings.MEDIA_MAX_INTENTOS
+        _cerrar(trabajo, estado=TrabajoMedia.PENDIENTE if reintentar else TrabajoMedia.ERROR, error=str(exc))
+        return False
+    except BaseException:
+        _cerrar(trabajo, estado=TrabajoMedia.PENDIENTE, intentos=trabajo.intentos - 1)
+        raise
+    _cerrar(trabajo, estado=TrabajoMedia.TERMINADO, progreso=100, error="")
+    return True
@@ -0,0 +1,129 @@
+"""
+Escalera de calidades (ABR): a partir de un archivo mezzanine se generan las
+rendiciones 1080p/720p/480p/360p en H.264/AAC con ffmpeg.
+
+Cada rendición es un MediaAsset normal (con `origen` apuntando al mezzanine),
+así PlayPeliculaView la encuentra por `calidad` y el worker la empaqueta en HLS.
+Los keyframes se fuerzan cada MEDIA_SEGMENTO_SEGUNDOS para que los segmentos
+de todas las calidades queden alineados y el reproductor pueda cambiar entre ellas.
+"""
+import glob
+import os
+import subprocess
+import tempfile
+import uuid
+
+from django.conf import settings
+
+from . import metadatos
+
+# calidad -> (alto, kbps de video); el orden es el de PlayPeliculaView.PREFERRED
+ESCALERA = {
+    "1080p": (1080, 5000),
+    "720p": (720, 2800),
+    "480p": (480, 1400),
+    "360p": (360, 800),
+}
+AUDIO_KBPS = 128
+
+
+def ruta_rendicion(origen_id, calidad) -> str:
+    """Nombre (relativo a MEDIA_ROOT) del archivo de una rendición."""
+    return f"movies/renditions/{origen_id}/{calidad}.mp4"
+
+
+def _argumentos(origen, destino, alto, kbps, hilos):
+    return [
+        "-i", origen,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale=-2:{alto}",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "high", "-pix_fmt", "yuv420p",
+        "-b:v", f"{kbps}k", "-maxrate", f"{kbps * 107 // 100}k", "-bufsize", f"{kbps * 2}k",
+        "-force_key_frames", f"expr:gte(t,n_forced*{settings.MEDIA_SEGMENTO_SEGUNDOS})",
+        "-sc_threshold", "0",
+        "-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k", "-ac", "2",
+        "-threads", str(hilos),
+        "-movflags", "+faststart",
+        "-f", "mp4", destino,
+    ]
+
+
+def _ffmpeg_con_progreso(args, duracion, reportar):
+    """
+    Corre ffmpeg leyendo `-progress pipe:1` y llama reportar(0-99) a medida que avanza.
+    Si el proceso se interrumpe (SIGTERM del worker) se mata ffmpeg antes de salir.
+    """
+    cmd = [settings.FFMPEG_BIN, "-hide_banner", "-loglevel", "error", "-y",
+           "-nostats", "-progress", "pipe:1", *args]
+    with tempfile.TemporaryFile(mode="w+") as errores:
+        proceso = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errores, text=True)
+        try:
+            for linea in proceso.stdout:
+                clave, _, valor = linea.strip().partition("=")
+                if clave == "out_time_us" and duracion > 0 and valor.isdigit():
+                    reportar(min(99, int(int(valor) / 1e6 / duracion * 100)))
+            proceso.wait()
+        finally:
+            if proceso.poll() is None:
+                proceso.kill()
+                proceso.wait()
+        if proceso.returncode != 0:
+            errores.seek(0)
+            raise RuntimeError(f"ffmpeg terminó con código {proceso.returncode}: {errores.read().strip()[-2000:]}")
+
+
+def transcodificar(origen, calidad, reportar=lambda progreso: None, hilos=0):
+    """
+    Genera la rendición `calidad` del asset `origen` y la registra como MediaAsset.
+    No escala hacia arriba: si el mezzanine es más chico se omite (salvo la
+    calidad más baja, que siempre se genera). Retorna el asset o None si se omitió.
+    """
+    from .models import MediaAsset, TrabajoMedia
+    from . import trabajos
+
+    if not origen.archivo:
+        raise ValueError("El asset no tiene archivo local para transcodificar.")
+    alto, kbps = ESCALERA[calidad]
+
+    if origen.metadatos_en is None:
+        metadatos.actualizar_metadatos(origen)
+    if origen.alto and origen.alto < alto:
+        if calidad != list(ESCALERA)[-1]:
+            return None
+        alto = origen.alto - origen.alto % 2
+
+    nombre = ruta_rendicion(origen.id, calidad)
+    final = os.path.join(settings.MEDIA_ROOT, nombre)
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    # restos de un intento anterior cuyo worker murió (este trabajo tiene el lease)
+    for resto in glob.glob(f"{glob.escape(final)}.tmp-*"):
+        os.remove(resto)
+    temporal = f"{final}.tmp-{uuid.uuid4().hex}"
+    try:
+        _ffmpeg_con_progreso(_argumentos(origen.archivo.path, temporal, alto, kbps, hilos),
+                             origen.duracion_segundos or 0, reportar)
+        os.replace(temporal, final)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    # Reintento o regeneración: el archivo se reemplazó en su lugar, solo falta
+    # releer los metadatos y reempaquetar
+    asset = MediaAsset.objects.filter(origen=origen, calidad=calidad).first()
+    if asset is not None:
+        # sin checksum/fecha viejos, Play no firma validadores (ETag) que ya no valen
+        MediaAsset.objects.filter(pk=asset.pk).update(
+            tamano_bytes=None, checksum_sha256="", metadatos_en=None,
+        )
+        trabajos.encolar(asset, TrabajoMedia.TIPO_METADATOS)
+        trabajos.encolar(asset, TrabajoMedia.TIPO_EMPAQUETAR)
+        return asset
+    # create(): post_save actualiza el catálogo y encola metadatos y empaquetado HLS
+    return MediaAsset.objects.create(
+        pelicula_id=origen.pelicula_id,
+        archivo=nombre,
+        calidad=calidad,
+        mime_type="video/mp4",
+        es_trailer=origen.es_trailer,
+        origen=origen,
+    )
@@ -0,0 +1,89 @@
+"""
+Miniaturas del seek bar (trickplay): hojas de sprites JPEG + índice WebVTT.
+
+Los derivados van en MEDIA_ROOT/derivados/<asset_id>/trickplay/:
+    thumbnails.vtt + sprite_000.jpg, sprite_001.jpg ...
+Cada hoja es una grilla de COLUMNAS x FILAS miniaturas, una cada
+MEDIA_TRICKPLAY_SEGUNDOS. Cada cue del VTT apunta a su recorte con
+`sprite_NNN.jpg#xywh=x,y,ancho,alto` (ruta relativa, hereda la firma de la URL del VTT).
+
+ffmpeg solo decodifica keyframes (-skip_frame nokey): la vista previa del seek
+bar no necesita precisión de cuadro y así el trabajo cuesta una fracción de una
+transcodificación.
+"""
+import math
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+
+from . import metadatos
+from .empaquetado import directorio_derivados, publicar_directorio
+from .transcodificacion import _ffmpeg_con_progreso
+
+TRICKPLAY_VTT = "trickplay/thumbnails.vtt"
+COLUMNAS = 10
+FILAS = 10
+
+
+def _tiempo_vtt(segundos) -> str:
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    return f"{int(horas):02d}:{int(minutos):02d}:{segundos:06.3f}"
+
+
+def indice_vtt(duracion, intervalo, ancho, alto) -> str:
+    """WebVTT con un cue por miniatura: [t, t+intervalo) -> recorte de su hoja."""
+    lineas = ["WEBVTT", ""]
+    por_hoja = COLUMNAS * FILAS
+    for i in range(math.ceil(duracion / intervalo)):
+        inicio = i * intervalo
+        fin = min(inicio + intervalo, duracion)
+        hoja, celda = divmod(i, por_hoja)
+        fila, columna = divmod(celda, COLUMNAS)
+        lineas += [
+            f"{_tiempo_vtt(inicio)} --> {_tiempo_vtt(fin)}",
+            f"sprite_{hoja:03d}.jpg#xywh={columna * ancho},{fila * alto},{ancho},{alto}",
+            "",
+        ]
+    return "\n".join(lineas)
+
+
+def generar(asset, reportar=lambda progreso: None, hilos=0):
+    """Genera sprites e índice VTT del archivo local del asset y los publica."""
+    from .models import MediaAsset
+
+    if not asset.archivo:
+        raise ValueError("El asset no tiene archivo local para generar miniaturas.")
+    if asset.metadatos_en is None:
+        metadatos.actualizar_metadatos(asset)
+    if not asset.duracion_segundos or not asset.ancho or not asset.alto:
+        raise ValueError("El asset no tiene duración o resolución de video.")
+
+    intervalo = settings.MEDIA_TRICKPLAY_SEGUNDOS
+    ancho = settings.MEDIA_TRICKPLAY_ANCHO
+    alto = max(2, round(ancho * asset.alto / asset.ancho / 2) * 2)
+
+    carpeta = directorio_derivados(asset.id)
+    final = os.path.join(carpeta, os.path.dirname(TRICKPLAY_VTT))
+    temporal = f"{final}.tmp-{uuid.uuid4().hex}"
+    os.makedirs(temporal)
+    try:
+        _ffmpeg_con_progreso([
+            "-skip_frame", "nokey", "-i", asset.archivo.path,
+            "-map", "0:v:0", "-an", "-sn",
+            "-vf", f"fps=1/{intervalo}:eof_action=pass,scale={ancho}:{alto},tile={COLUMNAS}x{FILAS}",
+            "-q:v", "5", "-threads", str(hilos),
+            "-start_number", "0",
+            os.path.join(temporal, "sprite_%03d.jpg"),
+        ], asset.duracion_segundos, reportar)
+        with open(os.path.join(temporal, os.path.basename(TRICKPLAY_VTT)), "w") as f:
+            f.write(indice_vtt(asset.duracion_segundos, intervalo, ancho, alto))
+        publicar_directorio(temporal, final)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+    # update(): no es un cambio del catálogo, no hace falta disparar post_save
+    MediaAsset.objects.filter(pk=asset.pk).update(trickplay_vtt=TRICKPLAY_VTT)
+    asset.trickplay_vtt = TRICKPLAY_VTT
@@ -10,7 +10,8 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 class MediaAssetViewSet(viewsets.ModelViewSet):
-    queryset = MediaAsset.objects.select_related("pelicula").order_by("-creado_en")
+    queryset = (MediaAsset.objects.select_related("pelicula")
+                .prefetch_related("trabajos").order_by("-creado_en"))
     serializer_class = MediaAssetSerializer
     permission_classes = [IsAdminOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]  # para subir archivo o JSON